@@ -1,3 +1,6 @@
 lst = range(1, 15)
-x = [[y, z] for y, z in zip(lst[1::2], lst[::2])]
+
+# Zipping one iterator with itself pairs up neighbours lazily, without the copies slicing makes.
+pairs = iter(lst)
+x = [[y, z] for z, y in zip(pairs, pairs)]
 print(x)
@@ -1,11 +1,233 @@
-from random import randint
+import typing as t
+
 import numpy as np
 
 
-col_length = randint(2, 4)
-n = [[randint(0, 10) for __ in range(col_length)] for _ in range(randint(4, 10))]
-n = np.array(n)
+Columns = t.Optional[t.Union[int, t.Sequence[int]]]
+Directions = t.Union[bool, t.Sequence[bool]]
+
+
+def order(
+    table: np.ndarray, by: Columns = None, descending: Directions = False, stable: bool = True
+) -> np.ndarray:
+    """The row indices that sort a table by one or more of its columns.
+
+    Sorts once with `np.lexsort` (or `np.argsort` for a single column) instead of once per column,
+    and never copies the table itself. `table[order(table)]` gives the sorted rows.
+
+    Args:
+        table (:obj:`np.ndarray`): Of shape (rows, columns), or a single column of shape (rows,).
+        by (:obj:`Columns`, optional): The column to sort by, or several, most significant first.
+            Defaults to every column, left to right.
+        descending (:obj:`Directions`, optional): Sort from largest to smallest, for all of `by` or
+            one flag per column. Defaults to False.
+        stable (bool, optional): Keep equal rows in their order. Only a single column can be sorted
+            faster without it. Defaults to True.
+
+    Returns:
+        :obj:`np.ndarray`: Indices into the rows, in sorted order.
+
+    Examples:
+        >>> order(np.array([[1, 9], [0, 5], [1, 7]]), by=[0, 1], descending=[True, False])
+        array([2, 0, 1])
+
+    """
+    keys = _pack(_keys(table, by, descending))
+
+    if len(keys) == 1:
+        return np.argsort(keys[0], kind='stable' if stable else 'quicksort')
+
+    # `np.lexsort` sorts by its last key first, so the most significant column goes last.
+    return np.lexsort(keys[::-1])
+
+
+def sort_rows(
+    table: np.ndarray, by: Columns = None, descending: Directions = False, out: t.Optional[np.ndarray] = None
+) -> np.ndarray:
+    """The rows of a table, sorted by one or more of its columns.
+
+    A reordering can't be a view of the original memory, so this copies the rows once. Use `order`
+    to keep working with indices instead, or pass `out` to reuse an array.
+
+    Args:
+        table (:obj:`np.ndarray`): Of shape (rows, columns), or a single column of shape (rows,).
+        by (:obj:`Columns`, optional): The columns to sort by, most significant first. Defaults to all.
+        descending (:obj:`Directions`, optional): For all of `by`, or one flag per column. Defaults to False.
+        out (:obj:`t.Optional[np.ndarray]`, optional): Where to write the rows, of the same shape as `table`.
+
+    Returns:
+        :obj:`np.ndarray`: The sorted rows. Equal rows keep their order.
+
+    """
+    return np.take(table, order(table, by, descending), axis=0, out=out)
+
+
+def top_k(table: np.ndarray, k: int, by: Columns = None, descending: Directions = False) -> np.ndarray:
+    """The row indices of the first `k` rows a full sort would give, in order.
+
+    Partitions on the most significant column first, which takes linear time, and only sorts the
+    rows that could be among the first `k`. The result is the same as `order(table, ...)[:k]`.
+
+    Args:
+        table (:obj:`np.ndarray`): Of shape (rows, columns), or a single column of shape (rows,).
+        k (int): How many rows to return.
+        by (:obj:`Columns`, optional): The columns to sort by, most significant first. Defaults to all.
+        descending (:obj:`Directions`, optional): For all of `by`, or one flag per column. Defaults to False.
+
+    Returns:
+        :obj:`np.ndarray`: Indices of at most `k` rows, in sorted order.
+
+    """
+    keys = _pack(_keys(table, by, descending))
+    rows = len(keys[0])
+
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    if k >= rows:
+        return order(table, by, descending)
+
+    # Every row before the k-th one in the primary key is a candidate, and so is every row tied with it,
+    # since the other columns decide which of those make the cut.
+    primary = keys[0]
+    kth = primary[np.argpartition(primary, k - 1)[k - 1]]
+
+    # NaN sorts last but compares false with everything, so with a NaN among the first k every row
+    # is a candidate, and a full sort is as fast.
+    if primary.dtype.kind in 'fc' and np.isnan(kth):
+        return order(table, by, descending)[:k]
+
+    candidates = np.flatnonzero(primary <= kth)
+
+    # Candidates are in their original order, which the stable sort below keeps for equal rows.
+    chosen = np.lexsort([key[candidates] for key in keys[::-1]])[:k]
+
+    return candidates[chosen]
+
+
+def _keys(table: np.ndarray, by: Columns, descending: Directions) -> t.List[np.ndarray]:
+    """The columns to sort by, most significant first, turned around where they are descending."""
+    table = np.asarray(table)
+    columns = table[:, None] if table.ndim == 1 else table
+
+    if by is None:
+        by = range(columns.shape[1])
+    elif isinstance(by, (int, np.integer)):
+        by = [by]
+
+    by = list(by)
+    directions = [descending] * len(by) if isinstance(descending, (bool, np.bool_)) else list(descending)
+
+    if len(directions) != len(by):
+        raise ValueError(f'Got {len(directions)} directions for {len(by)} columns.')
+
+    if not by:
+        raise ValueError('Need at least one column to sort by.')
+
+    return [_descending(columns[:, i]) if flip else columns[:, i] for i, flip in zip(by, directions)]
+
+
+def _pack(keys: t.List[np.ndarray]) -> t.List[np.ndarray]:
+    """Packs neighbouring integer keys into one wherever their ranges fit in 64 bits together.
+
+    `np.lexsort` sorts once per key, so each key packed away saves a whole pass. Small ranges, such
+    as categories or flags, often pack into a single key, which `np.argsort` sorts in one go.
+    """
+    if len(keys) == 1 or not len(keys[0]):
+        return keys
+
+    packed = []
+    group = []
+    size = 1
+
+    for key in keys:
+        span = int(key.max()) - int(key.min()) + 1 if key.dtype.kind in 'biu' else None
+
+        if group and (span is None or size * span >= 2 ** 63):
+            packed.append(_combine(group))
+            group, size = [], 1
+
+        if span is None:
+            packed.append(key)
+        else:
+            group.append((key, span))
+            size *= span
+
+    if group:
+        packed.append(_combine(group))
+
+    return packed
+
+
+def _combine(group: t.List[t.Tuple[np.ndarray, int]]) -> np.ndarray:
+    """One int64 key ordering rows like the integer keys of the group, most significant first."""
+    if len(group) == 1:
+        return group[0][0]
+
+    packed = np.zeros(len(group[0][0]), dtype=np.int64)
+
+    for key, span in group:
+        low = key.min()
+        packed *= span
+
+        # Unsigned keys can be past what int64 holds, so they are shifted down before converting.
+        if key.dtype.kind == 'u':
+            packed += (key - low).astype(np.int64)
+        else:
+            packed += key.astype(np.int64) - int(low)
+
+    return packed
+
+
+def _descending(column: np.ndarray) -> np.ndarray:
+    """A key that sorts ascending in the opposite order of the column, so every sort stays stable.
+
+    Sorting ascending and reversing would put equal rows backwards.
+    """
+    kind = column.dtype.kind
+
+    # Bitwise not reverses the order of every integer without overflowing, unlike negating the minimum.
+    if kind in 'biu':
+        return ~column
+
+    if kind in 'fc':
+        return -column
+
+    # Anything else, such as strings, is sorted by its rank among the distinct values.
+    _, ranks = np.unique(column, return_inverse=True)
+
+    return -ranks.reshape(-1)
+
+
+if __name__ == "__main__":
+    import time
+    from random import randint
+
+    col_length = randint(2, 4)
+    n = np.array([[randint(0, 10) for __ in range(col_length)] for _ in range(randint(4, 10))])
+
+    for col in range(n.shape[1]):
+        print(f'Sorted by column index {col}: {sort_rows(n, by=col, descending=True).tolist()}')
+
+    mixed = sort_rows(n, descending=[True] + [False] * (col_length - 1))
+    print(f'Sorted by every column, the first descending: {mixed.tolist()}')
+    print(f'Top 3 by the last column: {n[top_k(n, 3, by=-1, descending=True)].tolist()}')
+
+    def bench(label: str, func: t.Callable) -> None:
+        start = time.perf_counter()
+        func()
+        print(f'  {label:<50} {time.perf_counter() - start:>8.2f}s')
+
+    rows = 10_000_000
+    rng = np.random.default_rng(0)
+    wide = rng.integers(0, 1_000_000, size=(rows, 4))
+    narrow = rng.integers(0, 1_000, size=(rows, 4))
+    print(f'\n{rows:,} rows of 4 columns')
 
-for col in range(n.shape[1]):
-    tmp = sorted([list(x) for x in list(n)], key=lambda d: d[col], reverse=True)
-    print(f'Sorted by column index {col}: {tmp}')
+    bench('order, by each column', lambda: [order(wide, by=col, descending=True) for col in range(4)])
+    bench('order, by all columns (values up to 10^6)', lambda: order(wide, descending=[True, False] * 2))
+    bench('order, by all columns (values up to 10^3, packed)', lambda: order(narrow, descending=True))
+    bench('top_k (k=100), by all columns', lambda: top_k(wide, 100, descending=True))
+    bench('sorted on lists, by each column, 100,000 rows', lambda: [
+        sorted(wide[:100_000].tolist(), key=lambda row: row[col], reverse=True) for col in range(4)
+    ])
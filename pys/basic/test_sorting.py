@@ -0,0 +1,19 @@
+import numpy as np
+
+from sorting import order, top_k
+
+
+def test_top_k_matches_order() -> None:
+    rng = np.random.default_rng(0)
+    table = rng.integers(0, 5, size=(200, 3))
+
+    for k in (1, 10, 50, 199):
+        assert top_k(table, k, descending=[True, False, True]).tolist() == \
+            order(table, descending=[True, False, True])[:k].tolist()
+
+
+def test_top_k_sorts_nan_last() -> None:
+    column = np.array([1.0, np.nan, np.nan, 2.0])
+
+    assert top_k(column, 3).tolist() == order(column)[:3].tolist() == [0, 3, 1]
+    assert top_k(column, 3, descending=True).tolist() == order(column, descending=True)[:3].tolist()
@@ -1,96 +1,74 @@
 import asyncio
+import functools
 import json
-import logging
+import importlib
 import os
-import typing as t
+import signal
 import sys
+import time
+import typing as t
 
 import discord
 from discord.ext import commands as comms
-from rich import logging as r_logging, traceback as r_traceback
-
-
-def path(*filepath: t.Iterable[str]) -> str:
-    """Returns absolute path from main caller file to another location.
-
-    Args:
-        filepath (:obj:`t.Iterable`): Arguments to add to the current filepath.
-
-    Returns:
-        str: filepath with OS based seperator.
-
-    Examples:
-        >>> print(path('tmp', 'image.png'))
-        C:\\Users\\Xithr\\Documents\\Repositories\\Xythrion\\tmp\\image.png
 
-    """
-    lst = [
-        os.path.abspath(os.path.dirname(sys.argv[0])),
-        (os.sep).join(str(y) for y in filepath)
-    ]
-    return (os.sep).join(str(s) for s in lst)
+import logs
+from cache import Cache
+from cleanup import Cleaner
+from extensions import ExtensionIndex, depends_on, stamp
+from limits import Limits, Overloaded
+from offload import Offloader
+from outbound import Outbound
+from paths import path
+from profiling import Profiler, StallDetector
+from settings import Config, ConfigError, ConfigWatcher, load
+from stats import Metrics
 
 
-def _rich_logger(log_type: int = logging.INFO) -> logging.Logger:
-    """Logs information with the rich library with fancy tracebacks.
+def _timed_import(extension: str) -> float:
+    """Imports an extension's module, for `Bot._timed_setup` to set up without importing it again.
 
     Args:
-        log_type (:obj:`t.Union[str, int]`, optional): The level of logging to be used.
-            Defaults to None.
-        store_file (bool, optional): If the logs want to be stored.
+        extension (str): The dotted module name of the extension.
 
     Returns:
-        :obj:`logging.Logger`: The object that the bot will use to log information to.
-
-    Raises:
-        IndexError: If `log_type` isn't within log_types.
+        float: Seconds spent importing.
 
     """
-    r_traceback.install()
-
-    logging.basicConfig(
-        level=log_type, format='%(message)s', datefmt="[%c]", handlers=[r_logging.RichHandler()]
-    )
-
-    # different message types: info, debug, warning, critical
-    return logging.getLogger("rich")
+    start = time.perf_counter()
+    importlib.import_module(extension)
 
+    return time.perf_counter() - start
 
-def _cleanup(folders: t.Union[list, str] = 'tmp') -> None:
-    """Cleans up folders after the running of the bot's blocking stops.
 
-    Function will continue clearing files until it is done or a folder cannot be found.
-
-    NOTE: THIS FUNCTION WILL DESTROY ALL FILES CONTAINING '.log', '.pycache', AND/OR '.png'.
-          USE THIS FUNCTION WITH CARE.
-
-    Args:
-        folders (:obj:`t.Union[list, str]`, optional): Folder to have their contents cleared out.
-
-    Returns:
-        bool: Always None.
-
-    Raises:
-        FileNotFoundError: If one of the specified folders cannot be found.
-
-    """
-    folders = [folders] if isinstance(folders, str) else folders
-
-    for folder in folders:
-        if os.path.isdir(path(folder)):
-            for item in os.listdir(path(folder)):
-                if ['.log', '.pycache', '.png'] in item[-4:]:
-                    os.remove(path(folder, item))
-
-        else:
-            raise FileNotFoundError(f'Folder {folder} could not be located.')
+# What `Bot._timed_setup` uses of discord.py's loader. `BotBase` keeps its extensions under a mangled
+# name, with `extensions` being a read-only view of them.
+_LOADER_INTERNALS = ('_BotBase__extensions', '_remove_module_references', '_call_module_finalizers')
 
 
 class Bot(comms.Bot):
     """A subclass where very important tasks and connections are created.
 
     Attributes:
-        config (dict): Tokens and other items from `./config/config.json`.
+        config (:obj:`Config`): Tokens and other items from `./config/config.json`, overridable by
+            `BOT_*` environment variables. Replaced whenever the file changes, dispatching `config_update`.
+        lazy_commands (:obj:`t.Dict[str, str]`): Command names mapped to the deferred extension
+            that provides them. Those extensions are loaded on the first invocation of a command.
+        extension_stamps (:obj:`t.Dict[str, t.Tuple[int, int]]`): Source fingerprints of the loaded
+            extensions, used to only reload the ones that changed.
+        extension_index (:obj:`ExtensionIndex`): The extensions under `./cogs/`, kept up to date
+            in the background. Cogs can use it to look extensions up as well.
+        cleaner (:obj:`Cleaner`): Keeps `./tmp/` within its size and age limits in the background.
+        metrics (:obj:`Metrics`): Invocation counts, latencies and errors of every command and listener.
+        metrics_server (:obj:`t.Optional[asyncio.AbstractServer]`): Serves `metrics` to Prometheus, if
+            a `metrics_port` was given and it could be listened on.
+        cache (:obj:`Cache`): Shared by the cogs for users, members and computed results.
+        outbound (:obj:`Outbound`): Sends messages within the rate limits, without callers waiting on each other.
+        stalls (:obj:`StallDetector`): Logs the stack of whatever blocks the event loop for too long.
+        profiler (:obj:`Profiler`): Samples the event loop's stack while the `profile` command has it running.
+        offloader (:obj:`Offloader`): The process and thread pools behind `offload`.
+        limits (:obj:`Limits`): How many commands may run at once, across the bot and per guild, user and command.
+        closing (bool): If the bot is shutting down, and ignoring new commands.
+        shutdown_timeout (float): Seconds a shutdown waits for running work, and then for its hooks.
 
     """
 
@@ -99,7 +77,12 @@ class Bot(comms.Bot):
 
         Args:
             *args: Variable length argument list.
-            **kwargs: Arbitrary keyword arguments.
+            **kwargs: Arbitrary keyword arguments. `lazy_extensions` maps extension names
+                to the command names that should trigger their loading. `metrics_port` is the
+                local port to serve Prometheus metrics on, if any. `cache` replaces the default
+                in-memory `Cache`, such as with one using a `DiskBackend`. `shutdown_timeout` is
+                the deadline of a graceful shutdown, 10 seconds by default. `limits` replaces the
+                default concurrency `Limits` of commands.
 
         Returns:
             bool: Always None.
@@ -108,16 +91,78 @@ class Bot(comms.Bot):
         # Setting the logger before inheritence occurs.
         self.log = kwargs.pop('log')
 
+        lazy_extensions = kwargs.pop('lazy_extensions', {})
+        metrics_port = kwargs.pop('metrics_port', None)
+        cache = kwargs.pop('cache', None)
+        self.shutdown_timeout = kwargs.pop('shutdown_timeout', 10.0)
+        limits = kwargs.pop('limits', None)
+
         # Initializing the base class `Comms.bot` and inheriting all it's attributes and functions.
         super().__init__(*args, **kwargs)
 
+        self.extension_stamps = {}
+
+        self.closing = False
+        self._closed = None
+        self._commands_running = set()
+        self._overload_notices = set()
+        self._shutdown_hooks = []
+
+        # Indexing `cogs/` once, then watching it instead of listing it on every reload.
+        self.extension_index = ExtensionIndex(path('cogs'), log=self.log)
+        self.extension_index.watch(self.loop)
+
+        # Evicting stale files from `tmp/` while running, instead of only after the bot stops.
+        self.cleaner = Cleaner(path('tmp'), self.log)
+        self.cleaner.start(self.loop)
+        self.add_shutdown_hook(functools.partial(self.cleaner.sweep, everything=True))
+
+        # Timing every command and listener, along with how far behind the event loop is running.
+        self.metrics = Metrics()
+        self.loop.create_task(self.metrics.monitor_lag())
+
+        # Serving metrics only when a port is given, and closing the server along with the bot.
+        self.metrics_server = None
+
+        if metrics_port is not None:
+            self.loop.create_task(self._serve_metrics(metrics_port))
+            self.add_shutdown_hook(self._close_metrics)
+
+        # A cache for the cogs to share, so hot commands don't repeat API calls and work.
+        self.cache = cache if cache is not None else Cache()
+        self.cache.register(self.metrics)
+
+        # Queueing outgoing messages per channel, instead of every command running into the rate limits.
+        self.outbound = Outbound(log=self.log)
+        self.outbound.register(self.metrics)
+
+        # Catching blocking calls in cogs as they happen, which the lag histogram only shows the effect of.
+        # It is started along with the connection, since loading the cogs below blocks the loop on purpose.
+        self.stalls = StallDetector(self.log)
+        self.stalls.register(self.metrics)
+
+        self.profiler = Profiler()
+
+        # Pools for CPU-bound cog work such as rendering images, which would otherwise block the loop.
+        self.offloader = Offloader()
+        self.offloader.register(self.metrics)
+        self.add_shutdown_hook(self.offloader.close)
+
+        # Bounding how many commands run and wait at once, so a flood of messages can't pile up tasks.
+        self.limits = limits if limits is not None else Limits()
+        self.limits.register(self.metrics)
+
+        self.lazy_commands = {
+            (name.lower() if self.case_insensitive else name): extension
+            for extension, names in lazy_extensions.items() for name in names
+        }
+
         # Attempting to open config config
         try:
-            with open(path('config', 'config.json')) as f:
-                self.config = json.load(f)
+            self.config = load(path('config', 'config.json'))
 
-        # If the file could be found but not indexed properly.
-        except IndexError as e:
+        # If the file could be found but not read properly.
+        except (json.JSONDecodeError, ConfigError) as e:
             self.log.critical(
                 f'{e}: Config file found, but token(s) could not be read properly.')
 
@@ -126,15 +171,66 @@ class Bot(comms.Bot):
             self.log.critical(
                 f'{e}: Config file not found. Please refer to the README when setting up.')
 
+        # Picking up edits to the config file without a restart.
+        self.config_watcher = ConfigWatcher(path('config', 'config.json'), self._update_config, self.log)
+        self.config_watcher.start(self.loop)
+
         # Add the main cog required for development and control.
         self.add_cog(Development(self))
 
-        # Loading the cogs in, one by one.
+        # Importing the cogs concurrently, then setting them up.
         asyncio.get_event_loop().run_until_complete(self.load_extensions())
 
+    async def _serve_metrics(self, port: int) -> None:
+        """Starts serving the metrics, logging instead of failing if the port can't be listened on.
+
+        Args:
+            port (int): The local port to serve on.
+
+        Returns:
+            bool: Always None.
+
+        """
+        try:
+            self.metrics_server = await self.metrics.serve(port=port)
+
+        except OSError as e:
+            self.log.warning(f'Error while serving metrics on port {port} error: {e}')
+
+    async def _close_metrics(self) -> None:
+        """Stops serving the metrics, as a shutdown hook.
+
+        Returns:
+            bool: Always None.
+
+        """
+        if self.metrics_server is not None:
+            self.metrics_server.close()
+            await self.metrics_server.wait_closed()
+            self.metrics_server = None
+
+    def _update_config(self, config: Config) -> None:
+        """Swaps in a newly loaded config, then lets the cogs know through `on_config_update(old, new)`.
+
+        Args:
+            config (:obj:`Config`): The new config.
+
+        Returns:
+            bool: Always None.
+
+        """
+        old, self.config = getattr(self, 'config', None), config
+
+        self.dispatch('config_update', old, config)
+
     async def load_extensions(self, blocked_extensions: t.Union[str, list] = None) -> None:
         """Loading in the extensions for the bot.
 
+        Extension modules are imported concurrently in the default executor, since that is where
+        most of the startup time goes. The `setup` functions of the imported modules are then called
+        one at a time on the event loop. Extensions listed in `lazy_commands` are skipped until one of
+        their commands is invoked.
+
         Args:
             blocked_extensions (:obj:`t.Union[str, list]`, optional): Extension(s) to not be loaded.
 
@@ -142,43 +238,322 @@ class Bot(comms.Bot):
             bool: Always None.
 
         Raises:
-            :obj:`ExtensionNotFound`: The extension could not be imported.
-            :obj:`NoEntryPointError`: The extension does not have a setup function.
-            :obj:`ExtensionFailed`: The extension or its setup function had an execution error.
+            :obj:`ExtensionError`: One or more extensions could not be imported or set up.
+
+        """
+        if isinstance(blocked_extensions, str):
+            blocked_extensions = [blocked_extensions]
+
+        skipped = set(blocked_extensions or ()) | set(self.lazy_commands.values())
+        extensions = [e for e in await self.get_extensions() if e not in skipped]
+
+        loop = asyncio.get_event_loop()
+        import_times = await asyncio.gather(
+            *(loop.run_in_executor(None, _timed_import, e) for e in extensions), return_exceptions=True
+        )
+
+        timings = {}
+        broken_extensions = []
+
+        for extension, import_time in zip(extensions, import_times):
+            if isinstance(import_time, Exception):
+                broken_extensions.append((extension, import_time))
+                continue
+
+            try:
+                timings[extension] = (import_time, self._timed_setup(extension))
+
+            except Exception as e:
+                broken_extensions.append((extension, e))
+
+        self._log_timings(timings)
+
+        if broken_extensions:
+            raise comms.ExtensionError(
+                ', '.join(f'{extension}: {error}' for extension, error in broken_extensions),
+                name=broken_extensions[0][0]
+            )
+
+    def _timed_load(self, extension: str) -> float:
+        """Loads an extension, timing its setup.
+
+        Args:
+            extension (str): The extension to be loaded.
+
+        Returns:
+            float: Seconds spent in `load_extension`.
+
+        """
+        start = time.perf_counter()
+        self.load_extension(extension)
+        elapsed = time.perf_counter() - start
+
+        self.extension_stamps[extension] = stamp(extension)
+
+        return elapsed
+
+    def _timed_setup(self, extension: str) -> float:
+        """Sets up an extension whose module was already imported, timing its setup.
+
+        `load_extension` executes the module again, which would run every cog body twice. This is
+        the rest of what it does in discord.py 1.5.1, given the module in `sys.modules`. It relies on
+        private attributes of `BotBase`, so if those aren't there, such as in another version of
+        discord.py, it goes through `load_extension` after all.
+
+        Args:
+            extension (str): The extension to be set up.
+
+        Returns:
+            float: Seconds spent in `setup`.
+
+        Raises:
+            :obj:`comms.NoEntryPointError`: The extension does not have a setup function.
+            :obj:`comms.ExtensionFailed`: The setup function had an execution error.
+
+        """
+        if not all(hasattr(self, name) for name in _LOADER_INTERNALS):
+            return self._timed_load(extension)
+
+        if extension in self.extensions:
+            raise comms.ExtensionAlreadyLoaded(extension)
+
+        start = time.perf_counter()
+        module = sys.modules[extension]
+
+        if not hasattr(module, 'setup'):
+            del sys.modules[extension]
+            raise comms.NoEntryPointError(extension)
+
+        try:
+            module.setup(self)
+
+        except Exception as e:
+            del sys.modules[extension]
+            self._remove_module_references(module.__name__)
+            self._call_module_finalizers(module, extension)
+            raise comms.ExtensionFailed(extension, e) from e
+
+        self._BotBase__extensions[extension] = module
+        elapsed = time.perf_counter() - start
+
+        self.extension_stamps[extension] = stamp(extension)
+
+        return elapsed
+
+    def _log_timings(self, timings: t.Dict[str, t.Tuple[float, float]]) -> None:
+        """Logs a table of import and setup times per extension, slowest first.
+
+        Args:
+            timings (:obj:`t.Dict[str, t.Tuple[float, float]]`): Extension to (import, setup) seconds.
+
+        Returns:
+            bool: Always None.
+
+        """
+        width = max(map(len, timings), default=0)
+        width = max(width, len('extension'))
+
+        self.log.info(f'{"extension":<{width}}  {"import (ms)":>11}  {"setup (ms)":>10}')
+
+        for extension, (imported, setup) in sorted(timings.items(), key=lambda x: -sum(x[1])):
+            self.log.info(f'{extension:<{width}}  {imported * 1000:>11.2f}  {setup * 1000:>10.2f}')
+
+    async def reload_extensions(
+        self, everything: bool = False
+    ) -> t.Tuple[t.List[str], t.List[t.Tuple[str, Exception]]]:
+        """Reloads the extensions whose source changed, along with the extensions depending on them.
+
+        Each reload goes through `reload_extension`, which rolls an extension back to its previous
+        module if the new one fails. A failure does not stop the remaining extensions from reloading.
+        Extensions that weren't loaded from `cogs/`, such as with `load_extension('jishaku')`, are left
+        alone.
+
+        Args:
+            everything (bool, optional): Reload every extension, changed or not. Defaults to False.
+
+        Returns:
+            :obj:`t.Tuple[t.List[str], t.List[t.Tuple[str, Exception]]]`: The extensions that were
+                (re/un)loaded, and the ones that failed along with their error.
 
         """
         extensions = await self.get_extensions()
+        deferred = set(self.lazy_commands.values())
+        loaded = set(self.extensions)
+
+        changed = [
+            e for e in extensions
+            if e not in deferred and (everything or e not in loaded or stamp(e) != self.extension_stamps.get(e))
+        ]
+        dependents = [
+            e for e in loaded.intersection(extensions).difference(changed)
+            if depends_on(self.extensions[e], set(changed))
+        ]
+        # Only the extensions found under `cogs/` before, leaving ones loaded from elsewhere alone.
+        removed = loaded.intersection(self.extension_stamps).difference(extensions)
+
+        done = []
         broken_extensions = []
 
-        for extension in extensions:
+        for extension in removed:
+            try:
+                self.unload_extension(extension)
+
+            except Exception as e:
+                broken_extensions.append((extension, e))
+                continue
+
+            self.extension_stamps.pop(extension, None)
+            done.append(extension)
+
+        for extension in changed + dependents:
             try:
-                self.load_extension(extension)
+                if extension in self.extensions:
+                    self.reload_extension(extension)
+                else:
+                    self.load_extension(extension)
 
             except Exception as e:
                 broken_extensions.append((extension, e))
+                continue
 
-        for extension, error in broken_extensions:
-            raise comms.ExtensionError(f'{extension}: {error}')
+            self.extension_stamps[extension] = stamp(extension)
+            done.append(extension)
+
+        return done, broken_extensions
 
     async def get_extensions(self) -> t.List[str]:
         """Acquiring extensions for the bot to load in.
 
         Returns:
-            :obj:`t.List[str]`: A list containing cogs.
+            :obj:`t.List[str]`: A list containing cogs, from `extension_index` after rescanning it off
+                the event loop, so cogs added since its last poll are there as well.
 
         Raises:
             FileNotFoundError: When the folder 'cogs' cannot be found.
 
         """
-        extensions = []
+        await self.extension_index.update()
 
-        for folder in os.listdir(path('cogs')):
-            extensions.extend(
-                [f'cogs.{folder}.{i[:-3]}' for i in os.listdir(
-                    path('cogs', folder)) if i[-3:] == '.py']
-            )
+        return list(self.extension_index)
+
+    async def get_context(self, message: discord.Message, *, cls: type = comms.Context) -> comms.Context:
+        """Finds the context of a message, loading a deferred extension if it owns the command.
+
+        Args:
+            message (:obj:`discord.Message`): The message to get the invocation context from.
+            cls (type, optional): The factory class that will be used to create the context.
+
+        Returns:
+            :obj:`comms.Context`: The invocation context.
+
+        """
+        ctx = await super().get_context(message, cls=cls)
+
+        if ctx.command is not None or ctx.invoked_with is None:
+            return ctx
+
+        name = ctx.invoked_with.lower() if self.case_insensitive else ctx.invoked_with
+
+        if name in self.lazy_commands:
+            extension = self.lazy_commands[name]
+
+            # Forgetting every command of the extension, so a broken one isn't retried each message.
+            self.lazy_commands = {k: v for k, v in self.lazy_commands.items() if v != extension}
+
+            try:
+                self.log.info(f'Loaded deferred "{extension}" in {self._timed_load(extension) * 1000:.2f}ms')
+
+            except Exception as e:
+                self.log.warning(f'Error while loading deferred "{extension}" error: {e}')
+
+            ctx.command = self.all_commands.get(ctx.invoked_with)
+
+        return ctx
+
+    async def invoke(self, ctx: comms.Context) -> None:
+        """Invokes a command, recording how long it took and if it failed.
+
+        Commands wait for their turn under `limits`, and are shed with a notice if its queues are full.
+        They are ignored once the bot is closing, and running ones are tracked for closing to wait on.
+
+        Args:
+            ctx (:obj:`comms.Context`): Represents the context in which a command is being invoked under.
+
+        Returns:
+            bool: Always None.
+
+        """
+        if ctx.command is None:
+            return await super().invoke(ctx)
+
+        if self.closing:
+            return
+
+        task = asyncio.current_task()
+        self._commands_running.add(task)
+
+        start = time.perf_counter()
+
+        try:
+            async with self.limits.hold(ctx):
+                await super().invoke(ctx)
+
+        # Shedding the command with a notice, instead of queueing work that would only run late.
+        except Overloaded as e:
+            ctx.command_failed = True
+            self._notify_overloaded(ctx, e)
+
+        finally:
+            self._commands_running.discard(task)
+
+        self.metrics.observe(
+            f'command:{ctx.command.qualified_name}', time.perf_counter() - start, ctx.command_failed
+        )
+
+    def _notify_overloaded(self, ctx: comms.Context, error: Overloaded) -> None:
+        """Tells a channel that its commands are being shed, at most once at a time per channel.
+
+        Args:
+            ctx (:obj:`comms.Context`): Represents the context in which a command is being invoked under.
+            error (:obj:`Overloaded`): Which limit was full.
+
+        Returns:
+            bool: Always None.
+
+        """
+        channel = getattr(ctx.channel, 'id', None)
+
+        if channel in self._overload_notices:
+            return
+
+        self._overload_notices.add(channel)
+
+        future = self.outbound.send(ctx.channel, f'Busy, please try again in a moment. {error}', delete_after=7)
+        future.add_done_callback(lambda _: self._overload_notices.discard(channel))
+
+    async def _run_event(self, coro: t.Callable, event_name: str, *args, **kwargs) -> None:
+        """Runs a listener, recording how long it took and if it failed.
+
+        Returns:
+            bool: Always None.
+
+        """
+        metrics = self.metrics
+        handler = f'event:{event_name[3:]}'
 
-        return extensions
+        async def timed(*args, **kwargs) -> None:
+            start = time.perf_counter()
+
+            try:
+                await coro(*args, **kwargs)
+
+            except Exception:
+                metrics.observe(handler, time.perf_counter() - start, failed=True)
+                raise
+
+            metrics.observe(handler, time.perf_counter() - start)
+
+        await super()._run_event(timed, event_name, *args, **kwargs)
 
     async def on_ready(self) -> None:
         """Updates the bot status when logged in successfully.
@@ -197,16 +572,134 @@ class Bot(comms.Bot):
 
         self.log.warning('Awaiting...')
 
-    async def logout(self) -> None:
-        """Subclassing the logout command to ensure anything running is stopped properly.
+    async def offload(self, func: t.Callable, *args, **kwargs) -> t.Any:
+        """Runs blocking work in a process (or with `process=False`, a thread), without blocking the loop.
+
+        Args:
+            func (:obj:`t.Callable`): The function to run, defined at the top level of a module.
+            *args: Variable length argument list, passed on to `func`.
+            **kwargs: Arbitrary keyword arguments, passed on to `Offloader.run` and then `func`.
+
+        Returns:
+            :obj:`t.Any`: What `func` returned. Bytes-like results of processes come back as a
+                `SharedBuffer` to be closed, such as with a `with` block.
+
+        Examples:
+            >>> with await self.bot.offload(render_png, expression, timeout=10) as image:
+            ...     await ctx.send(file=discord.File(io.BytesIO(image.buf), 'graph.png'))
+
+        """
+        return await self.offloader.run(func, *args, **kwargs)
+
+    def add_shutdown_hook(self, hook: t.Callable[[], t.Awaitable[t.Any]]) -> None:
+        """Registers a coroutine function to be awaited when the bot shuts down.
+
+        Hooks run concurrently, after the running commands and queued messages are done, and are
+        cancelled if they take longer than `shutdown_timeout`.
+
+        Args:
+            hook (:obj:`t.Callable[[], t.Awaitable[t.Any]]`): Called without arguments.
+
+        Returns:
+            bool: Always None.
+
+        """
+        self._shutdown_hooks.append(hook)
+
+    async def start(self, *args, **kwargs) -> None:
+        """Watches the event loop for stalls, then logs in and connects, shutting down gracefully on SIGTERM.
+
+        `Bot.run` stops the event loop on SIGTERM, cancelling whatever is running. Closing instead
+        lets the commands and messages in progress finish, which keeps restarts from dropping work.
+
+        Args:
+            *args: Variable length argument list, passed on to `comms.Bot.start`.
+            **kwargs: Arbitrary keyword arguments, passed on to `comms.Bot.start`.
+
+        Returns:
+            bool: Always None.
+
+        """
+        try:
+            self.loop.add_signal_handler(signal.SIGTERM, lambda: self.loop.create_task(self.close()))
+
+        except NotImplementedError:
+            pass
+
+        self.stalls.start(self.loop)
+
+        await super().start(*args, **kwargs)
+
+    async def close(self) -> None:
+        """Shuts down without dropping work, which `logout` and the `exit` command go through as well.
+
+        New commands are ignored from here on. Within `shutdown_timeout` seconds, the running commands
+        are waited for and the queued messages are sent, cancelling whatever is left at the deadline.
+        The shutdown hooks then run concurrently, under a deadline of the same length. Lastly the
+        connection is closed and the queued log records are rendered.
+
+        Only the first call shuts down, and every later one waits for it to finish, such as `Bot.run`
+        closing again after a SIGTERM. The shutdown carries on if a caller is cancelled.
 
         Returns:
             bool: Always None.
 
         """
-        # Do extra stuff
+        if self._closed is None:
+            self.closing = True
+            self._closed = asyncio.ensure_future(self._close(asyncio.current_task()))
 
-        return await super().logout()
+        await asyncio.shield(self._closed)
+
+    async def _close(self, caller: t.Optional[asyncio.Task]) -> None:
+        """The shutdown behind `close`, run once.
+
+        Args:
+            caller (:obj:`t.Optional[asyncio.Task]`): The task that closed first, such as the command
+                logging out.
+
+        Returns:
+            bool: Always None.
+
+        """
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + self.shutdown_timeout
+
+        self.extension_index.stop()
+        self.cleaner.stop()
+        self.config_watcher.stop()
+        self.stalls.stop()
+        self.profiler.stop()
+
+        # Leaving out the command that is logging out, which would be waiting on itself.
+        commands = self._commands_running - {caller}
+
+        if commands:
+            _, pending = await asyncio.wait(commands, timeout=self.shutdown_timeout)
+
+            for task in pending:
+                task.cancel()
+
+            if pending:
+                self.log.warning(f'Cancelled {len(pending)} command(s) still running at the deadline.')
+
+        if not await self.outbound.close(timeout=max(deadline - loop.time(), 0)):
+            self.log.warning('Dropped the messages that could not be sent before the deadline.')
+
+        # Hooks get a deadline of their own, since cleaning up matters even when commands ran late.
+        results = await asyncio.gather(
+            *(asyncio.wait_for(hook(), self.shutdown_timeout) for hook in self._shutdown_hooks),
+            return_exceptions=True
+        )
+
+        for hook, result in zip(self._shutdown_hooks, results):
+            if isinstance(result, Exception):
+                self.log.warning(f'Error while running shutdown hook "{hook}" error: {result!r}')
+
+        await super().close()
+
+        # The listener thread is still rendering, so this waits for it off the event loop.
+        await loop.run_in_executor(None, logs.flush)
 
 
 class Development(comms.Cog):
@@ -242,35 +735,87 @@ class Development(comms.Cog):
         return await self.bot.is_owner(ctx.author)
 
     @comms.command(name='reload', aliases=['refresh', 'r'], hidden=True)
-    async def _reload(self, ctx: comms.Context) -> None:
-        """Gets the cogs within folders and loads them into the bot after unloading current cogs.
+    async def _reload(self, ctx: comms.Context, mode: str = 'changed') -> None:
+        """Reloads the cogs that changed on disk, along with the cogs depending on them.
+
+        Cogs that fail to reload are rolled back to their previous version, and the rest carry on.
 
         Args:
             ctx (:obj:`comms.Context`): Represents the context in which a command is being invoked under.
-
-        Raises:
-            Anything besides comms.ExtensionNotLoaded when loading cogs.
+            mode (str, optional): 'all' to reload every cog regardless of changes. Defaults to 'changed'.
 
         Command examples:
             >>> [prefix]r
-            >>> [prefix]refresh
+            >>> [prefix]refresh all
 
         """
-        for cog in await self.bot.get_extensions():
-            # Attempting to unload the load the extension back in.
-            try:
-                self.bot.unload_extension(cog)
-                self.bot.load_extension(cog)
+        start = time.perf_counter()
+        reloaded, broken_extensions = await self.bot.reload_extensions(everything=mode == 'all')
+        elapsed = (time.perf_counter() - start) * 1000
 
-            # If the extension was created after the bot initialized startup.
-            except comms.ExtensionNotLoaded:
-                self.bot.load_extension(cog)
+        for cog, e in broken_extensions:
+            self.bot.log.warning(f'Error while loading "{cog}" error: {e}')
 
-            # If a fatal error occurs.
-            except Exception as e:
-                return self.bot.log.warning(f'Error while loading "{cog}" error: {e}')
+        message = f'Reloaded {len(reloaded)} extension(s) in {elapsed:.2f}ms.'
+
+        if broken_extensions:
+            message += f' Kept the previous version of: {", ".join(cog for cog, _ in broken_extensions)}.'
+
+        await self.bot.outbound.send(ctx.channel, message, delete_after=7)
+
+    @comms.command(name='stats', hidden=True)
+    async def _stats(self, ctx: comms.Context) -> None:
+        """Shows the call counts, error rates and latency percentiles of the busiest handlers.
+
+        Args:
+            ctx (:obj:`comms.Context`): Represents the context in which a command is being invoked under.
+
+        Returns:
+            bool: Always None.
 
-        await ctx.send('Reloaded extensions.', delete_after=7)
+        Command examples:
+            >>> [prefix]stats
+
+        """
+        await self.bot.outbound.send(ctx.channel, f'```\n{self.bot.metrics.table()}\n```')
+
+    @comms.command(name='profile', hidden=True)
+    async def _profile(self, ctx: comms.Context, action: str = 'stop') -> None:
+        """Starts or stops sampling the event loop, writing the samples out for a flamegraph when stopped.
+
+        Args:
+            ctx (:obj:`comms.Context`): Represents the context in which a command is being invoked under.
+            action (str, optional): 'start' or 'stop'. Defaults to 'stop'.
+
+        Returns:
+            bool: Always None.
+
+        Command examples:
+            >>> [prefix]profile start
+            >>> [prefix]profile stop
+
+        """
+        profiler = self.bot.profiler
+
+        if action not in ('start', 'stop'):
+            message = f"Unknown action \"{action}\", expected 'start' or 'stop'."
+
+        elif action == 'start':
+            profiler.start()
+            message = 'Profiling the event loop.'
+
+        elif not profiler.running:
+            message = 'The profiler is not running.'
+
+        else:
+            profiler.stop()
+
+            filepath = path('tmp', f'profile-{time.strftime("%Y%m%d-%H%M%S")}.folded')
+            samples = await asyncio.get_event_loop().run_in_executor(None, profiler.write, filepath)
+
+            message = f'Wrote {samples} samples to {filepath.name}, for `flamegraph.pl` or speedscope.'
+
+        await self.bot.outbound.send(ctx.channel, message, delete_after=7)
 
     @comms.command(name='exit', aliases=['logout', 'disconnect'], hidden=True)
     async def _exit(self, ctx: comms.Context) -> None:
@@ -312,22 +857,28 @@ if __name__ == "__main__":
     if not os.path.isdir(path('tmp')):
         os.mkdir(path('tmp'))
 
+    # Serving Prometheus metrics only when asked to, such as with `BOT_METRICS_PORT=9100`.
+    metrics_port = os.environ.get('BOT_METRICS_PORT')
+
     # Initializing the subclass of `comms.Bot`.
     bot = Bot(
-        command_prefix=';', case_insensitive=True, help_command=None, log=_rich_logger()
+        command_prefix=';',
+        case_insensitive=True,
+        help_command=None,
+        log=logs.rich_logger(),
+        metrics_port=int(metrics_port) if metrics_port else None
     )
 
     # Attempting to run the bot (blocking, obviously).
     try:
-        bot.run(bot.config['discord'], bot=True, reconnect=True)
+        bot.run(bot.config.discord, bot=True, reconnect=True)
 
     # If the token is incorrect or not given.
     except (discord.errors.HTTPException, discord.errors.LoginFailure):
         bot.log.critical('Improper token has been passed.')
 
-    # Removing any stray files within the `tmp` directory
-    bot.log.warning('Cleaning up tmp/...')
-
-    _cleanup()
+    # Any stray files within the `tmp` directory were removed by a shutdown hook.
+    bot.log.info(f'Cleanup complete, reclaimed {bot.cleaner.reclaimed} bytes in total.')
 
-    bot.log.info('Cleanup complete.')
+    # Rendering the records still queued before the interpreter exits.
+    logs.stop()
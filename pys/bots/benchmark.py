@@ -0,0 +1,235 @@
+"""Offline command dispatch benchmark for the bots in this folder.
+
+Synthetic gateway `MESSAGE_CREATE` payloads are fed to the bot's connection state, so every message
+goes through the same path a real one would: `Message` parsing, `on_message`, `process_commands`,
+`get_context`, checks, argument parsing and the command itself. Replies are answered by a local
+stand-in for the HTTP client, so nothing ever reaches Discord.
+
+Usage:
+    python benchmark.py [--messages 5000] [most_basic more_basic basic]
+
+"""
+
+import argparse
+import asyncio
+import importlib
+import itertools
+import logging
+import statistics
+import time
+import tracemalloc
+import typing as t
+from types import SimpleNamespace
+
+import discord
+from discord.ext import commands as comms
+
+from limits import Limits
+from outbound import Outbound
+
+
+OWNER_ID = 1
+BOT_ID = 2
+CHANNEL_ID = 3
+
+# Messages sent to every bot, with a label for the report. Commands a bot doesn't have are skipped.
+WORKLOAD = (
+    ('chatter', 'just talking, not a command'),
+    ('unknown', ';nothing'),
+    ('ping', ';ping'),
+    ('echo', ';echo some words to parse'),
+    ('help', ';help'),
+    ('stats', ';stats')
+)
+
+
+class Bench(comms.Cog):
+    """Commands with a known, tiny cost, so the time left over is the bot's own overhead."""
+
+    @comms.command(name='ping')
+    async def _ping(self, ctx: comms.Context) -> None:
+        await ctx.send('pong')
+
+    @comms.command(name='echo')
+    async def _echo(self, ctx: comms.Context, *, text: str) -> None:
+        await ctx.send(text)
+
+
+class FakeHTTP:
+    """Stands in for `discord.http.HTTPClient`, answering sends with a made up message."""
+
+    def __init__(self) -> None:
+        self.sent = 0
+        self._ids = itertools.count(10 ** 17)
+
+    async def send_message(self, channel_id: int, content: str, **kwargs) -> dict:
+        self.sent += 1
+
+        return _payload(next(self._ids), content, BOT_ID, channel_id)
+
+    async def delete_message(self, channel_id: int, message_id: int, **kwargs) -> None:
+        pass
+
+
+def _payload(message_id: int, content: str, author_id: int, channel_id: int = CHANNEL_ID) -> dict:
+    """Builds a `MESSAGE_CREATE` payload the way the gateway would send it for a DM."""
+    return {
+        'id': message_id,
+        'channel_id': channel_id,
+        'content': content,
+        'author': {'id': author_id, 'username': f'user{author_id}', 'discriminator': '0001', 'avatar': None},
+        'attachments': [],
+        'embeds': [],
+        'mentions': [],
+        'mention_roles': [],
+        'mention_everyone': False,
+        'pinned': False,
+        'tts': False,
+        'type': 0,
+        'edited_timestamp': None
+    }
+
+
+def _bot(module_name: str) -> comms.Bot:
+    """Builds the `Bot` of a module with a fake HTTP client, without loading any cogs from disk."""
+    module = importlib.import_module(module_name)
+
+    class BenchBot(module.Bot):
+
+        async def load_extensions(self, *args, **kwargs) -> None:
+            pass
+
+        async def on_command_error(self, ctx: comms.Context, error: comms.CommandError) -> None:
+            # The default handler prints every `CommandNotFound` to stderr, which would be all that's measured.
+            pass
+
+        def _schedule_event(self, coro: t.Callable, event_name: str, *args, **kwargs) -> asyncio.Task:
+            # Keeping hold of every event task, so a message can be waited on until it is fully handled.
+            task = super()._schedule_event(coro, event_name, *args, **kwargs)
+            self.pending.append(task)
+
+            return task
+
+    log = logging.getLogger(module_name)
+    log.addHandler(logging.NullHandler())
+    log.propagate = False
+
+    bot = BenchBot(command_prefix=';', case_insensitive=True, help_command=None, owner_id=OWNER_ID, log=log)
+    bot.pending = []
+    bot.add_cog(Bench())
+
+    # Lifting the rate limits, which would otherwise be all that is measured.
+    if isinstance(getattr(bot, 'outbound', None), Outbound):
+        bot.outbound = Outbound(log=log, route_rate=10 ** 9, global_rate=10 ** 9)
+
+    # Likewise for the concurrency limits, which are still taken so their overhead is measured.
+    if isinstance(getattr(bot, 'limits', None), Limits):
+        bot.limits = Limits(total=(10 ** 9, 0), guild=(10 ** 9, 0), user=(10 ** 9, 0))
+
+    bot.http = bot._connection.http = FakeHTTP()
+    bot._connection.user = SimpleNamespace(id=BOT_ID)
+
+    # A real DM channel, so replies sent with `channel.send` reach the fake HTTP client as well.
+    recipient = _payload(0, '', OWNER_ID)['author']
+    bot._connection._add_private_channel(
+        discord.DMChannel(me=bot.user, state=bot._connection, data={'id': CHANNEL_ID, 'recipients': [recipient]})
+    )
+
+    return bot
+
+
+async def _drain(bot: comms.Bot) -> None:
+    """Waits until every event the messages so far caused has been handled."""
+    while bot.pending:
+        tasks, bot.pending = bot.pending, []
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _run(bot: comms.Bot, messages: int) -> t.Dict[str, t.Any]:
+    state = bot._connection
+    ids = itertools.count(1)
+    workload = [
+        (label, content) for label, content in WORKLOAD
+        if label in ('chatter', 'unknown') or bot.get_command(label)
+    ]
+
+    # Warming caches and lazily built objects before anything is measured.
+    for _, content in workload:
+        state.parse_message_create(_payload(next(ids), content, OWNER_ID))
+    await _drain(bot)
+
+    # One message at a time, for the latency of each kind of message.
+    latency = {}
+
+    for label, content in workload:
+        samples = latency[label] = []
+
+        for _ in range(max(messages // len(workload), 1)):
+            start = time.perf_counter()
+            state.parse_message_create(_payload(next(ids), content, OWNER_ID))
+            await _drain(bot)
+            samples.append(time.perf_counter() - start)
+
+    # Every message at once, for throughput and memory.
+    burst = [
+        _payload(next(ids), content, OWNER_ID)
+        for _, content in itertools.islice(itertools.cycle(workload), messages)
+    ]
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+
+    for payload in burst:
+        state.parse_message_create(payload)
+    await _drain(bot)
+
+    elapsed = time.perf_counter() - start
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'latency': latency,
+        'throughput': messages / elapsed,
+        'retained': (after - before) / messages,
+        'peak': (peak - before) / messages,
+        'sent': bot.http.sent
+    }
+
+
+def _quantile(samples: t.List[float], q: float) -> float:
+    return statistics.quantiles(samples, n=100)[int(q * 100) - 1] if len(samples) > 1 else samples[0]
+
+
+def _report(module_name: str, results: t.Dict[str, t.Any]) -> None:
+    print(f'\n{module_name}: {results["throughput"]:,.0f} msg/s, {results["retained"]:,.0f} B/msg retained, '
+          f'{results["peak"]:,.0f} B/msg peak, {results["sent"]} replies')
+    print(f'  {"message":<10}  {"p50 (us)":>9}  {"p95 (us)":>9}  {"p99 (us)":>9}')
+
+    for label, samples in results['latency'].items():
+        p50, p95, p99 = (_quantile(samples, q) * 10 ** 6 for q in (0.5, 0.95, 0.99))
+        print(f'  {label:<10}  {p50:>9.1f}  {p95:>9.1f}  {p99:>9.1f}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('modules', nargs='*', default=['most_basic', 'more_basic', 'basic'])
+    parser.add_argument('--messages', type=int, default=5000)
+    args = parser.parse_args()
+
+    asyncio.set_event_loop(asyncio.new_event_loop())
+    loop = asyncio.get_event_loop()
+
+    for module_name in args.modules:
+        bot = _bot(module_name)
+        _report(module_name, loop.run_until_complete(_run(bot, args.messages)))
+
+        # Stopping the bot's background tasks, so they don't skew the next bot's numbers.
+        for task in asyncio.all_tasks(loop):
+            task.cancel()
+
+        loop.run_until_complete(asyncio.sleep(0))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+import asyncio
+import collections
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import sys
+import time
+import typing as t
+import weakref
+
+
+class MemoryBackend:
+    """Keeps cached values in a dictionary. Sizes are estimated with `sys.getsizeof`, which is shallow."""
+
+    def __init__(self) -> None:
+        self._values = {}
+
+    def load(self, key: t.Hashable) -> t.Any:
+        return self._values[key]
+
+    def store(self, key: t.Hashable, value: t.Any) -> int:
+        self._values[key] = value
+
+        return sys.getsizeof(value)
+
+    def remove(self, key: t.Hashable) -> None:
+        self._values.pop(key, None)
+
+    def clear(self) -> None:
+        self._values.clear()
+
+
+class DiskBackend:
+    """Keeps cached values as pickles in a folder, so large values don't stay in memory.
+
+    The pickles go in a subfolder of their own, which is emptied on creation, since the cache's index
+    of what is stored doesn't survive restarts. Anything else in the given folder is left alone.
+
+    Attributes:
+        folder (str): The subfolder holding the pickles.
+
+    """
+
+    def __init__(self, folder: t.Union[str, os.PathLike], name: str = 'cache') -> None:
+        """Creating important attributes for this class.
+
+        Args:
+            folder (:obj:`t.Union[str, os.PathLike]`): Where the subfolder is created, such as `tmp/`.
+            name (str, optional): The name of the subfolder, which nothing else may use. Defaults to 'cache'.
+
+        Returns:
+            bool: Always None.
+
+        """
+        self.folder = os.path.join(os.fspath(folder), name)
+
+        os.makedirs(self.folder, exist_ok=True)
+        self.clear()
+
+    def load(self, key: t.Hashable) -> t.Any:
+        try:
+            with open(self._file(key), 'rb') as f:
+                return pickle.load(f)
+
+        except FileNotFoundError:
+            raise KeyError(key) from None
+
+    def store(self, key: t.Hashable, value: t.Any) -> int:
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+        with open(self._file(key), 'wb') as f:
+            f.write(data)
+
+        return len(data)
+
+    def remove(self, key: t.Hashable) -> None:
+        try:
+            os.remove(self._file(key))
+
+        except FileNotFoundError:
+            pass
+
+    def clear(self) -> None:
+        for item in os.listdir(self.folder):
+            if item.endswith('.pickle'):
+                os.remove(os.path.join(self.folder, item))
+
+    def _file(self, key: t.Hashable) -> str:
+        return os.path.join(self.folder, f'{hashlib.sha1(repr(key).encode()).hexdigest()}.pickle')
+
+
+class Cache:
+    """A cache with per-entry TTLs, evicting the least recently used entries past its limits.
+
+    Attributes:
+        max_entries (int): The amount of entries kept at most.
+        max_bytes (:obj:`t.Optional[int]`): The size the entries may take up, as reported by the backend.
+        ttl (:obj:`t.Optional[float]`): Seconds an entry stays valid, unless given per entry.
+        hits (int): Lookups that found a valid entry.
+        misses (int): Lookups that didn't.
+        evictions (int): Entries removed to stay within the limits.
+        size (int): The size the entries take up, as reported by the backend.
+
+    """
+
+    def __init__(
+        self,
+        backend: t.Optional[t.Union[MemoryBackend, DiskBackend]] = None,
+        max_entries: int = 4096,
+        max_bytes: t.Optional[int] = 64 * 1024 ** 2,
+        ttl: t.Optional[float] = 5 * 60
+    ) -> None:
+        """Creating important attributes for this class.
+
+        Args:
+            backend (:obj:`t.Optional[t.Union[MemoryBackend, DiskBackend]]`, optional): Where the values
+                are kept. Defaults to a `MemoryBackend`.
+            max_entries (int, optional): The amount of entries kept at most. Defaults to 4096.
+            max_bytes (:obj:`t.Optional[int]`, optional): The size the entries may take up. Defaults to 64MiB.
+            ttl (:obj:`t.Optional[float]`, optional): Seconds an entry stays valid. Defaults to five minutes.
+
+        Returns:
+            bool: Always None.
+
+        """
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size = 0
+
+        # Key to (expiry, size), least recently used first.
+        self._index = collections.OrderedDict()
+        self._pending = {}
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: t.Hashable) -> bool:
+        entry = self._index.get(key)
+
+        return entry is not None and (entry[0] is None or entry[0] > time.monotonic())
+
+    def get(self, key: t.Hashable, default: t.Any = None) -> t.Any:
+        """Gets a value, counting the lookup as a hit or a miss.
+
+        Args:
+            key (:obj:`t.Hashable`): The key the value was stored under.
+            default (:obj:`t.Any`, optional): Returned if there is no valid entry. Defaults to None.
+
+        Returns:
+            :obj:`t.Any`: The value, or `default`.
+
+        """
+        if key not in self:
+            self.delete(key)
+            self.misses += 1
+
+            return default
+
+        try:
+            value = self.backend.load(key)
+
+        except KeyError:
+            self.delete(key)
+            self.misses += 1
+
+            return default
+
+        self._index.move_to_end(key)
+        self.hits += 1
+
+        return value
+
+    def set(self, key: t.Hashable, value: t.Any, ttl: t.Optional[float] = None) -> None:
+        """Stores a value, evicting the least recently used entries if the cache is then too big.
+
+        Args:
+            key (:obj:`t.Hashable`): The key to store the value under.
+            value (:obj:`t.Any`): The value to store.
+            ttl (:obj:`t.Optional[float]`, optional): Seconds the entry stays valid. Defaults to `self.ttl`.
+
+        Returns:
+            bool: Always None.
+
+        """
+        self.delete(key)
+
+        ttl = ttl if ttl is not None else self.ttl
+        size = self.backend.store(key, value)
+
+        self._index[key] = (time.monotonic() + ttl if ttl is not None else None, size)
+        self.size += size
+
+        while self._index and (
+            len(self._index) > self.max_entries or (self.max_bytes is not None and self.size > self.max_bytes)
+        ):
+            self.delete(next(iter(self._index)))
+            self.evictions += 1
+
+    def delete(self, key: t.Hashable) -> None:
+        """Removes an entry, if there is one.
+
+        Args:
+            key (:obj:`t.Hashable`): The key the value was stored under.
+
+        Returns:
+            bool: Always None.
+
+        """
+        entry = self._index.pop(key, None)
+
+        if entry is not None:
+            self.size -= entry[1]
+            self.backend.remove(key)
+
+    def clear(self) -> None:
+        """Removes every entry.
+
+        Returns:
+            bool: Always None.
+
+        """
+        self._index.clear()
+        self.backend.clear()
+        self.size = 0
+
+    def memoize(
+        self, ttl: t.Optional[float] = None, key: t.Optional[t.Callable[..., t.Hashable]] = None
+    ) -> t.Callable:
+        """Caches the results of a function or coroutine function.
+
+        Concurrent calls to a coroutine function with the same key share the call that is already running.
+
+        Args:
+            ttl (:obj:`t.Optional[float]`, optional): Seconds a result stays valid. Defaults to `self.ttl`.
+            key (:obj:`t.Optional[t.Callable[..., t.Hashable]]`, optional): Builds the key from the arguments.
+                Defaults to the arguments themselves, which then have to be hashable.
+
+        Returns:
+            :obj:`t.Callable`: The decorator.
+
+        Examples:
+            >>> @bot.cache.memoize(ttl=60, key=lambda user_id: user_id)
+            ... async def fetch_user(user_id):
+            ...     return await bot.fetch_user(user_id)
+
+        """
+        def decorator(func: t.Callable) -> t.Callable:
+            def make_key(args: tuple, kwargs: dict) -> t.Hashable:
+                return (func.__qualname__, key(*args, **kwargs) if key else (args, tuple(sorted(kwargs.items()))))
+
+            if inspect.iscoroutinefunction(func):
+
+                @functools.wraps(func)
+                async def wrapper(*args, **kwargs) -> t.Any:
+                    k = make_key(args, kwargs)
+                    value = self.get(k, _MISSING)
+
+                    if value is not _MISSING:
+                        return value
+
+                    if k not in self._pending:
+                        self._pending[k] = asyncio.ensure_future(func(*args, **kwargs))
+                        self._pending[k].add_done_callback(functools.partial(self._finish, k, ttl))
+
+                    return await asyncio.shield(self._pending[k])
+
+            else:
+
+                @functools.wraps(func)
+                def wrapper(*args, **kwargs) -> t.Any:
+                    k = make_key(args, kwargs)
+                    value = self.get(k, _MISSING)
+
+                    if value is _MISSING:
+                        value = func(*args, **kwargs)
+                        self.set(k, value, ttl)
+
+                    return value
+
+            return wrapper
+
+        return decorator
+
+    def _finish(self, k: t.Hashable, ttl: t.Optional[float], future: asyncio.Future) -> None:
+        # Running when the call is done, even if every caller waiting for it was cancelled.
+        if self._pending.get(k) is future:
+            del self._pending[k]
+
+        if not future.cancelled() and future.exception() is None and k not in self:
+            self.set(k, future.result(), ttl)
+
+    def register(self, metrics: t.Any) -> None:
+        """Exports the hit, miss and eviction counts, along with the cache's size, to a `stats.Metrics`.
+
+        Args:
+            metrics (:obj:`stats.Metrics`): Where to export the numbers to.
+
+        Returns:
+            bool: Always None.
+
+        """
+        metrics.gauge('bot_cache_hits', lambda: self.hits)
+        metrics.gauge('bot_cache_misses', lambda: self.misses)
+        metrics.gauge('bot_cache_evictions', lambda: self.evictions)
+        metrics.gauge('bot_cache_entries', lambda: len(self))
+        metrics.gauge('bot_cache_bytes', lambda: self.size)
+
+
+def cached(ttl: t.Optional[float] = None, key: t.Optional[t.Callable[..., t.Hashable]] = None) -> t.Callable:
+    """Caches the results of a cog's method in its bot's `cache`, which isn't known when the cog is defined.
+
+    Args:
+        ttl (:obj:`t.Optional[float]`, optional): Seconds a result stays valid. Defaults to the cache's TTL.
+        key (:obj:`t.Optional[t.Callable[..., t.Hashable]]`, optional): Builds the key from the arguments,
+            not including `self`. Defaults to the arguments themselves.
+
+    Returns:
+        :obj:`t.Callable`: The decorator.
+
+    Examples:
+        >>> class Graphs(comms.Cog):
+        ...     @cached(ttl=60)
+        ...     async def render(self, expression: str) -> bytes:
+        ...         ...
+
+    """
+    def decorator(func: t.Callable) -> t.Callable:
+        # Keyed by the cache itself rather than its id, which a new cache can reuse once the old one is collected.
+        memoized = weakref.WeakKeyDictionary()
+
+        def make_key(_self: t.Any, *args, **kwargs) -> t.Hashable:
+            return key(*args, **kwargs) if key else (args, tuple(sorted(kwargs.items())))
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs) -> t.Any:
+            cache = self.bot.cache
+
+            # Memoizing once per cache, leaving `self` out of the key so reloaded cogs share the entries.
+            if cache not in memoized:
+                memoized[cache] = cache.memoize(ttl, make_key)(func)
+
+            return memoized[cache](self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+_MISSING = object()
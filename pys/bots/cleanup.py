@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import os
+import time
+import typing as t
+
+
+def sweep(
+    folder: t.Union[str, os.PathLike],
+    max_bytes: t.Optional[int] = None,
+    max_age: t.Optional[float] = None,
+    suffixes: t.Tuple[str, ...] = ('.log', '.png')
+) -> int:
+    """Removes files from a folder until it is within its size and age limits.
+
+    Files are evicted least recently used first, where "used" is the later of the access and
+    modification times. A file is evicted if it is older than `max_age`, or while the files left
+    take up more than `max_bytes`.
+
+    NOTE: `sweep(folder, max_bytes=0)` REMOVES EVERY FILE ENDING WITH ONE OF `suffixes`.
+
+    Args:
+        folder (:obj:`t.Union[str, os.PathLike]`): Folder to have its contents cleared out.
+        max_bytes (:obj:`t.Optional[int]`, optional): Total size the files may take up. Defaults to no limit.
+        max_age (:obj:`t.Optional[float]`, optional): Seconds a file may go unused. Defaults to no limit.
+        suffixes (:obj:`t.Tuple[str, ...]`, optional): Endings of the files that may be removed.
+
+    Returns:
+        int: The amount of bytes reclaimed. 0 if the folder doesn't exist.
+
+    """
+    try:
+        with os.scandir(folder) as entries:
+            files = []
+
+            for entry in entries:
+                if entry.name.endswith(suffixes) and entry.is_file():
+                    stat = entry.stat()
+                    files.append((max(stat.st_atime, stat.st_mtime), stat.st_size, entry.path))
+
+    except FileNotFoundError:
+        return 0
+
+    files.sort()
+
+    total = sum(size for _, size, _ in files)
+    oldest = time.time() - max_age if max_age is not None else None
+    reclaimed = 0
+
+    for used, size, file in files:
+        expired = oldest is not None and used < oldest
+        oversized = max_bytes is not None and total > max_bytes
+
+        # Everything after this file has been used more recently, so nothing else can be evicted.
+        if not expired and not oversized:
+            break
+
+        try:
+            os.remove(file)
+
+        except FileNotFoundError:
+            pass
+
+        else:
+            reclaimed += size
+
+        total -= size
+
+    return reclaimed
+
+
+class Cleaner:
+    """Sweeps a folder on an interval, with the file I/O done in the loop's default executor.
+
+    Attributes:
+        folder (:obj:`os.PathLike`): Folder to have its contents cleared out.
+        max_bytes (:obj:`t.Optional[int]`): Total size the files may take up.
+        max_age (:obj:`t.Optional[float]`): Seconds a file may go unused.
+        interval (float): Seconds between sweeps.
+        reclaimed (int): The amount of bytes reclaimed since the cleaner was created.
+
+    """
+
+    def __init__(
+        self,
+        folder: t.Union[str, os.PathLike],
+        log: logging.Logger,
+        max_bytes: t.Optional[int] = 256 * 1024 ** 2,
+        max_age: t.Optional[float] = 60 * 60,
+        interval: float = 5 * 60
+    ) -> None:
+        """Creating important attributes for this class.
+
+        Args:
+            folder (:obj:`t.Union[str, os.PathLike]`): Folder to have its contents cleared out.
+            log (:obj:`logging.Logger`): Where the amount of reclaimed bytes is reported to.
+            max_bytes (:obj:`t.Optional[int]`, optional): Total size the files may take up. Defaults to 256MiB.
+            max_age (:obj:`t.Optional[float]`, optional): Seconds a file may go unused. Defaults to an hour.
+            interval (float, optional): Seconds between sweeps. Defaults to five minutes.
+
+        Returns:
+            bool: Always None.
+
+        """
+        self.folder = folder
+        self.log = log
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.interval = interval
+        self.reclaimed = 0
+
+        self._task = None
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Starts sweeping in the background.
+
+        Args:
+            loop (:obj:`asyncio.AbstractEventLoop`): The loop to run the sweeps on.
+
+        Returns:
+            bool: Always None.
+
+        """
+        if self._task is None:
+            self._task = loop.create_task(self._run())
+
+    def stop(self) -> None:
+        """Stops sweeping in the background.
+
+        Returns:
+            bool: Always None.
+
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def sweep(self, everything: bool = False) -> int:
+        """Sweeps the folder once, without blocking the event loop.
+
+        Args:
+            everything (bool, optional): Remove every file regardless of the limits, such as when
+                the bot stops. Defaults to False.
+
+        Returns:
+            int: The amount of bytes reclaimed.
+
+        """
+        loop = asyncio.get_event_loop()
+        reclaimed = await loop.run_in_executor(
+            None, sweep, self.folder, 0 if everything else self.max_bytes, self.max_age
+        )
+
+        if reclaimed:
+            self.reclaimed += reclaimed
+            self.log.info(f'Reclaimed {reclaimed} bytes from {self.folder}.')
+
+        return reclaimed
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+
+            except OSError as e:
+                self.log.warning(f'Error while cleaning up {self.folder} error: {e}')
+
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,314 @@
+import asyncio
+import importlib.util
+import logging
+import os
+import threading
+import types
+import typing as t
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+
+class _Folder(t.NamedTuple):
+    """What was found directly inside of a folder the last time it was scanned."""
+
+    mtime: int
+    modules: t.Dict[str, str]
+    folders: t.List[str]
+
+
+class _Handler(FileSystemEventHandler):
+    """Marks the index as stale whenever something under the watched folder changes."""
+
+    def __init__(self, index: 'ExtensionIndex', loop: asyncio.AbstractEventLoop) -> None:
+        self.index = index
+        self.loop = loop
+
+    def on_any_event(self, event: t.Any) -> None:
+        self.loop.call_soon_threadsafe(setattr, self.index, '_stale', True)
+
+
+class ExtensionIndex:
+    """An index of the extensions found under a folder, such as `cogs/`.
+
+    Every `.py` file at any depth is an extension, named by its dotted path from the root's parent
+    (`cogs/fun/nested/plot.py` becomes `cogs.fun.nested.plot`). Files and folders starting with an
+    underscore are skipped, which leaves room for `__init__.py` and helper modules.
+
+    The index is scanned once, then kept up to date either by a `watchdog` observer, if that library
+    is installed, or by polling folder modification times. Rescans only list the folders whose
+    modification time changed, and lookups are dictionary lookups. If a change was seen, lookups on
+    the event loop answer from the last scan while the default executor rescans, so await `update`
+    to see a change right away. Elsewhere, and for the very first scan, lookups rescan on the spot.
+
+    Attributes:
+        root (str): The folder holding the extensions.
+        log (:obj:`logging.Logger`): Where failed background rescans are logged to.
+
+    """
+
+    def __init__(self, root: t.Union[str, os.PathLike], log: t.Optional[logging.Logger] = None) -> None:
+        """Creating the index. Nothing is scanned until it is first used.
+
+        Args:
+            root (:obj:`t.Union[str, os.PathLike]`): The folder holding the extensions.
+            log (:obj:`t.Optional[logging.Logger]`, optional): Where failed background rescans are
+                logged to. Defaults to the logger of this module.
+
+        Returns:
+            bool: Always None.
+
+        """
+        self.root = os.fspath(root)
+        self.log = log if log is not None else logging.getLogger(__name__)
+
+        self._package = os.path.basename(os.path.normpath(self.root))
+        self._extensions = {}
+        self._folders = {}
+        self._stale = True
+        self._lock = threading.Lock()
+        self._observer = None
+        self._task = None
+        self._pending = None
+
+    def __contains__(self, extension: str) -> bool:
+        return extension in self._current()
+
+    def __iter__(self) -> t.Iterator[str]:
+        return iter(self._current())
+
+    def __len__(self) -> int:
+        return len(self._current())
+
+    def get(self, extension: str) -> t.Optional[str]:
+        """Gets the file an extension is loaded from.
+
+        Args:
+            extension (str): The dotted name of the extension.
+
+        Returns:
+            :obj:`t.Optional[str]`: The path to the extension's file, or None if it isn't indexed.
+
+        """
+        return self._current().get(extension)
+
+    def refresh(self) -> bool:
+        """Rescans the folders whose modification time changed since the last scan.
+
+        Returns:
+            bool: If any extension was added or removed.
+
+        Raises:
+            FileNotFoundError: When the root folder cannot be found.
+
+        """
+        if not os.path.isdir(self.root):
+            raise FileNotFoundError(f'Folder {self.root} could not be located.')
+
+        with self._lock:
+            self._stale = False
+
+            folders = {}
+            stack = [(self.root, self._package)]
+
+            while stack:
+                folder, package = stack.pop()
+
+                cached = self._folders.get(folder)
+
+                # A folder can be removed, or stop being readable, between being listed and scanned.
+                try:
+                    mtime = os.stat(folder).st_mtime_ns
+                    fresh = cached is not None and cached.mtime == mtime
+                    found = cached if fresh else _scan(folder, package, mtime)
+
+                except OSError:
+                    continue
+
+                folders[folder] = found
+                stack.extend((f, f'{package}.{os.path.basename(f)}') for f in found.folders)
+
+            self._folders = folders
+
+            extensions = {}
+
+            for found in folders.values():
+                extensions.update(found.modules)
+
+            extensions = dict(sorted(extensions.items()))
+            changed = extensions.keys() != self._extensions.keys()
+            self._extensions = extensions
+
+        return changed
+
+    async def update(self) -> bool:
+        """Rescans like `refresh`, in the default executor instead of on the event loop.
+
+        Changes are found whether or not they were noticed yet, such as a cog added since the last poll.
+
+        Returns:
+            bool: If any extension was added or removed.
+
+        Raises:
+            FileNotFoundError: When the root folder cannot be found.
+
+        """
+        return await asyncio.get_event_loop().run_in_executor(None, self.refresh)
+
+    def watch(self, loop: asyncio.AbstractEventLoop, interval: float = 2.0) -> None:
+        """Keeps the index up to date in the background.
+
+        Args:
+            loop (:obj:`asyncio.AbstractEventLoop`): The loop the index is used from.
+            interval (float, optional): Seconds between polls when `watchdog` isn't installed.
+
+        Returns:
+            bool: Always None.
+
+        """
+        if self._observer is not None or self._task is not None:
+            return
+
+        if Observer is not None:
+            self._observer = Observer()
+            self._observer.schedule(_Handler(self, loop), self.root, recursive=True)
+            self._observer.daemon = True
+            self._observer.start()
+
+        else:
+            self._task = loop.create_task(self._poll(interval))
+
+    def stop(self) -> None:
+        """Stops keeping the index up to date.
+
+        Returns:
+            bool: Always None.
+
+        """
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _poll(self, interval: float) -> None:
+        loop = asyncio.get_event_loop()
+
+        while True:
+            await asyncio.sleep(interval)
+
+            try:
+                await loop.run_in_executor(None, self.refresh)
+
+            except FileNotFoundError:
+                self._stale = True
+
+            except OSError as e:
+                self._stale = True
+                self.log.warning(f'Error while rescanning {self.root} error: {e}')
+
+    def _current(self) -> t.Dict[str, str]:
+        extensions = self._extensions
+
+        if not self._stale:
+            return extensions
+
+        try:
+            loop = asyncio.get_running_loop()
+
+        except RuntimeError:
+            loop = None
+
+        if loop is None or not self._folders:
+            self.refresh()
+
+            return self._extensions
+
+        # On the event loop, answer from the last scan rather than listing folders on the spot.
+        if self._pending is None:
+            self._pending = loop.run_in_executor(None, self.refresh)
+            self._pending.add_done_callback(self._refreshed)
+
+        return extensions
+
+    def _refreshed(self, future: asyncio.Future) -> None:
+        self._pending = None
+
+        if future.cancelled():
+            return
+
+        e = future.exception()
+
+        if e is not None:
+            self._stale = True
+
+            if not isinstance(e, FileNotFoundError):
+                self.log.warning(f'Error while rescanning {self.root} error: {e}')
+
+
+def stamp(extension: str) -> t.Optional[t.Tuple[int, int]]:
+    """Gets a cheap fingerprint of an extension's source file.
+
+    Args:
+        extension (str): The dotted module name of the extension.
+
+    Returns:
+        :obj:`t.Optional[t.Tuple[int, int]]`: Modification time in nanoseconds and size in bytes,
+            or None if the source file cannot be found.
+
+    """
+    try:
+        spec = importlib.util.find_spec(extension)
+        stat = os.stat(spec.origin)
+
+    except (ImportError, AttributeError, TypeError, OSError):
+        return None
+
+    return stat.st_mtime_ns, stat.st_size
+
+
+def depends_on(module: types.ModuleType, names: t.Set[str]) -> bool:
+    """Checks if a module holds references to any of the given modules or their contents.
+
+    Args:
+        module (:obj:`types.ModuleType`): The module to inspect.
+        names (:obj:`t.Set[str]`): Dotted names of the modules that may be depended on.
+
+    Returns:
+        bool: True if a global of `module` is one of, or was defined in one of, `names`.
+
+    """
+    for value in vars(module).values():
+        name = value.__name__ if isinstance(value, types.ModuleType) else getattr(value, '__module__', None)
+
+        if name in names:
+            return True
+
+    return False
+
+
+def _scan(folder: str, package: str, mtime: int) -> _Folder:
+    """Lists the modules and subfolders directly inside of a folder."""
+    modules = {}
+    folders = []
+
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.name.startswith(('_', '.')):
+                continue
+
+            if entry.is_dir():
+                folders.append(entry.path)
+
+            elif entry.name.endswith('.py'):
+                modules[f'{package}.{entry.name[:-3]}'] = entry.path
+
+    return _Folder(mtime, modules, folders)
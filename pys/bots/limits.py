@@ -0,0 +1,234 @@
+import asyncio
+import collections
+import contextlib
+import re
+import typing as t
+
+from discord.ext import commands as comms
+
+
+class Overloaded(comms.CommandError):
+    """Raised when a command can't wait for its turn, because the queue of one of its limits is full.
+
+    Attributes:
+        scope (str): The limit that was full, such as 'user'.
+
+    """
+
+    def __init__(self, scope: str) -> None:
+        self.scope = scope
+
+        super().__init__(f'Too many {scope} commands are waiting to run.')
+
+
+class _Gate:
+    __slots__ = ('running', 'waiters')
+
+    def __init__(self) -> None:
+        self.running = 0
+        self.waiters = collections.deque()
+
+
+class Limit:
+    """Lets `concurrency` holders per key run at once, with up to `queue` more waiting per key.
+
+    Keys are created when first acquired and forgotten once idle, so a limit per user doesn't grow
+    with every user ever seen.
+
+    Attributes:
+        scope (str): What the keys are, such as 'user'.
+        concurrency (int): Holders per key running at once.
+        queue (int): Holders per key waiting at most, past which `Overloaded` is raised.
+        shed (int): Acquisitions refused because a queue was full.
+
+    """
+
+    def __init__(self, scope: str, concurrency: int, queue: int) -> None:
+        self.scope = scope
+        self.concurrency = concurrency
+        self.queue = queue
+
+        self.shed = 0
+        self._gates = {}
+
+    @property
+    def running(self) -> int:
+        return sum(gate.running for gate in self._gates.values())
+
+    @property
+    def queued(self) -> int:
+        return sum(len(gate.waiters) for gate in self._gates.values())
+
+    async def acquire(self, key: t.Hashable) -> None:
+        """Waits for a free slot under a key.
+
+        Args:
+            key (:obj:`t.Hashable`): Such as the ID of a user.
+
+        Returns:
+            bool: Always None.
+
+        Raises:
+            :obj:`Overloaded`: If the key's queue is full.
+
+        """
+        gate = self._gates.get(key)
+
+        if gate is None:
+            gate = self._gates[key] = _Gate()
+
+        if gate.running < self.concurrency and not gate.waiters:
+            gate.running += 1
+            return
+
+        if len(gate.waiters) >= self.queue:
+            self.shed += 1
+            raise Overloaded(self.scope)
+
+        future = asyncio.get_event_loop().create_future()
+        gate.waiters.append(future)
+
+        try:
+            await future
+
+        except asyncio.CancelledError:
+            # The slot may have been handed over just before the cancellation, and has to be passed on.
+            # A release that ran after the cancellation has already popped the future.
+            if future.done() and not future.cancelled():
+                self.release(key)
+            elif future in gate.waiters:
+                gate.waiters.remove(future)
+
+            raise
+
+    def release(self, key: t.Hashable) -> None:
+        """Frees a slot under a key, handing it to the longest waiting holder.
+
+        Args:
+            key (:obj:`t.Hashable`): The key given to `acquire`.
+
+        Returns:
+            bool: Always None.
+
+        """
+        gate = self._gates[key]
+
+        while gate.waiters:
+            future = gate.waiters.popleft()
+
+            if not future.done():
+                return future.set_result(None)
+
+        gate.running -= 1
+
+        if not gate.running:
+            del self._gates[key]
+
+
+class Limits:
+    """Concurrency limits for commands, across the bot and per guild, user and command.
+
+    A command takes a slot of every limit, the most specific ones first, so a user flooding the bot
+    waits in their own queue without holding the slots everyone else needs.
+
+    Attributes:
+        limits (:obj:`t.List[t.Tuple[Limit, t.Callable[[comms.Context], t.Hashable]]]`): Each limit,
+            along with how the key is found from the context of a command.
+
+    """
+
+    def __init__(
+        self,
+        total: t.Optional[t.Tuple[int, int]] = (64, 256),
+        guild: t.Optional[t.Tuple[int, int]] = (8, 32),
+        user: t.Optional[t.Tuple[int, int]] = (2, 4),
+        commands: t.Optional[t.Dict[str, t.Tuple[int, int]]] = None
+    ) -> None:
+        """Creating important attributes for this class.
+
+        Every limit is a tuple of concurrency and queue size, or None to not limit that scope.
+
+        Args:
+            total (:obj:`t.Optional[t.Tuple[int, int]]`, optional): Commands across the bot.
+                Defaults to 64 running and 256 waiting.
+            guild (:obj:`t.Optional[t.Tuple[int, int]]`, optional): Commands per guild, where direct
+                messages count as one guild. Defaults to 8 running and 32 waiting.
+            user (:obj:`t.Optional[t.Tuple[int, int]]`, optional): Commands per user.
+                Defaults to 2 running and 4 waiting.
+            commands (:obj:`t.Optional[t.Dict[str, t.Tuple[int, int]]]`, optional): Limits of single
+                commands by their qualified name, such as expensive ones. Defaults to none.
+
+        Returns:
+            bool: Always None.
+
+        """
+        self.limits = []
+
+        if user is not None:
+            self.limits.append((Limit('user', *user), lambda ctx: ctx.author.id))
+
+        if guild is not None:
+            self.limits.append((Limit('guild', *guild), lambda ctx: getattr(ctx.guild, 'id', None)))
+
+        for name, limit in (commands or {}).items():
+            self.limits.append((Limit(f'command:{name}', *limit), _by_command(name)))
+
+        if total is not None:
+            self.limits.append((Limit('total', *total), lambda ctx: None))
+
+    @contextlib.asynccontextmanager
+    async def hold(self, ctx: comms.Context) -> t.AsyncIterator[None]:
+        """Holds a slot of every limit that applies to a command while it runs.
+
+        Args:
+            ctx (:obj:`comms.Context`): Represents the context in which a command is being invoked under.
+
+        Raises:
+            :obj:`Overloaded`: If the queue of a limit is full.
+
+        """
+        held = []
+
+        try:
+            for limit, key in self.limits:
+                k = key(ctx)
+
+                if k is _SKIP:
+                    continue
+
+                await limit.acquire(k)
+                held.append((limit, k))
+
+            yield
+
+        finally:
+            for limit, k in reversed(held):
+                limit.release(k)
+
+    def register(self, metrics: t.Any) -> None:
+        """Exports the running, queued and shed commands of every limit to a `stats.Metrics`.
+
+        Args:
+            metrics (:obj:`stats.Metrics`): Where to export the numbers to.
+
+        Returns:
+            bool: Always None.
+
+        """
+        for limit, _ in self.limits:
+            name = re.sub(r'\W', '_', limit.scope)
+
+            metrics.gauge(f'bot_limit_{name}_running', lambda limit=limit: limit.running)
+            metrics.gauge(f'bot_limit_{name}_queued', lambda limit=limit: limit.queued)
+            metrics.gauge(f'bot_limit_{name}_shed', lambda limit=limit: limit.shed)
+
+
+def _by_command(name: str) -> t.Callable[[comms.Context], t.Hashable]:
+    """Keys a command's own limit, skipping every other command."""
+    def key(ctx: comms.Context) -> t.Hashable:
+        return None if ctx.command.qualified_name == name else _SKIP
+
+    return key
+
+
+_SKIP = object()
@@ -0,0 +1,124 @@
+import json
+import logging
+import os
+import queue
+import typing as t
+from logging import handlers
+
+from rich import logging as r_logging, traceback as r_traceback
+
+
+_listener = None
+
+
+class _QueueHandler(handlers.QueueHandler):
+    """Puts records on the queue untouched, leaving all of the formatting to the listener's thread.
+
+    The stock handler formats every record before queueing it, so it can be pickled. The records
+    never leave this process, so that work (and the loss of `exc_info` for rich tracebacks) is skipped.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class JSONFormatter(logging.Formatter):
+    """Formats records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': record.created,
+            'level': record.levelname,
+            'logger': record.name,
+            'module': record.module,
+            'line': record.lineno,
+            'message': record.getMessage()
+        }
+
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+
+        return json.dumps(entry, default=str)
+
+
+def rich_logger(
+    log_type: int = logging.INFO,
+    json_file: t.Optional[t.Union[str, os.PathLike]] = None,
+    levels: t.Optional[t.Dict[str, int]] = None,
+    max_bytes: int = 10 * 1024 ** 2,
+    backup_count: int = 5
+) -> logging.Logger:
+    """Logs information with the rich library with fancy tracebacks, from a background thread.
+
+    Log calls only put the record on a queue. A `QueueListener` thread renders them to the terminal
+    and, optionally, to a rotating JSON-lines file. Calling this again replaces the listener and
+    handlers of the previous call, after rendering what they had queued.
+
+    Args:
+        log_type (int, optional): The level of logging to be used. Defaults to `logging.INFO`.
+        json_file (:obj:`t.Optional[t.Union[str, os.PathLike]]`, optional): File to also store the logs in.
+        levels (:obj:`t.Optional[t.Dict[str, int]]`, optional): Levels for specific loggers,
+            such as `{'discord': logging.WARNING}`.
+        max_bytes (int, optional): Size at which the JSON-lines file is rotated. Defaults to 10MiB.
+        backup_count (int, optional): Amount of rotated JSON-lines files to keep. Defaults to 5.
+
+    Returns:
+        :obj:`logging.Logger`: The object that the bot will use to log information to.
+
+    """
+    global _listener
+
+    # One listener at a time, or the previous one's thread and files would be left open.
+    stop()
+
+    r_traceback.install()
+
+    sinks = [r_logging.RichHandler()]
+    sinks[0].setFormatter(logging.Formatter('%(message)s', datefmt='[%c]'))
+
+    if json_file is not None:
+        sink = handlers.RotatingFileHandler(json_file, maxBytes=max_bytes, backupCount=backup_count)
+        sink.setFormatter(JSONFormatter())
+        sinks.append(sink)
+
+    records = queue.Queue()
+
+    _listener = handlers.QueueListener(records, *sinks)
+    _listener.start()
+
+    logging.basicConfig(level=log_type, handlers=[_QueueHandler(records)], force=True)
+
+    for name, level in (levels or {}).items():
+        logging.getLogger(name).setLevel(level)
+
+    # different message types: info, debug, warning, critical
+    return logging.getLogger("rich")
+
+
+def flush() -> None:
+    """Blocks until every record queued so far has been rendered.
+
+    Returns:
+        bool: Always None.
+
+    """
+    if _listener is not None:
+        _listener.queue.join()
+
+
+def stop() -> None:
+    """Renders the records left in the queue, then stops the background thread and closes its handlers.
+
+    Returns:
+        bool: Always None.
+
+    """
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+
+        for handler in _listener.handlers:
+            handler.close()
+
+        _listener = None
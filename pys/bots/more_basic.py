@@ -1,44 +1,17 @@
 import asyncio
 import json
-import logging
 import os
+import time
 import typing as t
-import sys
 
 import discord
 from discord.ext import commands as comms
-from rich import logging as r_logging, traceback as r_traceback
 
-
-def path(*filepath: t.Iterable[str]) -> str:
-    lst = [
-        os.path.abspath(os.path.dirname(sys.argv[0])),
-        (os.sep).join(str(y) for y in filepath)
-    ]
-    return (os.sep).join(str(s) for s in lst)
-
-
-def _rich_logger(log_type: int = logging.INFO) -> logging.Logger:
-    r_traceback.install()
-
-    logging.basicConfig(
-        level=log_type, format='%(message)s', datefmt="[%c]", handlers=[r_logging.RichHandler()]
-    )
-
-    return logging.getLogger("rich")
-
-
-def _cleanup(folders: t.Union[list, str] = 'tmp') -> None:
-    folders = [folders] if isinstance(folders, str) else folders
-
-    for folder in folders:
-        if os.path.isdir(path(folder)):
-            for item in os.listdir(path(folder)):
-                if ['.log', '.pycache', '.png'] in item[-4:]:
-                    os.remove(path(folder, item))
-
-        else:
-            raise FileNotFoundError(f'Folder {folder} could not be located.')
+import logs
+from cleanup import Cleaner, sweep
+from extensions import ExtensionIndex, depends_on, stamp
+from paths import path
+from settings import Config, ConfigError, ConfigWatcher, load
 
 
 class Bot(comms.Bot):
@@ -48,11 +21,19 @@ class Bot(comms.Bot):
 
         super().__init__(*args, **kwargs)
 
+        self.extension_stamps = {}
+        self._closed = None
+
+        self.extension_index = ExtensionIndex(path('cogs'), log=self.log)
+        self.extension_index.watch(self.loop)
+
+        self.cleaner = Cleaner(path('tmp'), self.log)
+        self.cleaner.start(self.loop)
+
         try:
-            with open(path('config', 'config.json')) as f:
-                self.config = json.load(f)
+            self.config = load(path('config', 'config.json'))
 
-        except IndexError as e:
+        except (json.JSONDecodeError, ConfigError) as e:
             self.log.critical(
                 f'{e}: Config file found, but token(s) could not be read properly.')
 
@@ -60,10 +41,18 @@ class Bot(comms.Bot):
             self.log.critical(
                 f'{e}: Config file not found. Please refer to the README when setting up.')
 
+        self.config_watcher = ConfigWatcher(path('config', 'config.json'), self._update_config, self.log)
+        self.config_watcher.start(self.loop)
+
         self.add_cog(Development(self))
 
         asyncio.get_event_loop().run_until_complete(self.load_extensions())
 
+    def _update_config(self, config: Config) -> None:
+        old, self.config = getattr(self, 'config', None), config
+
+        self.dispatch('config_update', old, config)
+
     async def load_extensions(self, blocked_extensions: t.Union[str, list] = None) -> None:
         extensions = await self.get_extensions()
         broken_extensions = []
@@ -71,6 +60,7 @@ class Bot(comms.Bot):
         for extension in extensions:
             try:
                 self.load_extension(extension)
+                self.extension_stamps[extension] = stamp(extension)
 
             except Exception as e:
                 broken_extensions.append((extension, e))
@@ -78,16 +68,57 @@ class Bot(comms.Bot):
         for extension, error in broken_extensions:
             raise comms.ExtensionError(f'{extension}: {error}')
 
-    async def get_extensions(self) -> t.List[str]:
-        extensions = []
+    async def reload_extensions(
+        self, everything: bool = False
+    ) -> t.Tuple[t.List[str], t.List[t.Tuple[str, Exception]]]:
+        extensions = await self.get_extensions()
+        loaded = set(self.extensions)
+
+        changed = [
+            e for e in extensions
+            if everything or e not in loaded or stamp(e) != self.extension_stamps.get(e)
+        ]
+        dependents = [
+            e for e in loaded.intersection(extensions).difference(changed)
+            if depends_on(self.extensions[e], set(changed))
+        ]
+        # Only the extensions found under `cogs/` before, leaving ones loaded from elsewhere alone.
+        removed = loaded.intersection(self.extension_stamps).difference(extensions)
+
+        done = []
+        broken_extensions = []
+
+        for extension in removed:
+            try:
+                self.unload_extension(extension)
+
+            except Exception as e:
+                broken_extensions.append((extension, e))
+                continue
+
+            self.extension_stamps.pop(extension, None)
+            done.append(extension)
+
+        for extension in changed + dependents:
+            try:
+                if extension in self.extensions:
+                    self.reload_extension(extension)
+                else:
+                    self.load_extension(extension)
+
+            except Exception as e:
+                broken_extensions.append((extension, e))
+                continue
 
-        for folder in os.listdir(path('cogs')):
-            extensions.extend(
-                [f'cogs.{folder}.{i[:-3]}' for i in os.listdir(
-                    path('cogs', folder)) if i[-3:] == '.py']
-            )
+            self.extension_stamps[extension] = stamp(extension)
+            done.append(extension)
 
-        return extensions
+        return done, broken_extensions
+
+    async def get_extensions(self) -> t.List[str]:
+        await self.extension_index.update()
+
+        return list(self.extension_index)
 
     async def on_ready(self) -> None:
         self.log.warning('Awaiting...')
@@ -96,6 +127,20 @@ class Bot(comms.Bot):
 
         return await super().logout()
 
+    async def close(self) -> None:
+        if self._closed is None:
+            self._closed = asyncio.ensure_future(self._close())
+
+        await asyncio.shield(self._closed)
+
+    async def _close(self) -> None:
+        self.extension_index.stop()
+        self.cleaner.stop()
+        self.config_watcher.stop()
+
+        await super().close()
+        await asyncio.get_event_loop().run_in_executor(None, logs.flush)
+
 
 class Development(comms.Cog):
 
@@ -106,19 +151,20 @@ class Development(comms.Cog):
         return await self.bot.is_owner(ctx.author)
 
     @comms.command(name='reload', aliases=['refresh', 'r'], hidden=True)
-    async def _reload(self, ctx: comms.Context) -> None:
-        for cog in await self.bot.get_extensions():
-            try:
-                self.bot.unload_extension(cog)
-                self.bot.load_extension(cog)
+    async def _reload(self, ctx: comms.Context, mode: str = 'changed') -> None:
+        start = time.perf_counter()
+        reloaded, broken_extensions = await self.bot.reload_extensions(everything=mode == 'all')
+        elapsed = (time.perf_counter() - start) * 1000
 
-            except comms.ExtensionNotLoaded:
-                self.bot.load_extension(cog)
+        for cog, e in broken_extensions:
+            self.bot.log.warning(f'Error while loading "{cog}" error: {e}')
 
-            except Exception as e:
-                return self.bot.log.warning(f'Error while loading "{cog}" error: {e}')
+        message = f'Reloaded {len(reloaded)} extension(s) in {elapsed:.2f}ms.'
+
+        if broken_extensions:
+            message += f' Kept the previous version of: {", ".join(cog for cog, _ in broken_extensions)}.'
 
-        await ctx.send('Reloaded extensions.', delete_after=7)
+        await ctx.send(message, delete_after=7)
 
     @comms.command(name='exit', aliases=['logout', 'disconnect'], hidden=True)
     async def _exit(self, ctx: comms.Context) -> None:
@@ -132,15 +178,16 @@ if __name__ == "__main__":
         os.mkdir(path('tmp'))
 
     bot = Bot(
-        command_prefix=';', case_insensitive=True, help_command=None, log=_rich_logger()
+        command_prefix=';', case_insensitive=True, help_command=None, log=logs.rich_logger()
     )
 
     try:
-        bot.run(bot.config['discord'], bot=True, reconnect=True)
+        bot.run(bot.config.discord, bot=True, reconnect=True)
 
     except (discord.errors.HTTPException, discord.errors.LoginFailure):
         bot.log.critical('Improper token has been passed.')
 
     bot.log.warning('Cleaning up tmp/...')
-    _cleanup()
-    bot.log.info('Cleanup complete.')
+    reclaimed = sweep(path('tmp'), max_bytes=0)
+    bot.log.info(f'Cleanup complete, reclaimed {bot.cleaner.reclaimed + reclaimed} bytes in total.')
+    logs.stop()
@@ -1,17 +1,9 @@
 import json
-import os
-import typing as t
-import sys
 
 from discord.ext import commands as comms
 
-
-def path(*filepath: t.Iterable[str]) -> str:
-    lst = [
-        os.path.abspath(os.path.dirname(sys.argv[0])),
-        (os.sep).join(str(y) for y in filepath)
-    ]
-    return (os.sep).join(str(s) for s in lst)
+from paths import path
+from settings import ConfigError, load
 
 
 class Bot(comms.Bot):
@@ -20,10 +12,9 @@ class Bot(comms.Bot):
         super().__init__(*args, **kwargs)
 
         try:
-            with open(path('config', 'config.json')) as f:
-                self.config = json.load(f)
+            self.config = load(path('config', 'config.json'))
 
-        except IndexError as e:
+        except (json.JSONDecodeError, ConfigError) as e:
             print(f'{e}: Config file found, but token(s) could not be read properly.')
 
         except FileNotFoundError as e:
@@ -53,4 +44,4 @@ class Development(comms.Cog):
 if __name__ == "__main__":
     bot = Bot(command_prefix=';', case_insensitive=True, help_command=None)
 
-    bot.run(bot.config['discord'], bot=True, reconnect=True)
+    bot.run(bot.config.discord, bot=True, reconnect=True)
@@ -0,0 +1,185 @@
+import asyncio
+import concurrent.futures
+import functools
+import multiprocessing
+import typing as t
+from multiprocessing import shared_memory
+
+
+class SharedBuffer:
+    """Bytes a worker process returned through shared memory, instead of pickling them back.
+
+    The memory stays allocated until `close` is called, which happens on leaving a `with` block.
+
+    Attributes:
+        buf (:obj:`memoryview`): The bytes, without copying them.
+
+    Examples:
+        >>> with await bot.offload(render_png, expression) as image:
+        ...     await ctx.send(file=discord.File(io.BytesIO(image.buf), 'graph.png'))
+
+    """
+
+    def __init__(self, name: str, size: int) -> None:
+        self._memory = shared_memory.SharedMemory(name)
+        self.buf = self._memory.buf[:size]
+
+    def __len__(self) -> int:
+        return len(self.buf)
+
+    def __bytes__(self) -> bytes:
+        return self.buf.tobytes()
+
+    def __enter__(self) -> 'SharedBuffer':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Releases the memory. `buf` can't be used afterwards.
+
+        Returns:
+            bool: Always None.
+
+        """
+        if self._memory is not None:
+            self.buf.release()
+            self._memory.close()
+            self._memory.unlink()
+            self._memory = None
+
+
+class _Shared(t.NamedTuple):
+    """What a worker process sends back instead of a bytes-like result."""
+    name: str
+    size: int
+
+
+def _call(func: t.Callable, args: tuple, kwargs: dict) -> t.Any:
+    """Runs a function in a worker process, moving a bytes-like result into shared memory."""
+    result = func(*args, **kwargs)
+
+    if not isinstance(result, (bytes, bytearray, memoryview)):
+        return result
+
+    data = memoryview(result).cast('B')
+    memory = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+    memory.buf[:len(data)] = data
+    memory.close()
+
+    return _Shared(memory.name, len(data))
+
+
+def _discard(future: concurrent.futures.Future) -> None:
+    """Frees the shared memory of a result nobody is waiting for anymore."""
+    if not future.cancelled() and future.exception() is None and isinstance(future.result(), _Shared):
+        SharedBuffer(*future.result()).close()
+
+
+class Offloader:
+    """Runs blocking work away from the event loop, in a pool of processes or threads.
+
+    Processes are for CPU-bound work such as rendering images, which would hold the GIL in a thread.
+    Threads are for blocking calls that release it, such as file I/O. The pools are created on first use.
+
+    Attributes:
+        processes (:obj:`t.Optional[int]`): Size of the process pool. Defaults to the amount of CPUs.
+        threads (:obj:`t.Optional[int]`): Size of the thread pool. Defaults to `ThreadPoolExecutor`'s.
+        running (int): Calls being waited for.
+
+    """
+
+    def __init__(self, processes: t.Optional[int] = None, threads: t.Optional[int] = None) -> None:
+        self.processes = processes
+        self.threads = threads
+
+        self.running = 0
+        self._process_pool = None
+        self._thread_pool = None
+
+    async def run(
+        self, func: t.Callable, *args, process: bool = True, timeout: t.Optional[float] = None, **kwargs
+    ) -> t.Any:
+        """Runs a function in a pool, without blocking the event loop.
+
+        Results of processes that are bytes-like come back as a `SharedBuffer`, which has to be
+        closed. Cancelling, or running out of time, abandons a call that already started; it still
+        runs to completion in its worker, and its result is thrown away.
+
+        Args:
+            func (:obj:`t.Callable`): The function to run. For processes it has to be importable,
+                so defined at the top level of a module, and its arguments have to be picklable.
+            *args: Variable length argument list, passed on to `func`.
+            process (bool, optional): Run in the process pool instead of the thread pool. Defaults to True.
+            timeout (:obj:`t.Optional[float]`, optional): Seconds to wait for the result. Defaults to no limit.
+            **kwargs: Arbitrary keyword arguments, passed on to `func`.
+
+        Returns:
+            :obj:`t.Any`: What `func` returned, or a `SharedBuffer` holding it.
+
+        Raises:
+            :obj:`asyncio.TimeoutError`: If `func` took longer than `timeout`.
+
+        """
+        if process:
+            future = self._processes().submit(_call, func, args, kwargs)
+        else:
+            future = self._threads().submit(functools.partial(func, *args, **kwargs))
+
+        self.running += 1
+
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            future.cancel()
+            future.add_done_callback(_discard)
+            raise
+
+        finally:
+            self.running -= 1
+
+        return SharedBuffer(*result) if isinstance(result, _Shared) else result
+
+    async def close(self) -> None:
+        """Waits for the running calls, then shuts the pools down.
+
+        Returns:
+            bool: Always None.
+
+        """
+        pools = [pool for pool in (self._process_pool, self._thread_pool) if pool is not None]
+        self._process_pool = self._thread_pool = None
+
+        loop = asyncio.get_event_loop()
+
+        # Shutting down blocks until the workers exit, so it happens off the event loop.
+        await asyncio.gather(*(loop.run_in_executor(None, pool.shutdown) for pool in pools))
+
+    def register(self, metrics: t.Any) -> None:
+        """Exports the amount of calls running to a `stats.Metrics`.
+
+        Args:
+            metrics (:obj:`stats.Metrics`): Where to export the numbers to.
+
+        Returns:
+            bool: Always None.
+
+        """
+        metrics.gauge('bot_offload_running', lambda: self.running)
+
+    def _processes(self) -> concurrent.futures.ProcessPoolExecutor:
+        if self._process_pool is None:
+            # Spawning, since forking a process that runs threads (the log listener) isn't safe.
+            self._process_pool = concurrent.futures.ProcessPoolExecutor(
+                self.processes, mp_context=multiprocessing.get_context('spawn')
+            )
+
+        return self._process_pool
+
+    def _threads(self) -> concurrent.futures.ThreadPoolExecutor:
+        if self._thread_pool is None:
+            self._thread_pool = concurrent.futures.ThreadPoolExecutor(self.threads, thread_name_prefix='offload')
+
+        return self._thread_pool
@@ -0,0 +1,318 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+import typing as t
+
+import discord
+
+
+class TokenBucket:
+    """Allows `rate` actions every `per` seconds, in bursts of up to `rate`.
+
+    Attributes:
+        rate (int): Actions allowed per period.
+        per (float): Length of a period in seconds.
+
+    """
+
+    def __init__(self, rate: int, per: float) -> None:
+        self.rate = rate
+        self.per = per
+
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+    def delay(self) -> float:
+        """Seconds until an action is allowed, 0 if it is allowed now."""
+        now = time.monotonic()
+
+        self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate / self.per)
+        self._updated = now
+
+        if now < self._paused_until:
+            return self._paused_until - now
+
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) * self.per / self.rate
+
+    def take(self) -> None:
+        self._tokens -= 1
+
+    def pause(self, seconds: float) -> None:
+        """Allows nothing for a while, such as when Discord says the bucket is exhausted."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+
+    async def acquire(self) -> None:
+        while True:
+            delay = self.delay()
+
+            if not delay:
+                return self.take()
+
+            await asyncio.sleep(delay)
+
+
+class _Item(t.NamedTuple):
+    priority: int
+    order: int
+    content: t.Optional[str]
+    kwargs: t.Dict[str, t.Any]
+    coalesce: bool
+    future: asyncio.Future
+
+
+class Outbound:
+    """Schedules outgoing messages so they stay within Discord's rate limits.
+
+    Every channel has its own queue and token bucket (the route `POST /channels/{id}/messages`),
+    and all of them share a global bucket. Queued messages go out highest priority first. Consecutive
+    text messages to the same channel with the same options can be sent as one message, for callers
+    that ask for it with `coalesce`.
+
+    Attributes:
+        queued (int): Messages waiting to be sent.
+        sent (int): Messages sent, counting coalesced ones as one.
+        coalesced (int): Messages that went out as part of another message.
+
+    """
+
+    def __init__(
+        self,
+        send: t.Optional[t.Callable[..., t.Awaitable[t.Any]]] = None,
+        log: t.Optional[logging.Logger] = None,
+        route_rate: int = 5,
+        route_per: float = 5.0,
+        global_rate: int = 50,
+        max_length: int = 2000,
+        retries: int = 3
+    ) -> None:
+        """Creating important attributes for this class.
+
+        Args:
+            send (:obj:`t.Optional[t.Callable[..., t.Awaitable[t.Any]]]`, optional): Sends a message, given
+                the channel, content and keyword arguments. Defaults to `channel.send`, and is there to
+                be replaced by a fake HTTP layer in tests and benchmarks.
+            log (:obj:`t.Optional[logging.Logger]`, optional): Where failed sends are logged to.
+            route_rate (int, optional): Messages per channel every `route_per` seconds. Defaults to 5.
+            route_per (float, optional): Length of a channel's rate limit period. Defaults to 5 seconds.
+            global_rate (int, optional): Messages per second across all channels. Defaults to 50.
+            max_length (int, optional): Longest message coalescing may create. Defaults to 2000.
+            retries (int, optional): Attempts after being rate limited, before giving up. Defaults to 3.
+
+        Returns:
+            bool: Always None.
+
+        """
+        self._send = send if send is not None else _send
+        self.log = log if log is not None else logging.getLogger(__name__)
+        self.route_rate = route_rate
+        self.route_per = route_per
+        self.max_length = max_length
+        self.retries = retries
+
+        self.queued = 0
+        self.sent = 0
+        self.coalesced = 0
+
+        self._global = TokenBucket(global_rate, 1.0)
+        self._routes = {}
+        self._queues = {}
+        self._workers = {}
+        self._order = itertools.count()
+        self._closed = False
+
+    def send(
+        self,
+        channel: discord.abc.Messageable,
+        content: t.Optional[str] = None,
+        *,
+        priority: int = 0,
+        coalesce: bool = False,
+        **kwargs
+    ) -> asyncio.Future:
+        """Queues a message to be sent, without waiting for it.
+
+        Args:
+            channel (:obj:`discord.abc.Messageable`): Where to send the message.
+            content (:obj:`t.Optional[str]`, optional): The text of the message.
+            priority (int, optional): Higher priorities are sent first. Defaults to 0.
+            coalesce (bool, optional): Allow this text to share a message with neighbouring texts to the
+                same channel that allow it too, such as lines of a log. Defaults to False.
+            **kwargs: Arbitrary keyword arguments, passed on to `channel.send`.
+
+        Returns:
+            :obj:`asyncio.Future`: Resolves to the sent message, which is shared if it was coalesced.
+
+        Raises:
+            RuntimeError: When `close` has finished, since nothing would send the message.
+
+        """
+        if self._closed:
+            raise RuntimeError('Outbound is closed, so the message would never be sent.')
+
+        future = asyncio.get_event_loop().create_future()
+        key = getattr(channel, 'id', id(channel))
+
+        item = _Item(-priority, next(self._order), content, kwargs, coalesce, future)
+        heapq.heappush(self._queues.setdefault(key, []), item)
+        self.queued += 1
+
+        if key not in self._workers:
+            self._workers[key] = asyncio.ensure_future(self._work(key, channel))
+
+        return future
+
+    async def close(self, timeout: t.Optional[float] = None) -> bool:
+        """Waits for the queued messages to be sent, then stops accepting new ones.
+
+        Messages queued while closing are waited for as well, within the same timeout.
+
+        Args:
+            timeout (:obj:`t.Optional[float]`, optional): Seconds to wait at most. Defaults to no limit.
+
+        Returns:
+            bool: If every queue drained in time. Messages still queued afterwards are cancelled.
+
+        """
+        loop = asyncio.get_event_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        pending = set()
+
+        # Sends during the wait can start new workers, so this goes on until none are left.
+        while self._workers and not pending:
+            remaining = None if deadline is None else max(deadline - loop.time(), 0)
+            _, pending = await asyncio.wait(list(self._workers.values()), timeout=remaining)
+
+        self._closed = True
+
+        for worker in pending:
+            worker.cancel()
+
+        for queue in self._queues.values():
+            for item in queue:
+                item.future.cancel()
+
+            self.queued -= len(queue)
+            queue.clear()
+
+        return not pending
+
+    def register(self, metrics: t.Any) -> None:
+        """Exports the queue depth and send counts to a `stats.Metrics`.
+
+        Args:
+            metrics (:obj:`stats.Metrics`): Where to export the numbers to.
+
+        Returns:
+            bool: Always None.
+
+        """
+        metrics.gauge('bot_outbound_queued', lambda: self.queued)
+        metrics.gauge('bot_outbound_sent', lambda: self.sent)
+        metrics.gauge('bot_outbound_coalesced', lambda: self.coalesced)
+
+    async def _work(self, key: int, channel: discord.abc.Messageable) -> None:
+        queue = self._queues[key]
+        route = self._routes.setdefault(key, TokenBucket(self.route_rate, self.route_per))
+
+        try:
+            while queue:
+                await route.acquire()
+                await self._global.acquire()
+
+                items = self._batch(queue)
+                self.queued -= len(items)
+
+                content = '\n'.join(item.content for item in items) if len(items) > 1 else items[0].content
+
+                try:
+                    message = await self._attempt(route, channel, content, items[0].kwargs)
+
+                except asyncio.CancelledError:
+                    # Cancelled by `close` in the middle of a send, after these left the queue.
+                    for item in items:
+                        item.future.cancel()
+
+                    raise
+
+                except Exception as e:
+                    self.log.warning(f'Error while sending to "{key}" error: {e}')
+
+                    for item in items:
+                        if not item.future.done():
+                            item.future.set_exception(e)
+
+                    continue
+
+                self.sent += 1
+                self.coalesced += len(items) - 1
+
+                for item in items:
+                    if not item.future.done():
+                        item.future.set_result(message)
+
+        finally:
+            del self._workers[key]
+
+            if not queue:
+                del self._queues[key]
+
+    def _batch(self, queue: t.List[_Item]) -> t.List[_Item]:
+        """Pops the next message, along with the ones that can be merged into it."""
+        items = [heapq.heappop(queue)]
+
+        # Only plain text with the same priority and options is merged, so nothing jumps ahead.
+        if items[0].content is None or not items[0].coalesce:
+            return items
+
+        length = len(items[0].content)
+
+        while queue:
+            item = queue[0]
+
+            if item.priority != items[0].priority or item.content is None or not item.coalesce:
+                break
+
+            if item.kwargs != items[0].kwargs:
+                break
+
+            if length + 1 + len(item.content) > self.max_length:
+                break
+
+            length += 1 + len(item.content)
+            items.append(heapq.heappop(queue))
+
+        return items
+
+    async def _attempt(
+        self, route: TokenBucket, channel: discord.abc.Messageable, content: t.Optional[str], kwargs: t.Dict
+    ) -> t.Any:
+        for attempt in range(self.retries + 1):
+            try:
+                return await self._send(channel, content, **kwargs)
+
+            except discord.HTTPException as e:
+                if e.status != 429 or attempt == self.retries:
+                    raise
+
+                # The bucket was drained by something else, so it waits out what Discord asked for.
+                route.pause(_retry_after(e, self.route_per))
+                await route.acquire()
+
+
+def _retry_after(error: discord.HTTPException, default: float) -> float:
+    """Seconds Discord asked to wait, from the `Retry-After` header of the response."""
+    headers = getattr(error.response, 'headers', None) or {}
+
+    try:
+        return float(headers['Retry-After'])
+
+    except (KeyError, TypeError, ValueError):
+        return default
+
+
+async def _send(channel: discord.abc.Messageable, content: t.Optional[str], **kwargs) -> discord.Message:
+    return await channel.send(content, **kwargs)
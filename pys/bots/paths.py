@@ -0,0 +1,76 @@
+import functools
+import os
+import typing as t
+from pathlib import Path
+
+
+# The bots live next to this file, so the root doesn't depend on how (or from where) they were started.
+ROOT = Path(__file__).resolve().parent
+
+
+@functools.lru_cache(maxsize=256)
+def path(*filepath: t.Union[str, os.PathLike]) -> Path:
+    """Returns absolute path from the bots' folder to another location.
+
+    The root is resolved once on import, and joined paths are kept in a bounded LRU cache.
+
+    Args:
+        filepath (:obj:`t.Iterable`): Arguments to add to the root folder.
+
+    Returns:
+        :obj:`Path`: filepath with OS based seperator.
+
+    Examples:
+        >>> print(path('tmp', 'image.png'))
+        C:\\Users\\Xithr\\Documents\\Repositories\\Xythrion\\tmp\\image.png
+
+    """
+    return ROOT.joinpath(*filepath)
+
+
+if __name__ == "__main__":
+    import sys
+    import timeit
+
+    def _legacy_path(*filepath: t.Iterable[str]) -> str:
+        lst = [
+            os.path.abspath(os.path.dirname(sys.argv[0])),
+            (os.sep).join(str(y) for y in filepath)
+        ]
+        return (os.sep).join(str(s) for s in lst)
+
+    items = [f'{i}.png' for i in range(1000)]
+    folders = [f'folder{i}' for i in range(20)]
+
+    def legacy_cleanup() -> None:
+        # `_cleanup` used to resolve the folder twice and then every item on its own.
+        _legacy_path('tmp')
+        _legacy_path('tmp')
+
+        for item in items:
+            _legacy_path('tmp', item)
+
+    def cleanup() -> None:
+        folder = path('tmp')
+
+        for item in items:
+            folder / item
+
+    def legacy_discovery() -> None:
+        # `get_extensions` used to resolve `cogs/` and then every folder within it.
+        _legacy_path('cogs')
+
+        for folder in folders:
+            _legacy_path('cogs', folder)
+
+    def discovery() -> None:
+        path('cogs')
+
+        for folder in folders:
+            path('cogs', folder)
+
+    for name, legacy, cached in (('cleanup', legacy_cleanup, cleanup), ('discovery', legacy_discovery, discovery)):
+        legacy = min(timeit.repeat(legacy, number=100, repeat=5))
+        cached = min(timeit.repeat(cached, number=100, repeat=5))
+
+        print(f'{name:<10} legacy: {legacy * 10:.3f}ms  cached: {cached * 10:.3f}ms  ({legacy / cached:.1f}x)')
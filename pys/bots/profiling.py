@@ -0,0 +1,213 @@
+import asyncio
+import collections
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+import typing as t
+
+
+class StallDetector:
+    """Watches the event loop from another thread, logging what it was running whenever it stalls.
+
+    A task on the loop records a heartbeat every `interval`. When the heartbeat is older than
+    `threshold`, the loop is stuck in a callback that doesn't yield, such as blocking I/O in a cog,
+    and the loop thread's stack shows which one.
+
+    Attributes:
+        threshold (float): Seconds without a heartbeat that count as a stall.
+        interval (float): Seconds between heartbeats.
+        stalls (int): Stalls detected so far.
+
+    """
+
+    def __init__(self, log: logging.Logger, threshold: float = 0.25, interval: float = 0.05) -> None:
+        """Creating important attributes for this class.
+
+        Args:
+            log (:obj:`logging.Logger`): Where stalls are logged to, along with the stack of the loop.
+            threshold (float, optional): Seconds without a heartbeat that count as a stall. Defaults to 0.25.
+            interval (float, optional): Seconds between heartbeats. Defaults to 0.05.
+
+        Returns:
+            bool: Always None.
+
+        """
+        self.log = log
+        self.threshold = threshold
+        self.interval = interval
+
+        self.stalls = 0
+
+        self._beat = time.monotonic()
+        self._loop_thread = None
+        self._task = None
+        self._stopped = threading.Event()
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Starts the heartbeat on the loop, and the thread watching it.
+
+        Args:
+            loop (:obj:`asyncio.AbstractEventLoop`): The loop to watch.
+
+        Returns:
+            bool: Always None.
+
+        """
+        if self._task is None:
+            # Counting from now, rather than from whenever the detector was created.
+            self._beat = time.monotonic()
+            self._stopped.clear()
+            self._task = loop.create_task(self._heartbeat())
+
+            threading.Thread(target=self._watch, name='stall-detector', daemon=True).start()
+
+    def stop(self) -> None:
+        """Stops the heartbeat and the thread watching it.
+
+        Returns:
+            bool: Always None.
+
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+            self._stopped.set()
+
+    def register(self, metrics: t.Any) -> None:
+        """Exports the amount of stalls to a `stats.Metrics`.
+
+        Args:
+            metrics (:obj:`stats.Metrics`): Where to export the numbers to.
+
+        Returns:
+            bool: Always None.
+
+        """
+        metrics.gauge('bot_loop_stalls', lambda: self.stalls)
+
+    async def _heartbeat(self) -> None:
+        self._loop_thread = threading.get_ident()
+
+        while True:
+            self._beat = time.monotonic()
+            await asyncio.sleep(self.interval)
+
+    def _watch(self) -> None:
+        stalled = False
+
+        while not self._stopped.wait(self.interval):
+            behind = time.monotonic() - self._beat
+
+            if behind < self.threshold or self._loop_thread is None:
+                stalled = False
+                continue
+
+            # One report per stall, taken while the blocking call is still on the stack.
+            if not stalled:
+                stalled = True
+                self.stalls += 1
+
+                frame = sys._current_frames().get(self._loop_thread)
+                stack = ''.join(traceback.format_stack(frame)) if frame is not None else ''
+
+                self.log.warning(f'Event loop stalled for over {behind * 1000:.0f}ms, while running:\n{stack}')
+
+
+class Profiler:
+    """Samples the stack of a thread, counting the stacks in the folded format flamegraph tools read.
+
+    Every line of the output is a stack from the outermost frame inward, separated by semicolons,
+    followed by how many samples it was seen in. `flamegraph.pl`, speedscope and inferno all read it.
+
+    Attributes:
+        interval (float): Seconds between samples.
+        samples (:obj:`collections.Counter`): Folded stacks and how often they were seen.
+        running (bool): If the profiler is sampling.
+
+    """
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+
+        self.samples = collections.Counter()
+        self._thread = None
+        self._stopped = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, thread_id: t.Optional[int] = None) -> None:
+        """Starts sampling, forgetting the samples of a previous run.
+
+        Args:
+            thread_id (:obj:`t.Optional[int]`, optional): The thread to sample. Defaults to the calling
+                thread, which is the event loop's when called from a command.
+
+        Returns:
+            bool: Always None.
+
+        """
+        if self.running:
+            return
+
+        target = thread_id if thread_id is not None else threading.get_ident()
+
+        self.samples.clear()
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._sample, args=(target,), name='profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> collections.Counter:
+        """Stops sampling.
+
+        Returns:
+            :obj:`collections.Counter`: The folded stacks and how often they were seen.
+
+        """
+        if self.running:
+            self._stopped.set()
+            self._thread.join()
+            self._thread = None
+
+        return self.samples
+
+    def write(self, filepath: t.Union[str, os.PathLike]) -> int:
+        """Writes the samples in the folded format, most frequent stack first.
+
+        Args:
+            filepath (:obj:`t.Union[str, os.PathLike]`): Where to write to, such as `tmp/profile.folded`.
+
+        Returns:
+            int: The amount of samples written.
+
+        """
+        with open(filepath, 'w') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f'{stack} {count}\n')
+
+        return sum(self.samples.values())
+
+    def _sample(self, thread_id: int) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+
+            if frame is None:
+                continue
+
+            self.samples[_fold(frame)] += 1
+
+
+def _fold(frame: t.Any) -> str:
+    """Turns a stack into `module:function:line;...`, from the outermost frame inward."""
+    names = []
+
+    while frame is not None:
+        code = frame.f_code
+        names.append(f'{frame.f_globals.get("__name__", "?")}:{code.co_name}:{frame.f_lineno}')
+        frame = frame.f_back
+
+    return ';'.join(reversed(names))
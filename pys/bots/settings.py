@@ -0,0 +1,228 @@
+import asyncio
+import dataclasses
+import json
+import logging
+import os
+import types
+import typing as t
+
+
+class ConfigError(ValueError):
+    """The config file was read, but its contents are not valid."""
+
+
+@dataclasses.dataclass(frozen=True)
+class Config:
+    """The parsed contents of `config/config.json`, which can't be changed once loaded.
+
+    Keys besides the known ones are kept in `extra`. Every key can be read as an attribute, or by
+    subscripting like the dictionary the config used to be. Configs can be pickled, and hashed by
+    their known keys, as the values in `extra` may not be hashable.
+
+    Attributes:
+        discord (str): The token of the bot.
+        extra (:obj:`t.Mapping[str, t.Any]`): Every other key of the config file.
+
+    """
+
+    discord: str
+    extra: t.Mapping[str, t.Any] = dataclasses.field(
+        default_factory=lambda: types.MappingProxyType({}), hash=False
+    )
+
+    def __getattr__(self, name: str) -> t.Any:
+        # Copying and unpickling look attributes up before `extra` is set, which would recurse forever.
+        if name == 'extra':
+            raise AttributeError(name)
+
+        try:
+            return self.extra[name]
+
+        except KeyError:
+            raise AttributeError(f'Config has no key {name!r}.') from None
+
+    def __getitem__(self, name: str) -> t.Any:
+        if name in _FIELDS:
+            return getattr(self, name)
+
+        return self.extra[name]
+
+    def __reduce__(self) -> t.Tuple[t.Callable[..., 'Config'], tuple]:
+        # A MappingProxyType can't be pickled, so `extra` is pickled as a plain dictionary.
+        return _restore, ({name: getattr(self, name) for name in _FIELDS}, dict(self.extra))
+
+
+def _restore(known: t.Dict[str, t.Any], extra: t.Dict[str, t.Any]) -> Config:
+    return Config(**known, extra=types.MappingProxyType(extra))
+
+
+# The keys `Config` knows, along with the types of their values.
+_FIELDS = {field.name: field.type for field in dataclasses.fields(Config) if field.name != 'extra'}
+
+
+def parse(text: str, environ: t.Optional[t.Mapping[str, str]] = None, prefix: str = 'BOT_') -> Config:
+    """Parses a config file, with environment variables overriding its keys.
+
+    An environment variable named `prefix` followed by a key in upper case, such as `BOT_DISCORD`,
+    overrides that key, if it is a key of `Config` or of the config file. Other variables are left
+    alone. Values stay strings for keys that hold strings, and are parsed as JSON for the rest.
+
+    Args:
+        text (str): The contents of the config file.
+        environ (:obj:`t.Optional[t.Mapping[str, str]]`, optional): Defaults to `os.environ`.
+        prefix (str, optional): What the overriding environment variables start with. Defaults to 'BOT_'.
+
+    Returns:
+        :obj:`Config`: The validated config.
+
+    Raises:
+        :obj:`json.JSONDecodeError`: When the config file isn't valid JSON.
+        :obj:`ConfigError`: When a key is missing or has the wrong type, or a variable overriding a key
+            that doesn't hold a string isn't valid JSON.
+
+    """
+    data = json.loads(text)
+
+    if not isinstance(data, dict):
+        raise ConfigError('The config file has to hold a JSON object.')
+
+    environ = os.environ if environ is None else environ
+
+    # The type of the field, or of the value in the file for keys outside of the schema.
+    kinds = {**{key: type(value) for key, value in data.items()}, **_FIELDS}
+
+    for key, kind in kinds.items():
+        value = environ.get(f'{prefix}{key.upper()}')
+
+        if value is None:
+            continue
+
+        if kind is str:
+            data[key] = value
+            continue
+
+        try:
+            data[key] = json.loads(value)
+
+        except json.JSONDecodeError:
+            raise ConfigError(f'Environment variable {prefix}{key.upper()} has to be JSON.') from None
+
+    for name, kind in _FIELDS.items():
+        if not isinstance(data.get(name), kind):
+            raise ConfigError(f'Key {name!r} has to be a {kind.__name__}.')
+
+    known = {name: data.pop(name) for name in _FIELDS}
+
+    return Config(**known, extra=types.MappingProxyType(data))
+
+
+def load(filepath: t.Union[str, os.PathLike], **kwargs) -> Config:
+    """Reads and parses a config file.
+
+    Args:
+        filepath (:obj:`t.Union[str, os.PathLike]`): The config file.
+        **kwargs: Arbitrary keyword arguments, passed on to `parse`.
+
+    Returns:
+        :obj:`Config`: The validated config.
+
+    Raises:
+        FileNotFoundError: When the config file cannot be found.
+        :obj:`json.JSONDecodeError`: When the config file isn't valid JSON.
+        :obj:`ConfigError`: When a key is missing or has the wrong type.
+
+    """
+    with open(filepath) as f:
+        return parse(f.read(), **kwargs)
+
+
+class ConfigWatcher:
+    """Reloads a config file whenever its modification time changes.
+
+    A file that fails to load is logged and skipped, so the last valid config stays in use.
+
+    Attributes:
+        filepath (:obj:`t.Union[str, os.PathLike]`): The config file.
+        interval (float): Seconds between checks.
+
+    """
+
+    def __init__(
+        self,
+        filepath: t.Union[str, os.PathLike],
+        on_change: t.Callable[[Config], None],
+        log: logging.Logger,
+        interval: float = 2.0
+    ) -> None:
+        """Creating important attributes for this class.
+
+        Args:
+            filepath (:obj:`t.Union[str, os.PathLike]`): The config file.
+            on_change (:obj:`t.Callable[[Config], None]`): Called with every newly loaded config.
+            log (:obj:`logging.Logger`): Where failed reloads are logged to.
+            interval (float, optional): Seconds between checks. Defaults to 2.
+
+        Returns:
+            bool: Always None.
+
+        """
+        self.filepath = filepath
+        self.on_change = on_change
+        self.log = log
+        self.interval = interval
+
+        self._mtime = self._stat()
+        self._task = None
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Starts watching the config file in the background.
+
+        Args:
+            loop (:obj:`asyncio.AbstractEventLoop`): The loop to watch on.
+
+        Returns:
+            bool: Always None.
+
+        """
+        if self._task is None:
+            self._task = loop.create_task(self._run())
+
+    def stop(self) -> None:
+        """Stops watching the config file.
+
+        Returns:
+            bool: Always None.
+
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _stat(self) -> t.Optional[int]:
+        try:
+            return os.stat(self.filepath).st_mtime_ns
+
+        except OSError:
+            return None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_event_loop()
+
+        while True:
+            await asyncio.sleep(self.interval)
+
+            mtime = await loop.run_in_executor(None, self._stat)
+
+            if mtime is None or mtime == self._mtime:
+                continue
+
+            self._mtime = mtime
+
+            try:
+                config = await loop.run_in_executor(None, load, self.filepath)
+
+            except (OSError, json.JSONDecodeError, ConfigError) as e:
+                self.log.warning(f'{e}: Config file changed, but could not be reloaded. Keeping the old one.')
+                continue
+
+            self.on_change(config)
@@ -0,0 +1,309 @@
+"""Runs the shards of a bot across several worker processes, under a supervisor.
+
+Every worker runs a subset of the shards with an auto-sharded version of the module's `Bot`. The
+supervisor restarts crashed workers, renders the log records of every worker, and adds their metrics
+together.
+
+Usage:
+    python shards.py basic --shards 8 --workers 4 [--metrics-port 9100]
+
+"""
+
+import argparse
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import os
+import queue
+import time
+import typing as t
+from logging import handlers
+
+from discord.ext import commands as comms
+
+import logs
+from stats import Metrics, serve
+
+
+# Discord only lets a bot identify a shard once every 5 seconds.
+IDENTIFY_DELAY = 5.0
+
+
+def sharded(bot_cls: t.Type[comms.Bot]) -> t.Type[comms.AutoShardedBot]:
+    """Creates a version of a `Bot` subclass that runs several shards in the same process.
+
+    Args:
+        bot_cls (:obj:`t.Type[comms.Bot]`): The bot to shard, such as `basic.Bot`.
+
+    Returns:
+        :obj:`t.Type[comms.AutoShardedBot]`: A subclass of both `bot_cls` and `comms.AutoShardedBot`.
+
+    """
+    return type(f'Sharded{bot_cls.__name__}', (bot_cls, comms.AutoShardedBot), {})
+
+
+def _worker(
+    module_name: str,
+    shard_ids: t.List[int],
+    shard_count: int,
+    records: multiprocessing.Queue,
+    snapshots: multiprocessing.Queue,
+    kwargs: t.Dict[str, t.Any]
+) -> None:
+    """Runs a bot for some shards until it logs out. This is the entry point of a worker process."""
+    # Everything is logged to the supervisor, which renders it.
+    logging.basicConfig(
+        level=logging.INFO, format='%(message)s', handlers=[handlers.QueueHandler(records)], force=True
+    )
+
+    name = f'shards[{",".join(map(str, shard_ids))}]'
+    log = logging.getLogger(name)
+
+    try:
+        bot_cls = sharded(importlib.import_module(module_name).Bot)
+        bot = bot_cls(shard_ids=shard_ids, shard_count=shard_count, log=log, **kwargs)
+
+        async def report(interval: float = 5.0) -> None:
+            while True:
+                await asyncio.sleep(interval)
+                snapshots.put_nowait((name, bot.metrics.snapshot()))
+
+        if isinstance(getattr(bot, 'metrics', None), Metrics):
+            bot.loop.create_task(report())
+
+        bot.run(bot.config.discord, bot=True, reconnect=True)
+
+    # Sending the traceback through the supervisor's logs, instead of this process' stderr.
+    except Exception:
+        log.exception('Worker crashed.')
+        raise SystemExit(1)
+
+
+class _Forward(logging.Handler):
+    """Hands records from the workers to the supervisor's own loggers."""
+
+    def handle(self, record: logging.LogRecord) -> None:
+        logger = logging.getLogger(record.name)
+
+        if logger.isEnabledFor(record.levelno):
+            logger.handle(record)
+
+
+class Worker:
+    """A worker process, and what is needed to start it again.
+
+    Attributes:
+        shard_ids (:obj:`t.List[int]`): The shards the worker runs.
+        process (:obj:`t.Optional[multiprocessing.Process]`): The running process, if any.
+        restarts (int): How many times the worker was restarted after crashing.
+
+    """
+
+    def __init__(self, shard_ids: t.List[int]) -> None:
+        self.shard_ids = shard_ids
+        self.process = None
+        self.restarts = 0
+
+        self.crashes = 0
+        self.started = 0.0
+        self.retry_at = None
+
+
+class Supervisor:
+    """Starts the workers, restarts the ones that crash, and collects their logs and metrics.
+
+    Attributes:
+        workers (:obj:`t.List[Worker]`): One entry per worker process.
+        snapshots (:obj:`t.Dict[str, t.Dict[str, t.Any]]`): The latest metrics of every worker.
+
+    """
+
+    def __init__(
+        self,
+        module_name: str,
+        shard_count: int,
+        worker_count: int,
+        log: logging.Logger,
+        max_backoff: float = 60.0,
+        **kwargs
+    ) -> None:
+        """Creating important attributes for this class.
+
+        Args:
+            module_name (str): The module holding the `Bot` to run, such as 'basic'.
+            shard_count (int): The total amount of shards.
+            worker_count (int): The amount of processes to spread the shards over.
+            log (:obj:`logging.Logger`): Where the supervisor logs to.
+            max_backoff (float, optional): Longest wait before restarting a crashed worker, in seconds.
+            **kwargs: Arbitrary keyword arguments, passed on to every `Bot`.
+
+        Returns:
+            bool: Always None.
+
+        """
+        self.module_name = module_name
+        self.shard_count = shard_count
+        self.log = log
+        self.max_backoff = max_backoff
+        self.kwargs = kwargs
+
+        # Striding keeps the workers within one shard of each other, whatever the counts are.
+        self.workers = [
+            Worker(list(range(i, shard_count, worker_count))) for i in range(min(worker_count, shard_count))
+        ]
+        self.snapshots = {}
+
+        # Spawning, since forking a process that runs threads (the log listener) isn't safe.
+        self._context = multiprocessing.get_context('spawn')
+        self._records = self._context.Queue()
+        self._metrics = self._context.Queue()
+        self._listener = handlers.QueueListener(self._records, _Forward())
+
+    def metrics(self) -> Metrics:
+        """Adds together the latest metrics of every worker.
+
+        Returns:
+            :obj:`Metrics`: The metrics of the whole bot.
+
+        """
+        metrics = Metrics()
+        metrics.gauge('bot_workers_alive', lambda: sum(w.process is not None for w in self.workers))
+        metrics.gauge('bot_worker_restarts', lambda: sum(w.restarts for w in self.workers))
+
+        for snapshot in self.snapshots.values():
+            metrics.merge(snapshot)
+
+        return metrics
+
+    async def run(self, metrics_port: t.Optional[int] = None, interval: float = 1.0) -> None:
+        """Runs the workers until all of them have logged out.
+
+        Args:
+            metrics_port (:obj:`t.Optional[int]`, optional): Local port to serve the combined metrics on.
+            interval (float, optional): Seconds between checks on the workers. Defaults to 1.
+
+        Returns:
+            bool: Always None.
+
+        """
+        self._listener.start()
+
+        if metrics_port is not None:
+            await serve(lambda: self.metrics().render(), port=metrics_port)
+
+        try:
+            for worker in self.workers:
+                self._start(worker)
+
+                # Staggering the workers, so they don't identify their shards at the same time.
+                await asyncio.sleep(IDENTIFY_DELAY * len(worker.shard_ids))
+
+            while any(worker.process is not None or worker.retry_at is not None for worker in self.workers):
+                self._collect()
+                self._check()
+
+                await asyncio.sleep(interval)
+
+        finally:
+            self.stop()
+
+            # Rendering the last records of the workers before returning.
+            self._listener.stop()
+
+    def stop(self) -> None:
+        """Terminates the workers still running.
+
+        Returns:
+            bool: Always None.
+
+        """
+        for worker in self.workers:
+            if worker.process is not None and worker.process.is_alive():
+                worker.process.terminate()
+                worker.process.join()
+
+            worker.process = None
+            worker.retry_at = None
+
+    def _start(self, worker: Worker) -> None:
+        worker.process = self._context.Process(
+            target=_worker,
+            args=(self.module_name, worker.shard_ids, self.shard_count, self._records, self._metrics, self.kwargs),
+            daemon=True
+        )
+        worker.process.start()
+        worker.started = time.monotonic()
+
+        self.log.info(f'Started shards {worker.shard_ids} in process {worker.process.pid}.')
+
+    def _collect(self) -> None:
+        while True:
+            try:
+                name, snapshot = self._metrics.get_nowait()
+
+            except queue.Empty:
+                return
+
+            self.snapshots[name] = snapshot
+
+    def _check(self) -> None:
+        now = time.monotonic()
+
+        for worker in self.workers:
+            if worker.process is None:
+                if worker.retry_at is not None and now >= worker.retry_at:
+                    worker.retry_at = None
+                    worker.restarts += 1
+                    self._start(worker)
+
+                continue
+
+            if worker.process.is_alive():
+                continue
+
+            exitcode = worker.process.exitcode
+            worker.process = None
+
+            # Logging out cleanly (the `exit` command) isn't a crash, so the worker stays down.
+            if exitcode == 0:
+                self.log.warning(f'Shards {worker.shard_ids} logged out.')
+                continue
+
+            # Backing off exponentially, unless the worker ran long enough to count as healthy again.
+            if now - worker.started > self.max_backoff:
+                worker.crashes = 0
+
+            backoff = min(2 ** worker.crashes, self.max_backoff)
+            worker.crashes += 1
+            worker.retry_at = now + backoff
+
+            self.log.critical(
+                f'Shards {worker.shard_ids} crashed with exit code {exitcode}, restarting in {backoff:.0f}s.'
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('module', nargs='?', default='basic')
+    parser.add_argument('--shards', type=int, default=os.cpu_count())
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--metrics-port', type=int, default=None)
+    args = parser.parse_args()
+
+    supervisor = Supervisor(
+        args.module, args.shards, args.workers, logs.rich_logger(),
+        command_prefix=';', case_insensitive=True, help_command=None
+    )
+
+    try:
+        asyncio.run(supervisor.run(metrics_port=args.metrics_port))
+
+    except KeyboardInterrupt:
+        pass
+
+    logs.stop()
+
+
+if __name__ == "__main__":
+    main()
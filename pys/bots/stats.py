@@ -0,0 +1,290 @@
+import asyncio
+import bisect
+import collections
+import math
+import time
+import typing as t
+
+
+# Upper bounds of the latency buckets, in seconds.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, math.inf)
+
+
+class Histogram:
+    """A fixed-bucket latency histogram, the same shape Prometheus uses.
+
+    Observing is a bisect and two additions, so it can sit on the path of every command.
+
+    Attributes:
+        counts (:obj:`t.List[int]`): Observations per bucket of `BUCKETS`.
+        total (float): The sum of every observation.
+        count (int): The amount of observations.
+
+    """
+
+    __slots__ = ('counts', 'total', 'count')
+
+    def __init__(self) -> None:
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def merge(self, counts: t.List[int], total: float, count: int) -> None:
+        """Adds the observations of another histogram, such as one from another process."""
+        self.counts = [a + b for a, b in zip(self.counts, counts)]
+        self.total += total
+        self.count += count
+
+    def quantile(self, q: float) -> float:
+        """Estimates a quantile by interpolating within the bucket it falls in.
+
+        Args:
+            q (float): The quantile, between 0 and 1.
+
+        Returns:
+            float: The estimated value in seconds, or NaN if nothing was observed.
+
+        """
+        if not self.count:
+            return math.nan
+
+        rank = q * self.count
+        seen = 0
+
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = BUCKETS[i - 1] if i else 0.0
+
+                # Values past the last finite bound can't be placed, so the bound is the best guess.
+                if BUCKETS[i] == math.inf:
+                    return lower
+
+                return lower + (BUCKETS[i] - lower) * (rank - seen) / count
+
+            seen += count
+
+        return BUCKETS[-2]
+
+
+class Metrics:
+    """Invocation counts, latencies and errors of every command and listener, plus event loop lag.
+
+    Handlers are named `command:<qualified name>` or `event:<event name>`.
+
+    Attributes:
+        latency (:obj:`t.Dict[str, Histogram]`): Latency per handler.
+        calls (:obj:`collections.Counter`): Invocations per handler.
+        errors (:obj:`collections.Counter`): Failed invocations per handler.
+        loop_lag (:obj:`Histogram`): How late the event loop ran a sleeping task.
+        gauges (:obj:`t.Dict[str, t.Callable[[], float]]`): Extra values to export, read when rendering.
+
+    """
+
+    def __init__(self) -> None:
+        self.latency = collections.defaultdict(Histogram)
+        self.calls = collections.Counter()
+        self.errors = collections.Counter()
+        self.loop_lag = Histogram()
+        self.gauges = {}
+
+    def observe(self, handler: str, seconds: float, failed: bool = False) -> None:
+        """Records one invocation of a handler.
+
+        Args:
+            handler (str): The name of the command or listener.
+            seconds (float): How long it took.
+            failed (bool, optional): If it raised an error. Defaults to False.
+
+        Returns:
+            bool: Always None.
+
+        """
+        self.latency[handler].observe(seconds)
+        self.calls[handler] += 1
+
+        if failed:
+            self.errors[handler] += 1
+
+    def gauge(self, name: str, func: t.Callable[[], float]) -> None:
+        """Exports a value that is read every time the metrics are rendered.
+
+        Args:
+            name (str): The name of the metric, such as `bot_cache_hits`.
+            func (:obj:`t.Callable[[], float]`): Returns the current value.
+
+        Returns:
+            bool: Always None.
+
+        """
+        self.gauges[name] = func
+
+    def snapshot(self) -> t.Dict[str, t.Any]:
+        """Copies every metric into plain builtins, so they can be sent to another process.
+
+        Returns:
+            :obj:`t.Dict[str, t.Any]`: The metrics, to be given to `merge`.
+
+        """
+        return {
+            'calls': dict(self.calls),
+            'errors': dict(self.errors),
+            'latency': {h: (hist.counts[:], hist.total, hist.count) for h, hist in self.latency.items()},
+            'loop_lag': (self.loop_lag.counts[:], self.loop_lag.total, self.loop_lag.count)
+        }
+
+    def merge(self, snapshot: t.Dict[str, t.Any]) -> None:
+        """Adds the metrics from a snapshot, such as one from another process.
+
+        Args:
+            snapshot (:obj:`t.Dict[str, t.Any]`): The return value of `snapshot`.
+
+        Returns:
+            bool: Always None.
+
+        """
+        self.calls.update(snapshot['calls'])
+        self.errors.update(snapshot['errors'])
+
+        for handler, hist in snapshot['latency'].items():
+            self.latency[handler].merge(*hist)
+
+        self.loop_lag.merge(*snapshot['loop_lag'])
+
+    def table(self, limit: int = 15) -> str:
+        """Renders the busiest handlers as a plain text table.
+
+        Args:
+            limit (int, optional): The amount of handlers to show. Defaults to 15.
+
+        Returns:
+            str: The table, with latencies in milliseconds.
+
+        """
+        width = max((len(handler) for handler in self.calls), default=0)
+        width = max(width, len('handler'))
+
+        rows = [f'{"handler":<{width}}  {"calls":>7}  {"err %":>6}  {"p50":>8}  {"p95":>8}  {"p99":>8}']
+
+        for handler, calls in self.calls.most_common(limit):
+            hist = self.latency[handler]
+            errors = self.errors[handler] / calls * 100
+            p50, p95, p99 = (hist.quantile(q) * 1000 for q in (0.5, 0.95, 0.99))
+
+            rows.append(f'{handler:<{width}}  {calls:>7}  {errors:>6.2f}  {p50:>8.2f}  {p95:>8.2f}  {p99:>8.2f}')
+
+        lag = self.loop_lag
+        rows.append(f'\nloop lag (ms): p50 {lag.quantile(0.5) * 1000:.2f}, p99 {lag.quantile(0.99) * 1000:.2f}')
+
+        return '\n'.join(rows)
+
+    def render(self) -> str:
+        """Renders every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics, one sample per line.
+
+        """
+        lines = [
+            '# TYPE bot_handler_calls_total counter',
+            *(f'bot_handler_calls_total{{handler="{_escape(h)}"}} {n}' for h, n in self.calls.items()),
+            '# TYPE bot_handler_errors_total counter',
+            *(f'bot_handler_errors_total{{handler="{_escape(h)}"}} {n}' for h, n in self.errors.items()),
+            '# TYPE bot_handler_latency_seconds histogram'
+        ]
+
+        for handler, hist in self.latency.items():
+            lines.extend(_histogram('bot_handler_latency_seconds', hist, f'handler="{_escape(handler)}",'))
+
+        lines.append('# TYPE bot_loop_lag_seconds histogram')
+        lines.extend(_histogram('bot_loop_lag_seconds', self.loop_lag))
+
+        for name, func in self.gauges.items():
+            lines.extend((f'# TYPE {name} gauge', f'{name} {func()}'))
+
+        return '\n'.join(lines) + '\n'
+
+    async def monitor_lag(self, interval: float = 0.5) -> None:
+        """Measures how late the event loop wakes up a task sleeping for `interval`, forever.
+
+        Args:
+            interval (float, optional): Seconds between measurements. Defaults to 0.5.
+
+        Returns:
+            bool: Always None.
+
+        """
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            self.loop_lag.observe(max(time.perf_counter() - start - interval, 0.0))
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 9100) -> asyncio.AbstractServer:
+        """Serves `render()` over HTTP, for Prometheus to scrape.
+
+        Args:
+            host (str, optional): The address to listen on. Defaults to localhost only.
+            port (int, optional): The port to listen on. Defaults to 9100.
+
+        Returns:
+            :obj:`asyncio.AbstractServer`: The server, already serving.
+
+        """
+        return await serve(self.render, host, port)
+
+
+async def serve(render: t.Callable[[], str], host: str = '127.0.0.1', port: int = 9100) -> asyncio.AbstractServer:
+    """Serves metrics over HTTP, for Prometheus to scrape.
+
+    Args:
+        render (:obj:`t.Callable[[], str]`): Returns the metrics in the Prometheus text format.
+        host (str, optional): The address to listen on. Defaults to localhost only.
+        port (int, optional): The port to listen on. Defaults to 9100.
+
+    Returns:
+        :obj:`asyncio.AbstractServer`: The server, already serving.
+
+    """
+    async def respond(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            # The path doesn't matter, so the request is only read up to the end of its headers.
+            while (await reader.readline()).strip():
+                pass
+
+            body = render().encode()
+
+            writer.write(
+                b'HTTP/1.1 200 OK\r\nContent-Type: text/plain; version=0.0.4\r\n'
+                b'Content-Length: %d\r\nConnection: close\r\n\r\n%s' % (len(body), body)
+            )
+            await writer.drain()
+
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(respond, host, port)
+
+
+def _escape(value: str) -> str:
+    """Escapes a label value, where backslashes, double quotes and newlines would end it early."""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _histogram(name: str, hist: Histogram, labels: str = '') -> t.Iterator[str]:
+    """Renders the cumulative buckets, sum and count of a histogram."""
+    cumulative = 0
+
+    for bound, count in zip(BUCKETS, hist.counts):
+        cumulative += count
+        le = '+Inf' if bound == math.inf else bound
+
+        yield f'{name}_bucket{{{labels}le="{le}"}} {cumulative}'
+
+    labels = f'{{{labels[:-1]}}}' if labels else ''
+
+    yield f'{name}_sum{labels} {hist.total}'
+    yield f'{name}_count{labels} {hist.count}'
@@ -0,0 +1,40 @@
+import asyncio
+import os
+
+from cache import Cache, DiskBackend
+
+
+def test_memoize_finishes_when_every_caller_is_cancelled() -> None:
+    async def main() -> Cache:
+        cache = Cache()
+
+        @cache.memoize()
+        async def slow(n: int) -> int:
+            await asyncio.sleep(0.01)
+
+            return n * 2
+
+        caller = asyncio.ensure_future(slow(2))
+        await asyncio.sleep(0)
+        caller.cancel()
+        await asyncio.sleep(0.05)
+
+        assert not cache._pending
+        assert await slow(2) == 4
+        assert cache.hits == 1
+
+        return cache
+
+    asyncio.run(main())
+
+
+def test_disk_backend_leaves_other_files_alone(tmp_path) -> None:
+    (tmp_path / 'keep.pickle').write_bytes(b'')
+
+    backend = DiskBackend(tmp_path)
+    backend.store('key', [1, 2])
+    assert backend.load('key') == [1, 2]
+
+    DiskBackend(tmp_path).clear()
+    assert os.listdir(tmp_path / 'cache') == []
+    assert (tmp_path / 'keep.pickle').exists()
@@ -0,0 +1,71 @@
+import asyncio
+
+import extensions
+
+from extensions import ExtensionIndex
+
+
+def test_update_finds_new_cogs_before_the_next_poll(tmp_path) -> None:
+    root = tmp_path / 'cogs'
+    (root / 'fun').mkdir(parents=True)
+    (root / 'fun' / 'dice.py').write_text('')
+
+    async def main() -> ExtensionIndex:
+        index = ExtensionIndex(root)
+        assert list(index) == ['cogs.fun.dice']
+
+        index.watch(asyncio.get_event_loop(), interval=60)
+        (root / 'fun' / 'plot.py').write_text('')
+        (root / 'fun' / '_helpers.py').write_text('')
+
+        assert await index.update()
+        index.stop()
+
+        return index
+
+    assert list(asyncio.run(main())) == ['cogs.fun.dice', 'cogs.fun.plot']
+
+
+def test_lookups_on_the_loop_rescan_in_the_executor(tmp_path) -> None:
+    root = tmp_path / 'cogs'
+    root.mkdir()
+    (root / 'dice.py').write_text('')
+
+    async def main() -> None:
+        index = ExtensionIndex(root)
+        assert list(index) == ['cogs.dice']
+
+        (root / 'plot.py').write_text('')
+        index._stale = True
+        assert 'cogs.plot' not in index
+
+        await index._pending
+        assert list(index) == ['cogs.dice', 'cogs.plot']
+
+    asyncio.run(main())
+
+
+def test_polling_outlives_unreadable_folders(tmp_path, monkeypatch, caplog) -> None:
+    root = tmp_path / 'cogs'
+    root.mkdir()
+
+    def unreadable(*args) -> None:
+        raise PermissionError('Permission denied')
+
+    async def main() -> ExtensionIndex:
+        index = ExtensionIndex(root)
+        monkeypatch.setattr(extensions, '_scan', unreadable)
+        assert list(index) == []
+
+        monkeypatch.setattr(index, 'refresh', unreadable)
+        monkeypatch.setattr(extensions, 'Observer', None)
+        index.watch(asyncio.get_event_loop(), interval=0.01)
+        await asyncio.sleep(0.05)
+
+        assert not index._task.done()
+        index.stop()
+
+        return index
+
+    assert asyncio.run(main())._stale
+    assert 'Permission denied' in caplog.text
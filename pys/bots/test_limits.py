@@ -0,0 +1,57 @@
+import asyncio
+
+from limits import Limit
+
+
+def test_cancelling_holder_and_waiter_together() -> None:
+    async def main() -> list:
+        limit = Limit('user', 1, 4)
+        started = asyncio.Event()
+
+        async def hold() -> None:
+            await limit.acquire(1)
+            started.set()
+
+            try:
+                await asyncio.sleep(10)
+
+            finally:
+                limit.release(1)
+
+        holder = asyncio.ensure_future(hold())
+        await started.wait()
+
+        waiter = asyncio.ensure_future(limit.acquire(1))
+        await asyncio.sleep(0)
+
+        # Cancelled in the same iteration, like Bot.close cancels the commands still pending.
+        holder.cancel()
+        waiter.cancel()
+
+        results = await asyncio.gather(holder, waiter, return_exceptions=True)
+
+        assert limit.running == 0 and limit.queued == 0
+
+        return results
+
+    results = asyncio.run(main())
+
+    assert all(isinstance(result, asyncio.CancelledError) for result in results), results
+
+
+def test_release_hands_over_in_order() -> None:
+    async def main() -> list:
+        limit = Limit('user', 1, 4)
+        order = []
+
+        async def run(n: int) -> None:
+            await limit.acquire(1)
+            order.append(n)
+            await asyncio.sleep(0)
+            limit.release(1)
+
+        await asyncio.gather(*(run(n) for n in range(4)))
+
+        return order
+
+    assert asyncio.run(main()) == [0, 1, 2, 3]
@@ -0,0 +1,93 @@
+import asyncio
+import types
+
+import discord
+
+from outbound import Outbound, TokenBucket
+
+
+class Channel:
+    def __init__(self) -> None:
+        self.id = 1
+        self.sent = []
+
+
+async def record(channel: Channel, content: str, **kwargs) -> str:
+    channel.sent.append(content)
+
+    return content
+
+
+def test_texts_are_only_merged_when_asked() -> None:
+    async def main() -> Channel:
+        channel = Channel()
+        outbound = Outbound(send=record)
+
+        futures = [outbound.send(channel, 'a'), outbound.send(channel, 'b')]
+        futures += [outbound.send(channel, line, coalesce=True) for line in 'cde']
+        await asyncio.gather(*futures)
+
+        return channel
+
+    assert asyncio.run(main()).sent == ['a', 'b', 'c\nd\ne']
+
+
+def test_close_cancels_the_batch_being_sent() -> None:
+    async def main() -> asyncio.Future:
+        async def hang(*args, **kwargs) -> None:
+            await asyncio.sleep(10)
+
+        outbound = Outbound(send=hang)
+        future = outbound.send(Channel(), 'stuck')
+        await asyncio.sleep(0.01)
+
+        assert not await outbound.close(timeout=0.01)
+        await asyncio.sleep(0)
+
+        return future
+
+    assert asyncio.run(main()).cancelled()
+
+
+def test_rate_limits_wait_out_the_retry_after_header() -> None:
+    async def main() -> TokenBucket:
+        headers = {'Retry-After': '30'}
+        response = types.SimpleNamespace(status=429, reason='Too Many Requests', headers=headers)
+        error = discord.HTTPException(response, 'You are being rate limited.')
+        route = TokenBucket(5, 5.0)
+
+        async def limited(*args, **kwargs) -> None:
+            raise error
+
+        outbound = Outbound(send=limited, retries=1)
+        attempt = asyncio.ensure_future(outbound._attempt(route, Channel(), 'a', {}))
+        await asyncio.sleep(0.01)
+        attempt.cancel()
+
+        return route
+
+    assert asyncio.run(main()).delay() > 25
+
+
+def test_close_waits_for_messages_queued_while_closing() -> None:
+    async def main() -> Channel:
+        channel, other = Channel(), Channel()
+        other.id = 2
+        outbound = Outbound(send=record)
+
+        first = outbound.send(channel, 'a')
+        first.add_done_callback(lambda _: outbound.send(other, 'b'))
+
+        assert await outbound.close(timeout=1)
+        assert not outbound._workers
+        assert other.sent == ['b']
+
+        try:
+            outbound.send(channel, 'c')
+
+        except RuntimeError:
+            return channel
+
+        raise AssertionError('Sent after closing.')
+
+    assert asyncio.run(main()).sent == ['a']
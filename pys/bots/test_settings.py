@@ -0,0 +1,16 @@
+import copy
+import pickle
+
+from settings import Config, parse
+
+
+def test_configs_can_be_hashed_and_pickled() -> None:
+    config = parse('{"discord": "token", "owners": [1, 2]}', environ={})
+
+    assert hash(config) == hash(Config('token'))
+    assert {config: 1}[copy.deepcopy(config)] == 1
+
+    restored = pickle.loads(pickle.dumps(config))
+    assert restored == config
+    assert restored.owners == [1, 2]
+    assert config != Config('token')
@@ -0,0 +1,11 @@
+from stats import Metrics
+
+
+def test_label_values_are_escaped() -> None:
+    metrics = Metrics()
+    metrics.observe('command:say "hi"\\\n', 0.01)
+
+    rendered = metrics.render()
+
+    assert 'bot_handler_calls_total{handler="command:say \\"hi\\"\\\\\\n"} 1' in rendered
+    assert all(line.count('"') % 2 == 0 for line in rendered.splitlines() if not line.startswith('#'))
@@ -1,7 +1,16 @@
+import asyncio
+import collections
 import functools
+import inspect
+import sys
+import threading
+import time
 import typing as t
 
 
+Key = t.Optional[t.Union[t.Callable[..., t.Hashable], t.Mapping[str, t.Callable]]]
+
+
 def outer(func: t.Callable) -> t.Callable:
 
     @functools.wraps(func)
@@ -22,15 +31,463 @@ class Deco:
     def __call__(self, func):
         print(self.kwargs.get('name'))
 
+        @functools.wraps(func)
         def execute(*args, **kwargs):
             return func(*args, **kwargs)
 
         return execute
 
 
-@Deco(name='the add function')
-def add(num1, num2):
-    return num1 + num2
+class CacheInfo(t.NamedTuple):
+    """What `cache_info()` of a memoized function returns."""
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size: int
+
+
+class _LRU:
+    """Evicts the entry used longest ago."""
+
+    def __init__(self) -> None:
+        self._order = collections.OrderedDict()
+
+    def add(self, key: t.Hashable) -> None:
+        self._order[key] = None
+
+    def touch(self, key: t.Hashable) -> None:
+        self._order.move_to_end(key)
+
+    def remove(self, key: t.Hashable) -> None:
+        del self._order[key]
+
+    def victim(self) -> t.Hashable:
+        return next(iter(self._order))
+
+
+class _LFU:
+    """Evicts the entry used the fewest times, and of those the one used longest ago.
+
+    Keys are kept in one bucket per use count, so finding the victim doesn't search every key.
+    """
+
+    def __init__(self) -> None:
+        self._counts = {}
+        self._buckets = collections.defaultdict(collections.OrderedDict)
+        self._least = 0
+
+    def add(self, key: t.Hashable) -> None:
+        self._counts[key] = 1
+        self._buckets[1][key] = None
+        self._least = 1
+
+    def touch(self, key: t.Hashable) -> None:
+        count = self._counts[key]
+        self._counts[key] = count + 1
+
+        self._drop(key, count)
+        self._buckets[count + 1][key] = None
+
+        if self._least == count and count not in self._buckets:
+            self._least = count + 1
+
+    def remove(self, key: t.Hashable) -> None:
+        self._drop(key, self._counts.pop(key))
+
+    def victim(self) -> t.Hashable:
+        # Removing can empty the least used bucket, but adding resets it to 1, so searching is rare.
+        if self._least not in self._buckets:
+            self._least = min(self._buckets)
+
+        return next(iter(self._buckets[self._least]))
+
+    def _drop(self, key: t.Hashable, count: int) -> None:
+        bucket = self._buckets[count]
+        del bucket[key]
+
+        if not bucket:
+            del self._buckets[count]
+
+
+POLICIES = {'lru': _LRU, 'lfu': _LFU}
+
+
+class _Call:
+    """A call that is computing a value, which other threads missing the same key wait for.
+
+    The lock is held until the value is there. It is much cheaper to create than an `Event`,
+    which matters since every miss creates one.
+    """
+
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self) -> None:
+        self.done = threading.Lock()
+        self.done.acquire()
+        self.value = None
+        self.error = None
+
+
+class Memoized:
+    """The cache behind a function decorated with `memoize`.
+
+    Attributes:
+        max_entries (:obj:`t.Optional[int]`): The amount of entries kept at most.
+        max_bytes (:obj:`t.Optional[int]`): The size the entries may take up, as measured by `sizeof`.
+        ttl (:obj:`t.Optional[float]`): Seconds an entry stays valid.
+
+    """
+
+    def __init__(
+        self,
+        func: t.Callable,
+        policy: str = 'lru',
+        max_entries: t.Optional[int] = 128,
+        max_bytes: t.Optional[int] = None,
+        ttl: t.Optional[float] = None,
+        key: Key = None,
+        sizeof: t.Callable[[t.Any], int] = sys.getsizeof
+    ) -> None:
+        """Creating important attributes for this class.
+
+        Args:
+            func (:obj:`t.Callable`): The function or coroutine function whose results are cached.
+            policy (str, optional): 'lru' or 'lfu', what is evicted past the limits. Defaults to 'lru'.
+            max_entries (:obj:`t.Optional[int]`, optional): The amount of entries kept at most.
+                Defaults to 128.
+            max_bytes (:obj:`t.Optional[int]`, optional): The size the entries may take up. Results
+                larger than this on their own aren't cached. Defaults to no limit.
+            ttl (:obj:`t.Optional[float]`, optional): Seconds an entry stays valid. Defaults to forever.
+            key (:obj:`Key`, optional):
+                Builds the key from the arguments, or maps argument names to functions building each
+                one's part of the key, such as `{'user': lambda user: user.id}`. Defaults to the
+                arguments themselves, which then have to be hashable.
+            sizeof (:obj:`t.Callable[[t.Any], int]`, optional): Measures a result for `max_bytes`.
+                Defaults to `sys.getsizeof`, which is shallow, so containers need something deeper.
+
+        Raises:
+            ValueError: When `policy` isn't 'lru' or 'lfu'.
+
+        """
+        if policy not in POLICIES:
+            raise ValueError(f'Expected one of {", ".join(POLICIES)} as the policy, got {policy!r}.')
+
+        self.func = func
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof
+
+        self._policy = POLICIES[policy]()
+        self._make_key = _key_maker(func, key)
+
+        # Key to (value, size, expiry), and key to expiry in the order they expire in.
+        self._entries = {}
+        self._expiries = collections.OrderedDict()
+        self._calls = {}
+        self._lock = threading.Lock()
+
+        self._hits = self._misses = self._evictions = self._size = 0
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._evictions, len(self._entries), self._size)
+
+    def clear(self) -> None:
+        with self._lock:
+            for k in list(self._entries):
+                self._remove(k)
+
+            self._hits = self._misses = self._evictions = 0
+
+    def call(self, args: tuple, kwargs: dict) -> t.Any:
+        """Calls the function on a miss. Threads missing the same key wait for the first one's call."""
+        k = self._make_key(args, kwargs)
+
+        with self._lock:
+            value = self._get(k)
+
+            if value is not _MISSING:
+                return value
+
+            pending = self._calls.get(k)
+
+            if pending is None:
+                pending = self._calls[k] = _Call()
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            with pending.done:
+                pass
+
+            if pending.error is not None:
+                raise pending.error
+
+            return pending.value
+
+        try:
+            pending.value = self.func(*args, **kwargs)
+
+        except BaseException as e:
+            pending.error = e
+            raise
+
+        else:
+            with self._lock:
+                self._set(k, pending.value)
+
+            return pending.value
+
+        finally:
+            with self._lock:
+                del self._calls[k]
+
+            pending.done.release()
+
+    async def call_async(self, args: tuple, kwargs: dict) -> t.Any:
+        """Awaits the coroutine function on a miss. Tasks missing the same key share the first one's call.
+
+        The call runs in its own task, so cancelling one of the callers doesn't cancel it for the others.
+        """
+        k = self._make_key(args, kwargs)
+
+        with self._lock:
+            value = self._get(k)
+
+        if value is not _MISSING:
+            return value
+
+        future = self._calls.get(k)
+
+        if future is None:
+            future = self._calls[k] = asyncio.ensure_future(self.func(*args, **kwargs))
+            future.add_done_callback(functools.partial(self._finish, k))
+
+        return await asyncio.shield(future)
+
+    def _finish(self, k: t.Hashable, future: asyncio.Future) -> None:
+        if self._calls.get(k) is future:
+            del self._calls[k]
+
+        if not future.cancelled() and future.exception() is None:
+            with self._lock:
+                self._set(k, future.result())
+
+    def _get(self, k: t.Hashable) -> t.Any:
+        entry = self._entries.get(k)
+
+        # Without a TTL nothing expires, so hits don't need to read the clock.
+        if entry is not None and (self.ttl is None or entry[2] > time.monotonic()):
+            self._policy.touch(k)
+            self._hits += 1
+
+            return entry[0]
+
+        if entry is not None:
+            self._remove(k)
+
+        self._misses += 1
+
+        return _MISSING
+
+    def _set(self, k: t.Hashable, value: t.Any) -> None:
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        if k in self._entries:
+            self._remove(k)
+
+        now = time.monotonic()
+
+        # Every entry has the same TTL, so the ones expiring first are always at the front.
+        while self._expiries and next(iter(self._expiries.values())) <= now:
+            self._remove(next(iter(self._expiries)))
+
+        while self._entries and (
+            (self.max_entries is not None and len(self._entries) >= self.max_entries)
+            or (self.max_bytes is not None and self._size + size > self.max_bytes)
+        ):
+            self._remove(self._policy.victim())
+            self._evictions += 1
+
+        if self.max_entries is not None and self.max_entries <= 0:
+            return
+
+        expiry = now + self.ttl if self.ttl is not None else None
+
+        self._entries[k] = (value, size, expiry)
+        self._policy.add(k)
+        self._size += size
+
+        if expiry is not None:
+            self._expiries[k] = expiry
+
+    def _remove(self, k: t.Hashable) -> None:
+        _, size, _ = self._entries.pop(k)
+
+        self._policy.remove(k)
+        self._expiries.pop(k, None)
+        self._size -= size
+
+
+def memoize(
+    func: t.Optional[t.Callable] = None,
+    *,
+    policy: str = 'lru',
+    max_entries: t.Optional[int] = 128,
+    max_bytes: t.Optional[int] = None,
+    ttl: t.Optional[float] = None,
+    key: Key = None,
+    sizeof: t.Callable[[t.Any], int] = sys.getsizeof
+) -> t.Callable:
+    """Caches the results of a function or coroutine function, like `functools.lru_cache` with more control.
+
+    Meant for expensive functions, such as ones doing I/O or heavy computation. Every call builds a
+    key and takes a lock, which costs more than a cheap function such as `abs` takes to run.
+
+    Concurrent calls that miss the same key compute it once: other threads wait for the first call,
+    and other tasks await it. Exceptions aren't cached. The decorated function gets `cache_info()`,
+    `cache_clear()` and `cache`, the `Memoized` behind it. The arguments are the same as `Memoized`'s.
+
+    Returns:
+        :obj:`t.Callable`: The decorated function, or the decorator if used with arguments.
+
+    Examples:
+        >>> @memoize(policy='lfu', max_bytes=64 * 1024 ** 2, sizeof=lambda array: array.nbytes)
+        ... def render(expression: str) -> np.ndarray:
+        ...     ...
+        >>> @memoize(ttl=60, key={'user': lambda user: user.id})
+        ... async def fetch_profile(user: discord.User, fresh: bool = False) -> dict:
+        ...     ...
+
+    """
+    def decorator(func: t.Callable) -> t.Callable:
+        cache = Memoized(func, policy, max_entries, max_bytes, ttl, key, sizeof)
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs) -> t.Any:
+                return await cache.call_async(args, kwargs)
+
+        else:
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs) -> t.Any:
+                return cache.call(args, kwargs)
+
+        wrapper.cache = cache
+        wrapper.cache_info = cache.info
+        wrapper.cache_clear = cache.clear
+
+        return wrapper
+
+    # Used as `@memoize`, without calling it first.
+    return decorator(func) if func is not None else decorator
+
+
+def _key_maker(func: t.Callable, key: Key) -> t.Callable[[tuple, dict], t.Hashable]:
+    if key is None:
+        # The marker keeps f(1, b=2) apart from positional arguments that happen to look the same.
+        return lambda args, kwargs: args + (_MISSING, *sorted(kwargs.items())) if kwargs else args
+
+    if callable(key):
+        return lambda args, kwargs: key(*args, **kwargs)
+
+    # Binding to the signature, so an argument gets the same key whether it was passed by position or name.
+    signature = inspect.signature(func)
+    kinds = {name: parameter.kind for name, parameter in signature.parameters.items()}
+
+    def part(name: str, value: t.Any) -> t.Hashable:
+        if name in key:
+            return key[name](value)
+
+        # `**kwargs` binds to a dictionary, which can't be hashed, and `*args` to a tuple.
+        if kinds[name] is inspect.Parameter.VAR_KEYWORD:
+            return tuple(sorted(value.items()))
+
+        if kinds[name] is inspect.Parameter.VAR_POSITIONAL:
+            return tuple(value)
+
+        return value
+
+    def make_key(args: tuple, kwargs: dict) -> t.Hashable:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+
+        return tuple(part(name, value) for name, value in bound.arguments.items())
+
+    return make_key
+
+
+_MISSING = object()
+
+
+if __name__ == "__main__":
+    import timeit
+
+    @Deco(name='the add function')
+    def add(num1, num2):
+        return num1 + num2
+
+    print(add(3, 4))
+
+    @memoize(max_entries=None)
+    def fibonacci(n: int) -> int:
+        return n if n < 2 else fibonacci(n - 1) + fibonacci(n - 2)
+
+    print(fibonacci(200), fibonacci.cache_info())
+
+    # Ten threads, or tasks, missing the same key at once compute it once.
+    calls = collections.Counter()
+
+    @memoize
+    def slow(n: int) -> int:
+        calls['slow'] += 1
+        time.sleep(0.1)
+        return n
+
+    threads = [threading.Thread(target=slow, args=(1,)) for _ in range(10)]
+    [thread.start() for thread in threads]
+    [thread.join() for thread in threads]
+
+    @memoize(ttl=0.1)
+    async def fetch(n: int) -> int:
+        calls['fetch'] += 1
+        await asyncio.sleep(0.05)
+        return n
+
+    async def fetch_many() -> None:
+        await asyncio.gather(*(fetch(1) for _ in range(10)))
+
+        # Expired by now, so this calls it again.
+        await asyncio.sleep(0.15)
+        await fetch(1)
+
+    asyncio.run(fetch_many())
+    print(f'10 threads: {calls["slow"]} call, 11 tasks with an expiry in between: {calls["fetch"]} calls')
+
+    def bench(label: str, func: t.Callable) -> None:
+        seconds = min(timeit.repeat(func, number=1, repeat=5))
+        print(f'  {label:<32} {seconds * 1000:>8.2f}ms')
+
+    import random
 
+    # Popular keys come up far more often than the rest, as they do for most caches.
+    keys = [int(random.expovariate(1 / 300)) for _ in range(1_000_000)]
+    print('\n1,000,000 calls, with keys skewed towards small numbers, capped at 512 entries')
 
-print(add(3, 4))
+    for label, decorated in (
+        ('functools.lru_cache', functools.lru_cache(512)(abs)),
+        ('memoize, lru', memoize(abs, max_entries=512)),
+        ('memoize, lfu', memoize(abs, max_entries=512, policy='lfu')),
+        ('memoize, lru with a ttl', memoize(abs, max_entries=512, ttl=60))
+    ):
+        bench(label, lambda: [decorated(k) for k in keys])
+        info = decorated.cache_info()
+        print(f'  {"":<32} {info.hits / (info.hits + info.misses):>9.1%} hits')
@@ -0,0 +1,466 @@
+import heapq
+import typing as t
+
+import numpy as np
+
+from vectors import Vector, VectorArray
+
+
+class KDTree:
+    """A k-d tree over points of [x, y], for nearest neighbour, radius and bounding box queries.
+
+    The tree is built in bulk: the points are split at the median of their wider side until at most
+    `leaf_size` are left, and every node keeps the bounding box of its points. Queries walk the nodes
+    in Python, skipping the ones whose box is too far away, and check the points of a leaf with NumPy.
+
+    Points are known by their ID, which is their position in the array the tree was built from, and
+    then counts up with every insert. Inserted points wait in a buffer that queries check by brute force,
+    deleted points are masked out, and the tree is rebuilt once either makes up too much of it.
+
+    Attributes:
+        leaf_size (int): Points per leaf at most.
+        rebuilds (int): How many times the tree was rebuilt after inserts and deletes.
+
+    Examples:
+        >>> tree = KDTree(VectorArray(np.random.rand(1_000_000, 2)))
+        >>> distances, ids = tree.nearest(Vector(0.5, 0.5), k=5)
+
+    """
+
+    def __init__(self, points: t.Any = (), leaf_size: int = 64) -> None:
+        """Creating important attributes for this class.
+
+        Args:
+            points (:obj:`t.Any`, optional): A `VectorArray`, or anything it can be made from.
+            leaf_size (int, optional): Points per leaf at most. Defaults to 64.
+
+        """
+        data = np.array(VectorArray(points).data, dtype=np.float64)
+
+        self.leaf_size = leaf_size
+        self.rebuilds = 0
+
+        self._points = data
+        self._alive = np.ones(len(data), dtype=bool)
+        self._count = len(data)
+        self._deleted = 0
+
+        self._build()
+
+    def __len__(self) -> int:
+        return self._count - self._deleted
+
+    def __contains__(self, point_id: int) -> bool:
+        return 0 <= point_id < self._count and bool(self._alive[point_id])
+
+    @property
+    def points(self) -> VectorArray:
+        """Every point ever added, by ID. Deleted points are still there, so IDs stay valid."""
+        return VectorArray(self._points[:self._count])
+
+    def insert(self, points: t.Any) -> np.ndarray:
+        """Adds points, without rebuilding the tree unless the buffer of inserted points is too big.
+
+        Args:
+            points (:obj:`t.Any`): A `Vector`, a `VectorArray`, or anything one can be made from.
+
+        Returns:
+            :obj:`np.ndarray`: The IDs of the new points.
+
+        """
+        data = _points(points)
+        end = self._count + len(data)
+
+        if end > len(self._points):
+            capacity = max(end, 2 * len(self._points), 16)
+            self._points = np.resize(self._points, (capacity, 2))
+            self._alive = np.resize(self._alive, capacity)
+
+        self._points[self._count:end] = data
+        self._alive[self._count:end] = True
+
+        ids = np.arange(self._count, end)
+        self._count = end
+
+        if end - self._built > max(1024, self._built // 8):
+            self._rebuild()
+
+        return ids
+
+    def delete(self, point_ids: t.Any) -> None:
+        """Removes points by their ID, ignoring the ones already removed.
+
+        Args:
+            point_ids (:obj:`t.Any`): One ID, or many.
+
+        Returns:
+            bool: Always None.
+
+        Raises:
+            IndexError: When an ID was never given out.
+
+        """
+        # Repeated IDs would be counted once per repeat, leaving the length wrong for good.
+        point_ids = np.unique(np.asarray(point_ids, dtype=np.intp))
+
+        if len(point_ids) and (point_ids.min() < 0 or point_ids.max() >= self._count):
+            raise IndexError('Point ID out of range.')
+
+        self._deleted += int(np.count_nonzero(self._alive[point_ids]))
+        self._alive[point_ids] = False
+
+        if self._deleted - self._deleted_at_build > max(1024, len(self) // 4):
+            self._rebuild()
+
+    def nearest(self, points: t.Any, k: int = 1) -> t.Tuple[np.ndarray, np.ndarray]:
+        """Finds the `k` nearest points of every query point, closest first.
+
+        Args:
+            points (:obj:`t.Any`): A `Vector`, or many query points such as a `VectorArray`.
+            k (int, optional): Neighbours per query point. Defaults to 1.
+
+        Returns:
+            :obj:`t.Tuple[np.ndarray, np.ndarray]`: Distances and IDs, both of shape (queries, k). If
+                there are fewer than `k` points, the rest is padded with infinity and -1.
+
+        Raises:
+            ValueError: When `k` is less than 1.
+
+        """
+        if k < 1:
+            raise ValueError(f'Expected at least 1 neighbour, got {k}.')
+
+        queries = _points(points)
+        distances = np.full((len(queries), k), np.inf)
+        ids = np.full((len(queries), k), -1, dtype=np.intp)
+
+        for i, (x, y) in enumerate(queries.tolist()):
+            found_squared, found = self._nearest(x, y, k)
+
+            distances[i, :len(found)] = np.sqrt(found_squared)
+            ids[i, :len(found)] = found
+
+        return distances, ids
+
+    def within(self, points: t.Any, radius: float) -> t.List[np.ndarray]:
+        """Finds the points within a distance of every query point, in no particular order.
+
+        Args:
+            points (:obj:`t.Any`): A `Vector`, or many query points such as a `VectorArray`.
+            radius (float): The distance, inclusive.
+
+        Returns:
+            :obj:`t.List[np.ndarray]`: The IDs found, one array per query point.
+
+        """
+        return [self._within(x, y, radius * radius) for x, y in _points(points).tolist()]
+
+    def in_box(self, low: t.Any, high: t.Any) -> np.ndarray:
+        """Finds the points within a bounding box, in no particular order.
+
+        Args:
+            low (:obj:`t.Any`): The corner with the lowest coordinates, such as a `Vector`.
+            high (:obj:`t.Any`): The corner with the highest coordinates.
+
+        Returns:
+            :obj:`np.ndarray`: The IDs found, edges included.
+
+        """
+        (x0, y0), = _points(low).tolist()
+        (x1, y1), = _points(high).tolist()
+
+        found = []
+        stack = [0] if self._start else []
+
+        while stack:
+            node = stack.pop()
+            bx0, by0, bx1, by1 = self._boxes[node]
+
+            if bx0 > x1 or bx1 < x0 or by0 > y1 or by1 < y0:
+                continue
+
+            # Every point of a box that is fully inside qualifies, so none of them have to be checked.
+            if bx0 >= x0 and bx1 <= x1 and by0 >= y0 and by1 <= y1:
+                found.append(self._order[self._start[node]:self._end[node]])
+
+            elif self._left[node] < 0:
+                ids, p = self._leaf(node)
+                found.append(ids[(p[:, 0] >= x0) & (p[:, 0] <= x1) & (p[:, 1] >= y0) & (p[:, 1] <= y1)])
+
+            else:
+                stack.extend((self._left[node], self._right[node]))
+
+        ids = self._buffer_ids()
+        p = self._points[ids]
+        found.append(ids[(p[:, 0] >= x0) & (p[:, 0] <= x1) & (p[:, 1] >= y0) & (p[:, 1] <= y1)])
+
+        ids = np.concatenate(found)
+
+        return ids[self._alive[ids]] if self._deleted else ids
+
+    def _build(self) -> None:
+        """Builds the tree over every point added so far, forgetting the deleted ones."""
+        order = np.flatnonzero(self._alive[:self._count])
+
+        # The points in tree order, so the points of every node are a slice instead of a gather.
+        xy = self._points[order]
+
+        start, end, left, right, leaves = [], [], [], [], []
+        # The range of `order` a node covers, its parent, which child of the parent it is, and a box
+        # around its points. Reducing every node to its exact box would take most of the build.
+        stack = []
+
+        if len(order):
+            stack.append((0, len(order), -1, None, (*xy.min(axis=0).tolist(), *xy.max(axis=0).tolist())))
+
+        while stack:
+            lo, hi, parent, side, box = stack.pop()
+            node = len(start)
+
+            start.append(lo)
+            end.append(hi)
+            left.append(-1)
+            right.append(-1)
+
+            if parent >= 0:
+                side[parent] = node
+
+            if hi - lo <= self.leaf_size:
+                leaves.append(node)
+                continue
+
+            # Splitting the wider side at its median, so every level halves the points.
+            x0, y0, x1, y1 = box
+            axis = int(y1 - y0 > x1 - x0)
+            mid = (lo + hi) // 2
+            p = xy[lo:hi]
+            split = np.argpartition(p[:, axis], mid - lo)
+
+            xy[lo:hi] = p[split]
+            order[lo:hi] = order[lo:hi][split]
+
+            median = float(xy[mid, axis])
+            low_box, high_box = ((x0, y0, median, y1), (median, y0, x1, y1)) if axis == 0 else \
+                ((x0, y0, x1, median), (x0, median, x1, y1))
+
+            stack.append((mid, hi, node, right, high_box))
+            stack.append((lo, mid, node, left, low_box))
+
+        # Exact boxes for every leaf at once, which are then merged up the tree. Leaves were reached
+        # in order, and every node was numbered before its children.
+        boxes = [None] * len(start)
+
+        if leaves:
+            offsets = [start[leaf] for leaf in leaves]
+            bounds = zip(
+                *(f.reduceat(xy[:, axis], offsets).tolist() for f, axis in (
+                    (np.minimum, 0), (np.minimum, 1), (np.maximum, 0), (np.maximum, 1)
+                ))
+            )
+
+            for leaf, box in zip(leaves, bounds):
+                boxes[leaf] = box
+
+        for node in reversed(range(len(start))):
+            if left[node] >= 0:
+                a, b = boxes[left[node]], boxes[right[node]]
+                boxes[node] = (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+
+        self._order = order
+        self._xy = xy
+        self._start, self._end, self._left, self._right, self._boxes = start, end, left, right, boxes
+        self._built = self._count
+        self._deleted_at_build = self._deleted
+
+    def _rebuild(self) -> None:
+        self._build()
+        self.rebuilds += 1
+
+    def _leaf(self, node: int) -> t.Tuple[np.ndarray, np.ndarray]:
+        """The IDs and points of a leaf, including deleted ones, without copying them."""
+        lo, hi = self._start[node], self._end[node]
+
+        return self._order[lo:hi], self._xy[lo:hi]
+
+    def _buffer_ids(self) -> np.ndarray:
+        """The points inserted since the tree was built, which are checked by brute force."""
+        return np.arange(self._built, self._count)
+
+    def _nearest(self, x: float, y: float, k: int) -> t.Tuple[np.ndarray, np.ndarray]:
+        ids = self._buffer_ids()
+        ids = ids[self._alive[ids]]
+        p = self._points[ids]
+
+        best_ids = ids
+        best = (p[:, 0] - x) ** 2 + (p[:, 1] - y) ** 2
+        best_ids, best = _smallest(best_ids, best, k)
+        worst = best.max() if len(best) == k else np.inf
+
+        heap = [(0.0, 0)] if self._start else []
+
+        while heap:
+            distance, node = heapq.heappop(heap)
+
+            # The closest box left is further away than the k-th point found, so nothing else can be closer.
+            if distance > worst:
+                break
+
+            if self._left[node] < 0:
+                ids, p = self._leaf(node)
+
+                if self._deleted != self._deleted_at_build:
+                    alive = self._alive[ids]
+                    ids, p = ids[alive], p[alive]
+
+                best_ids, best = _smallest(
+                    np.concatenate((best_ids, ids)),
+                    np.concatenate((best, (p[:, 0] - x) ** 2 + (p[:, 1] - y) ** 2)),
+                    k
+                )
+
+                if len(best) == k:
+                    worst = best.max()
+
+                continue
+
+            for child in (self._left[node], self._right[node]):
+                child_distance = _box_distance(self._boxes[child], x, y)
+
+                if child_distance <= worst:
+                    heapq.heappush(heap, (child_distance, child))
+
+        order = np.argsort(best, kind='stable')
+
+        return best[order], best_ids[order]
+
+    def _within(self, x: float, y: float, squared: float) -> np.ndarray:
+        found = []
+        stack = [0] if self._start else []
+
+        while stack:
+            node = stack.pop()
+            box = self._boxes[node]
+
+            if _box_distance(box, x, y) > squared:
+                continue
+
+            # Every point of a box whose furthest corner is in range qualifies, without checking them.
+            bx0, by0, bx1, by1 = box
+            if max((bx0 - x) ** 2, (bx1 - x) ** 2) + max((by0 - y) ** 2, (by1 - y) ** 2) <= squared:
+                found.append(self._order[self._start[node]:self._end[node]])
+
+            elif self._left[node] < 0:
+                ids, p = self._leaf(node)
+                found.append(ids[(p[:, 0] - x) ** 2 + (p[:, 1] - y) ** 2 <= squared])
+
+            else:
+                stack.extend((self._left[node], self._right[node]))
+
+        ids = self._buffer_ids()
+        p = self._points[ids]
+        found.append(ids[(p[:, 0] - x) ** 2 + (p[:, 1] - y) ** 2 <= squared])
+
+        ids = np.concatenate(found)
+
+        return ids[self._alive[ids]] if self._deleted else ids
+
+
+def _points(points: t.Any) -> np.ndarray:
+    """Turns a `Vector`, a `VectorArray` or pairs into an array of shape (n, 2)."""
+    if isinstance(points, Vector):
+        return np.array([[points.x, points.y]])
+
+    data = np.asarray(points.data if isinstance(points, VectorArray) else points, dtype=np.float64)
+
+    return data.reshape(-1, 2)
+
+
+def _box_distance(box: t.Tuple[float, float, float, float], x: float, y: float) -> float:
+    """The squared distance from a point to the closest point of a box, 0 if it is inside."""
+    x0, y0, x1, y1 = box
+    dx = x0 - x if x < x0 else x - x1 if x > x1 else 0.0
+    dy = y0 - y if y < y0 else y - y1 if y > y1 else 0.0
+
+    return dx * dx + dy * dy
+
+
+def _smallest(ids: np.ndarray, distances: np.ndarray, k: int) -> t.Tuple[np.ndarray, np.ndarray]:
+    """Keeps the `k` closest of some candidates, in no particular order."""
+    if len(distances) <= k:
+        return ids, distances
+
+    keep = np.argpartition(distances, k - 1)[:k]
+
+    return ids[keep], distances[keep]
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    def timed(func: t.Callable, repeat: int) -> float:
+        """Seconds per call, the best of three rounds of `repeat` calls."""
+        best = float('inf')
+
+        for _ in range(3):
+            start = time.perf_counter()
+
+            for _ in range(repeat):
+                func()
+
+            best = min(best, (time.perf_counter() - start) / repeat)
+
+        return best
+
+    # Usage: python spatial.py [largest power of ten, 7 by default]
+    largest = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    rng = np.random.default_rng(0)
+    queries = rng.random((100, 2))
+
+    print(f'{"points":>12}  {"build (ms)":>10}  {"query":<7}  {"tree (us)":>10}  {"numpy (us)":>10}  '
+          f'{"Vector (us)":>11}  {"speedup":>8}')
+
+    for exponent in range(3, largest + 1):
+        n = 10 ** exponent
+        data = rng.random((n, 2))
+
+        start = time.perf_counter()
+        tree = KDTree(VectorArray(data))
+        build = time.perf_counter() - start
+
+        radius = (10 / (n * np.pi)) ** 0.5    # About 10 points in range.
+        low, high = Vector(0.5, 0.5), Vector(0.5 + 4 * radius, 0.5 + 4 * radius)
+        array = VectorArray(data)
+        vectors = list(array) if n <= 10 ** 5 else None
+        query, point = queries[0], Vector(*queries[0])
+
+        cases = {
+            'knn': (
+                lambda: tree.nearest(queries, k=10),
+                lambda: np.argpartition((array - query).norms(), 10)[:10],
+                lambda: sorted(range(n), key=lambda i: abs(vectors[i] - point))[:10]
+            ),
+            'radius': (
+                lambda: tree.within(queries, radius),
+                lambda: np.flatnonzero((array - query).norms() <= radius),
+                lambda: [i for i, v in enumerate(vectors) if abs(v - point) <= radius]
+            ),
+            'box': (
+                lambda: [tree.in_box(low, high) for _ in range(len(queries))],
+                lambda: np.flatnonzero(
+                    (array.x >= low.x) & (array.x <= high.x) & (array.y >= low.y) & (array.y <= high.y)
+                ),
+                lambda: [
+                    i for i, v in enumerate(vectors) if low.x <= v.x <= high.x and low.y <= v.y <= high.y
+                ]
+            )
+        }
+
+        for label, (batched, brute, python) in cases.items():
+            # The tree answers every query point in one call, so its time is divided among them.
+            tree_time = timed(batched, 1) / len(queries)
+            numpy_time = timed(brute, 3 if n >= 10 ** 6 else 20)
+            python_time = timed(python, 1) if vectors is not None else float('nan')
+
+            print(f'{n:>12,}  {build * 1000:>10.1f}  {label:<7}  {tree_time * 1e6:>10.1f}  '
+                  f'{numpy_time * 1e6:>10.1f}  {python_time * 1e6:>11.1f}  {numpy_time / tree_time:>7.1f}x')
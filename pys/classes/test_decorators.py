@@ -0,0 +1,25 @@
+from decorators import memoize
+
+
+def test_key_mapping_with_variable_arguments() -> None:
+    calls = []
+
+    @memoize(key={'user': lambda user: user['id']})
+    def greet(user: dict, *names: str, **options: int) -> int:
+        calls.append(user)
+
+        return len(calls)
+
+    assert greet({'id': 1}, 'a', 'b', loud=1, times=2) == 1
+    assert greet({'id': 1, 'name': 'x'}, 'a', 'b', times=2, loud=1) == 1
+    assert greet({'id': 1}, 'a', times=2, loud=1) == 2
+    assert greet.cache_info().hits == 1
+
+
+def test_ttl_expires_entries() -> None:
+    @memoize(ttl=0)
+    def now(n: int) -> list:
+        return [n]
+
+    assert now(1) is not now(1)
+    assert now.cache_info().hits == 0
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from spatial import KDTree
+
+
+def test_delete_counts_repeated_ids_once() -> None:
+    tree = KDTree(np.random.default_rng(0).random((10, 2)))
+    tree.delete([3, 3])
+
+    assert len(tree) == 9
+    assert 3 not in tree
+
+    tree.delete([3, 4, 4])
+
+    assert len(tree) == 8
+
+
+def test_nearest_matches_brute_force_after_changes() -> None:
+    rng = np.random.default_rng(1)
+    tree = KDTree(rng.random((2_000, 2)), leaf_size=8)
+    tree.insert(rng.random((300, 2)))
+    tree.delete(rng.integers(0, 2_300, 500))
+
+    queries = rng.random((20, 2))
+    distances, ids = tree.nearest(queries, k=5)
+
+    points = tree.points.data
+    alive = np.array([i in tree for i in range(len(points))])
+    brute = np.linalg.norm(points[None, alive] - queries[:, None], axis=2)
+
+    assert len(tree) == alive.sum()
+    assert np.allclose(distances, np.sort(brute, axis=1)[:, :5])
+
+
+def test_nearest_needs_at_least_one_neighbour() -> None:
+    tree = KDTree(np.random.default_rng(2).random((10, 2)))
+
+    with pytest.raises(ValueError, match='at least 1'):
+        tree.nearest([0.5, 0.5], k=0)
@@ -0,0 +1,85 @@
+import time
+
+import pytest
+
+from timing import Histogram, Timings, _lowest, _SUB_BITS
+
+
+def bucket_of(ns: int) -> int:
+    histogram = Histogram()
+    histogram.record(ns, time.perf_counter_ns())
+
+    return next(iter(histogram.counts()))
+
+
+def test_durations_fall_into_the_bucket_covering_them() -> None:
+    for ns in (0, 1, 31, 32, 33, 63, 64, 1000, 123_456_789, 2 ** 40 + 12_345, 2 ** 63 - 1):
+        bucket = bucket_of(ns)
+        assert _lowest(bucket) <= ns < _lowest(bucket + 1)
+
+
+def test_powers_of_two_start_a_bucket() -> None:
+    for power in range(_SUB_BITS + 1, 63):
+        assert _lowest(bucket_of(2 ** power)) == 2 ** power
+        assert _lowest(bucket_of(2 ** power - 1) + 1) == 2 ** power
+
+
+def test_percentiles_are_within_a_bucket() -> None:
+    histogram = Histogram()
+    now = time.perf_counter_ns()
+
+    for us in range(1, 1001):
+        histogram.record(us * 1000, now)
+
+    summary = histogram.summary()
+    assert summary['calls'] == 1000
+    assert summary['max'] == 1.0
+
+    for label, ms in (('mean', 0.5), ('p50', 0.5), ('p90', 0.9), ('p99', 0.99)):
+        assert summary[label] == pytest.approx(ms, rel=0.04)
+
+
+def test_old_slices_roll_out_of_the_window() -> None:
+    histogram = Histogram(window=60, slices=6)
+    histogram.record(100, time.perf_counter_ns())
+
+    histogram.record(1000, histogram._ends)
+    assert sorted(histogram.counts()) == [bucket_of(100), bucket_of(1000)]
+
+    histogram.record(1000, histogram._ends + 5 * histogram._length)
+    assert list(histogram.counts()) == [bucket_of(1000)]
+    assert histogram.summary()['max'] == 1000 / 1e6
+
+
+def test_stripped_and_disabled_timings() -> None:
+    def add(a: int, b: int) -> int:
+        return a + b
+
+    assert Timings(strip=True).timed(add) is add
+
+    timings = Timings(enabled=False)
+    disabled = timings.timed(add)
+    assert disabled(1, 2) == 3
+    assert disabled.timer.calls == 0
+
+    timings.enabled = True
+    assert disabled(1, 2) == 3
+    assert disabled.timer.summary()['calls'] == 1
+
+
+def test_sampled_and_captured_calls() -> None:
+    timings = Timings()
+    sampled = timings.timed(lambda: None, name='sampled', sample=4)
+    profiled = timings.timed(lambda: None, name='profiled', profile_every=1)
+
+    for _ in range(8):
+        sampled()
+        profiled()
+
+    assert sampled.timer.summary()['calls'] == 2
+
+    summary = profiled.timer.summary()
+    assert (summary['total_calls'], summary['calls'], summary['profile']['calls']) == (8, 0, 8)
+
+    with pytest.raises(ValueError):
+        timings.timed(lambda: None, sample=0)
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from vectors import Vector, VectorArray
+
+
+def test_distances_far_from_the_origin() -> None:
+    rng = np.random.default_rng(0)
+    points = rng.random((200, 2)) + 1e6
+    others = rng.random((50, 2)) + 1e6
+
+    exact = np.linalg.norm(points[:, None] - points[None], axis=-1)
+    assert np.allclose(VectorArray(points).distances(), exact, rtol=0, atol=1e-9)
+
+    exact = np.linalg.norm(points[:, None] - others[None], axis=-1)
+    assert np.allclose(VectorArray(points).distances(VectorArray(others)), exact, rtol=0, atol=1e-9)
+
+
+def test_vectors_are_not_hashable() -> None:
+    with pytest.raises(TypeError):
+        hash(Vector(1, 2))
+
+
+def test_converting_to_an_array_copies_when_asked() -> None:
+    data = np.zeros((3, 2))
+    vectors = VectorArray(data)
+
+    copied = np.array(vectors)
+    copied[0, 0] = 1
+    assert data[0, 0] == 0
+
+    assert np.asarray(vectors) is data
+    assert np.asarray(vectors, dtype=np.float32).dtype == np.float32
+
+    with pytest.raises(ValueError):
+        np.asarray(vectors, dtype=np.float32, copy=False)
@@ -0,0 +1,557 @@
+import collections
+import cProfile
+import functools
+import inspect
+import io
+import json
+import os
+import pstats
+import time
+import tracemalloc
+import typing as t
+
+
+# Sub-buckets per power of two, as bits. 4 gives 16 of them, so buckets are within about 6% of their values.
+_SUB_BITS = 4
+_LINEAR = 2 << _SUB_BITS
+
+# Enough buckets for any duration that fits in 64 bits.
+_BUCKETS = (64 - _SUB_BITS + 1) << _SUB_BITS
+
+
+def _lowest(bucket: int) -> int:
+    """The smallest duration that falls into a bucket."""
+    if bucket < _LINEAR:
+        return bucket
+
+    shift = (bucket >> _SUB_BITS) - 1
+
+    return (bucket - (shift << _SUB_BITS)) << shift
+
+
+def _middle(bucket: int) -> float:
+    """The duration in the middle of a bucket, off by half of its width at most instead of all of it."""
+    return (_lowest(bucket) + _lowest(bucket + 1) - 1) / 2
+
+
+class Histogram:
+    """Latencies of the last `window` seconds, in buckets of durations instead of one entry per call.
+
+    The window is split into `slices`, and the oldest slice is dropped as a new one starts, so the
+    histogram rolls forward without ever holding more than `slices` sets of counts.
+
+    Attributes:
+        window (float): Seconds of calls the histogram covers.
+        slices (int): Parts the window is split into, the oldest being dropped as time moves on.
+
+    """
+
+    def __init__(self, window: float = 60.0, slices: int = 6) -> None:
+        self.window = window
+        self.slices = slices
+
+        self._length = int(window * 1e9 / slices)
+        self._counts = collections.deque([[0] * _BUCKETS], maxlen=slices)
+        self._current = self._counts[-1]
+        # The exact longest duration of every slice, since a bucket only knows its range.
+        self._maxima = collections.deque([0], maxlen=slices)
+        self._ends = time.perf_counter_ns() + self._length
+
+    def record(self, ns: int, now: int) -> None:
+        """Counts a duration.
+
+        Args:
+            ns (int): The duration, in nanoseconds.
+            now (int): `time.perf_counter_ns()` at the end of the call, which the caller already has.
+
+        Returns:
+            bool: Always None.
+
+        """
+        if now >= self._ends:
+            self._roll(now)
+
+        if ns > self._maxima[-1]:
+            self._maxima[-1] = ns
+
+        # Log-linear buckets like HDR histograms, from integer operations only, since this runs on every
+        # timed call. Counting in a list is also much faster than in a dictionary.
+        if ns < _LINEAR:
+            self._current[ns if ns > 0 else 0] += 1
+        else:
+            shift = ns.bit_length() - _SUB_BITS - 1
+            self._current[(shift << _SUB_BITS) + (ns >> shift)] += 1
+
+    def counts(self) -> t.Dict[int, int]:
+        """Every slice still in the window, merged into counts per bucket, leaving out empty buckets."""
+        self._roll(time.perf_counter_ns())
+
+        return {bucket: n for bucket, n in enumerate(map(sum, zip(*self._counts))) if n}
+
+    def summary(self) -> t.Dict[str, float]:
+        """The amount of calls in the window, and their mean, percentiles and maximum, in milliseconds.
+
+        The mean and percentiles take the middle of each bucket, so they are within about 3% of the
+        actual durations. The maximum is exact.
+        """
+        counts = self.counts()
+        total = sum(counts.values())
+
+        if not total:
+            return {'calls': 0, 'mean': 0.0, 'p50': 0.0, 'p90': 0.0, 'p99': 0.0, 'max': 0.0}
+
+        longest = max(self._maxima)
+        buckets = sorted(counts.items())
+        summary = {'calls': total, 'mean': sum(_middle(b) * n for b, n in buckets) / total / 1e6}
+
+        for label, q in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99)):
+            rank = q * total
+            seen = 0
+
+            for bucket, n in buckets:
+                seen += n
+
+                if seen >= rank:
+                    # The middle of the last bucket can be past the longest call in it.
+                    summary[label] = min(_middle(bucket), longest) / 1e6
+                    break
+
+        summary['max'] = longest / 1e6
+
+        return summary
+
+    def clear(self) -> None:
+        self._counts.clear()
+        self._counts.append([0] * _BUCKETS)
+        self._current = self._counts[-1]
+        self._maxima.clear()
+        self._maxima.append(0)
+
+    def _roll(self, now: int) -> None:
+        if now < self._ends:
+            return
+
+        # Starting an empty slice for every one that passed without calls, up to the whole window.
+        passed = (now - self._ends) // self._length + 1
+
+        for _ in range(min(passed, self.slices)):
+            self._counts.append([0] * _BUCKETS)
+            self._maxima.append(0)
+
+        self._current = self._counts[-1]
+        self._ends += passed * self._length
+
+
+class Timer:
+    """The timings of one function, along with the profiles and memory use of the calls captured.
+
+    Attributes:
+        name (str): What the function is listed as.
+        sample (int): Time one call in this many.
+        profile_every (:obj:`t.Optional[int]`): Profile one call in this many with cProfile.
+        trace_every (:obj:`t.Optional[int]`): Trace the memory of one call in this many with tracemalloc.
+        calls (int): Calls since the timer was created or cleared, timed or not.
+        histogram (:obj:`Histogram`): The latencies of the timed calls. Captured calls are left out,
+            since profiling or tracing them slows them down.
+
+    """
+
+    def __init__(
+        self,
+        name: str,
+        sample: int = 1,
+        profile_every: t.Optional[int] = None,
+        trace_every: t.Optional[int] = None,
+        window: float = 60.0
+    ) -> None:
+        if sample < 1:
+            raise ValueError(f'Expected to time 1 call in at least 1, got {sample}.')
+
+        self.name = name
+        self.sample = sample
+        self.profile_every = profile_every
+        self.trace_every = trace_every
+
+        self.calls = 0
+        self.histogram = Histogram(window)
+
+        self._profile = None
+        self._profiled = 0
+        self._memory = collections.deque(maxlen=100)
+        self._allocations = []
+        self._next = set()
+
+    def profile_next(self) -> None:
+        """Profiles the next call with cProfile, whatever `profile_every` is.
+
+        Returns:
+            bool: Always None.
+
+        """
+        self._next.add('profile')
+
+    def trace_next(self) -> None:
+        """Traces the memory of the next call with tracemalloc, whatever `trace_every` is.
+
+        Returns:
+            bool: Always None.
+
+        """
+        self._next.add('trace')
+
+    def capture(self) -> t.Optional[str]:
+        """What the current call should be captured with, if anything."""
+        if self._next:
+            return self._next.pop()
+
+        if self.profile_every and not self.calls % self.profile_every:
+            return 'profile'
+
+        if self.trace_every and not self.calls % self.trace_every:
+            return 'trace'
+
+        return None
+
+    def profiled(self, func: t.Callable, args: tuple, kwargs: dict) -> t.Any:
+        """Calls a function under cProfile, adding to the stats of the earlier profiled calls."""
+        global _capturing
+
+        # Only one profiler can be active at a time, so calls of other timed functions within this one
+        # are part of its profile instead of getting their own.
+        if _capturing:
+            return func(*args, **kwargs)
+
+        if self._profile is None:
+            self._profile = cProfile.Profile()
+
+        _capturing = True
+        self._profiled += 1
+        self._profile.enable()
+
+        try:
+            return func(*args, **kwargs)
+
+        finally:
+            self._profile.disable()
+            _capturing = False
+
+    def traced(self, func: t.Callable, args: tuple, kwargs: dict) -> t.Any:
+        """Calls a function under tracemalloc, recording its peak and remaining memory, and what allocated."""
+        global _capturing
+
+        if _capturing:
+            return func(*args, **kwargs)
+
+        started = not tracemalloc.is_tracing()
+
+        if started:
+            tracemalloc.start()
+
+        _capturing = True
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+
+        try:
+            return func(*args, **kwargs)
+
+        finally:
+            after, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+
+            if started:
+                tracemalloc.stop()
+
+            _capturing = False
+
+            self._memory.append((peak - current, after - current))
+            self._allocations = [
+                {'line': str(stat.traceback[0]), 'bytes': stat.size_diff, 'count': stat.count_diff}
+                for stat in snapshot.compare_to(before, 'lineno')[:10]
+            ]
+
+    def summary(self, functions: int = 10) -> t.Dict[str, t.Any]:
+        """Everything the timer gathered, in what JSON can hold.
+
+        Args:
+            functions (int, optional): The amount of functions of the profile to include, most
+                time spent first. Defaults to 10.
+
+        Returns:
+            :obj:`t.Dict[str, t.Any]`: The latencies in milliseconds, and the profile and memory use if
+                any calls were captured.
+
+        """
+        summary = {
+            'name': self.name, 'total_calls': self.calls, 'sample': self.sample, **self.histogram.summary()
+        }
+
+        if self._profile is not None:
+            stats = pstats.Stats(self._profile, stream=io.StringIO()).sort_stats('cumulative')
+
+            summary['profile'] = {'calls': self._profiled, 'functions': [
+                {
+                    'function': f'{file}:{line}({name})',
+                    'calls': calls,
+                    'own': own * 1000,
+                    'cumulative': cumulative * 1000
+                }
+                for (file, line, name), (_, calls, own, cumulative, _) in (
+                    (func, stats.stats[func]) for func in stats.fcn_list[:functions]
+                )
+            ]}
+
+        if self._memory:
+            peaks, remaining = zip(*self._memory)
+            summary['memory'] = {
+                'calls': len(self._memory),
+                'peak': max(peaks),
+                'mean_peak': sum(peaks) / len(peaks),
+                'mean_remaining': sum(remaining) / len(remaining),
+                'allocations': self._allocations
+            }
+
+        return summary
+
+    def clear(self) -> None:
+        self.calls = self._profiled = 0
+        self.histogram.clear()
+        self._profile = None
+        self._memory.clear()
+        self._allocations = []
+
+
+class Timings:
+    """Times the functions decorated with its `timed`, and exports what it gathered.
+
+    Checking `enabled` is all a timed function does while it is off, a few nanoseconds on top of calling
+    through any wrapper. With `strip`, `timed` returns functions as they are, which costs nothing at all,
+    but then timing can't be turned on.
+
+    Attributes:
+        enabled (bool): If timed functions are timed. Can be switched at any time.
+        strip (bool): Leave functions undecorated.
+        timers (:obj:`t.Dict[str, Timer]`): The timer of every decorated function, by name.
+
+    Examples:
+        >>> timings = Timings()
+        >>> @timings.timed(sample=10, profile_every=1000)
+        ... def render(expression: str) -> bytes:
+        ...     ...
+        >>> print(timings.table())
+
+    """
+
+    def __init__(self, enabled: bool = True, strip: bool = False) -> None:
+        self.enabled = enabled
+        self.strip = strip
+
+        self.timers = {}
+
+    def timed(
+        self,
+        func: t.Optional[t.Callable] = None,
+        *,
+        name: t.Optional[str] = None,
+        sample: int = 1,
+        profile_every: t.Optional[int] = None,
+        trace_every: t.Optional[int] = None,
+        window: float = 60.0
+    ) -> t.Callable:
+        """Times a function or coroutine function on every call, or one call in `sample`.
+
+        Durations come from `time.perf_counter_ns`, a monotonic clock read without creating floats.
+        Coroutine functions are timed, but never captured, since other tasks run while they wait.
+        Captured calls are counted in `total_calls`, but left out of the latencies, which the profiler
+        or tracemalloc would inflate.
+
+        Args:
+            func (:obj:`t.Optional[t.Callable]`, optional): The function, when used as `@timed`.
+            name (:obj:`t.Optional[str]`, optional): What to list it as. Defaults to its qualified name.
+            sample (int, optional): Time one call in this many, to lower the overhead of hot functions.
+                Defaults to every call.
+            profile_every (:obj:`t.Optional[int]`, optional): Profile one call in this many with cProfile.
+                Defaults to never.
+            trace_every (:obj:`t.Optional[int]`, optional): Trace the memory of one call in this many
+                with tracemalloc, which slows that call down a lot. Defaults to never.
+            window (float, optional): Seconds of calls the histogram covers. Defaults to 60.
+
+        Returns:
+            :obj:`t.Callable`: The decorated function, or the decorator if used with arguments. Its
+                `timer` is the `Timer` it reports to.
+
+        Raises:
+            ValueError: When `sample` is below 1.
+
+        """
+        def decorator(func: t.Callable) -> t.Callable:
+            if self.strip:
+                return func
+
+            timer = Timer(name or func.__qualname__, sample, profile_every, trace_every, window)
+            self.timers[timer.name] = timer
+
+            clock = time.perf_counter_ns
+
+            if inspect.iscoroutinefunction(func):
+
+                @functools.wraps(func)
+                async def wrapper(*args, **kwargs) -> t.Any:
+                    if not self.enabled:
+                        return await func(*args, **kwargs)
+
+                    timer.calls += 1
+
+                    if timer.calls % timer.sample:
+                        return await func(*args, **kwargs)
+
+                    start = clock()
+
+                    try:
+                        return await func(*args, **kwargs)
+
+                    finally:
+                        end = clock()
+                        timer.histogram.record(end - start, end)
+
+            else:
+
+                @functools.wraps(func)
+                def wrapper(*args, **kwargs) -> t.Any:
+                    if not self.enabled:
+                        return func(*args, **kwargs)
+
+                    timer.calls += 1
+
+                    if timer.calls % timer.sample:
+                        return func(*args, **kwargs)
+
+                    capture = timer.capture()
+
+                    if capture is not None:
+                        return (timer.profiled if capture == 'profile' else timer.traced)(func, args, kwargs)
+
+                    start = clock()
+
+                    try:
+                        return func(*args, **kwargs)
+
+                    finally:
+                        end = clock()
+                        timer.histogram.record(end - start, end)
+
+            wrapper.timer = timer
+
+            return wrapper
+
+        return decorator(func) if func is not None else decorator
+
+    def table(self) -> str:
+        """The latencies of every timed function as a table, slowest at the 99th percentile first.
+
+        Returns:
+            str: One row per function, in milliseconds.
+
+        """
+        rows = sorted(
+            ({**timer.histogram.summary(), 'name': name} for name, timer in self.timers.items()),
+            key=lambda row: row['p99'],
+            reverse=True
+        )
+        width = max([len(row['name']) for row in rows] + [8])
+
+        columns = ('mean', 'p50', 'p90', 'p99', 'max')
+        lines = [f'{"function":<{width}} {"calls":>9} ' + ' '.join(f'{column:>10}' for column in columns)]
+
+        for row in rows:
+            lines.append(
+                f'{row["name"]:<{width}} {row["calls"]:>9} '
+                + ' '.join(f'{row[column]:>10.4f}' for column in columns)
+            )
+
+        return '\n'.join(lines)
+
+    def json(self, indent: t.Optional[int] = None) -> str:
+        """Everything gathered about every timed function, as JSON.
+
+        Args:
+            indent (:obj:`t.Optional[int]`, optional): Passed on to `json.dumps`. Defaults to one line.
+
+        Returns:
+            str: A list of the summaries of the timers.
+
+        """
+        return json.dumps([timer.summary() for timer in self.timers.values()], indent=indent)
+
+    def clear(self) -> None:
+        for timer in self.timers.values():
+            timer.clear()
+
+
+# If a profiler or tracemalloc is capturing a call already.
+_capturing = False
+
+# The default timings, which `PYS_TIMINGS=strip` takes out of every function decorated afterwards.
+timings = Timings(strip=os.environ.get('PYS_TIMINGS') == 'strip')
+timed = timings.timed
+
+
+if __name__ == "__main__":
+    import timeit
+
+    from decorators import outer
+
+    @timed(profile_every=500, trace_every=700)
+    def build(n: int) -> t.List[str]:
+        return sorted(str(i) for i in range(n))
+
+    @timed(sample=4)
+    def lookup(table: dict, key: int) -> t.Any:
+        return table.get(key)
+
+    table = {i: i for i in range(1000)}
+
+    for i in range(2000):
+        build(i % 300)
+        lookup(table, i)
+
+    build.timer.trace_next()
+    build(10_000)
+
+    print(timings.table())
+    print(json.dumps(build.timer.summary(functions=3), indent=2)[:1500], '...')
+
+    def add(a: int, b: int) -> int:
+        return a + b
+
+    stripped = Timings(strip=True)
+    disabled = Timings(enabled=False)
+    enabled = Timings()
+
+    cases = {
+        'undecorated': add,
+        'stripped': stripped.timed(add),
+        'pass-through wrapper, for reference': outer(add),
+        'disabled': disabled.timed(add),
+        'enabled, timing 1 in 16 calls': enabled.timed(add, name='add/16', sample=16),
+        'enabled, timing every call': enabled.timed(add, name='add')
+    }
+
+    calls = 200_000
+    repeat = 25
+    base = None
+    print(f'\n{calls:,} calls of a function adding two numbers, best and median of {repeat} runs')
+
+    for label, func in cases.items():
+        # A statement instead of a lambda, so the calls aren't measured along with a lambda around each.
+        seconds = timeit.repeat('func(1, 2)', globals={'func': func}, number=calls, repeat=repeat)
+        runs = sorted(s / calls * 1e9 for s in seconds)
+        median = runs[repeat // 2]
+        base = median if base is None else base
+
+        # Overheads compare medians, and the spread covers the middle half of the runs, which leaves
+        # out the ones another process got in the way of.
+        spread = runs[repeat * 3 // 4] - runs[repeat // 4]
+
+        print(f'  {label:<36} {runs[0]:>7.1f}ns best, {median:>7.1f}ns median, '
+              f'{spread:>6.1f}ns spread, {median - base:>+7.1f}ns overhead')
@@ -0,0 +1,254 @@
+import collections
+import itertools
+import typing as t
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+
+def chunked(iterable: t.Iterable, n: int) -> t.Iterator:
+    """Lazily splits an iterable into chunks of `n` items, the last one possibly shorter.
+
+    Only one chunk is held at a time, so this works on unbounded streams in constant memory.
+
+    Args:
+        iterable (:obj:`t.Iterable`): What to split. For a NumPy array, every chunk is a view of it.
+        n (int): Items per chunk.
+
+    Returns:
+        :obj:`t.Iterator`: Tuples of items, or views for an array.
+
+    Raises:
+        ValueError: When `n` is less than 1.
+
+    Examples:
+        >>> list(chunked(range(7), 3))
+        [(0, 1, 2), (3, 4, 5), (6,)]
+
+    """
+    _positive(n)
+
+    if isinstance(iterable, np.ndarray):
+        return (iterable[i:i + n] for i in range(0, len(iterable), n))
+
+    iterator = iter(iterable)
+
+    return iter(lambda: tuple(itertools.islice(iterator, n)), ())
+
+
+def grouper(iterable: t.Iterable, n: int, fillvalue: t.Any = None, incomplete: str = 'fill') -> t.Iterable:
+    """Splits an iterable into groups of exactly `n` items, deciding what happens to a shorter last group.
+
+    Args:
+        iterable (:obj:`t.Iterable`): What to split.
+        n (int): Items per group.
+        fillvalue (:obj:`t.Any`, optional): What pads the last group with 'fill'. Defaults to None.
+        incomplete (str, optional): 'fill' to pad the last group, 'ignore' to drop it, or 'strict'
+            to raise an error. Defaults to 'fill'.
+
+    Returns:
+        :obj:`t.Iterable`: Tuples of items. For a NumPy array, one array of shape (groups, n, ...),
+            which is a view unless the last group had to be padded. Padding with None gives an array
+            of objects, and other fill values promote the array to a type that holds them.
+
+    Raises:
+        ValueError: When `incomplete` is 'strict' and the items don't split evenly, or isn't a known mode.
+
+    Examples:
+        >>> list(grouper('ABCDEFG', 3, 'x'))
+        [('A', 'B', 'C'), ('D', 'E', 'F'), ('G', 'x', 'x')]
+
+    """
+    _positive(n)
+
+    if incomplete not in ('fill', 'ignore', 'strict'):
+        raise ValueError(f"Expected 'fill', 'ignore' or 'strict', got {incomplete!r}.")
+
+    if isinstance(iterable, np.ndarray):
+        extra = len(iterable) % n
+
+        if extra and incomplete == 'strict':
+            raise ValueError(f'{len(iterable)} items do not split into groups of {n}.')
+
+        if extra and incomplete == 'fill':
+            # Padding with None like the other iterables takes an object array, as would a NaN for integers.
+            if fillvalue is None:
+                dtype = np.dtype(object)
+            else:
+                dtype = np.result_type(iterable.dtype, np.asarray(fillvalue).dtype)
+
+            padding = np.full((n - extra, *iterable.shape[1:]), fillvalue, dtype=dtype)
+            iterable = np.concatenate((iterable.astype(dtype, copy=False), padding))
+
+        return _windows(iterable, n, n)
+
+    # The same iterator n times over, so every tuple takes the next n items.
+    iterators = [iter(iterable)] * n
+
+    if incomplete == 'fill':
+        return itertools.zip_longest(*iterators, fillvalue=fillvalue)
+
+    if incomplete == 'ignore':
+        return zip(*iterators)
+
+    return _strict(iterators, n)
+
+
+def pairwise(iterable: t.Iterable) -> t.Iterable:
+    """Overlapping pairs of neighbours: (s0, s1), (s1, s2), (s2, s3) and so on.
+
+    Args:
+        iterable (:obj:`t.Iterable`): What to pair up.
+
+    Returns:
+        :obj:`t.Iterable`: Tuples of two items. For a NumPy array, a view of shape (n - 1, 2, ...).
+
+    """
+    return sliding_window(iterable, 2)
+
+
+def sliding_window(iterable: t.Iterable, n: int, step: int = 1) -> t.Iterable:
+    """Windows of `n` neighbouring items, each starting `step` items after the previous one.
+
+    Holds one window at a time. For a NumPy array no items are copied at all: every window shares
+    the array's memory, which is why the view is read-only.
+
+    Args:
+        iterable (:obj:`t.Iterable`): What to slide over.
+        n (int): Items per window.
+        step (int, optional): Items between the starts of windows. Defaults to 1.
+
+    Returns:
+        :obj:`t.Iterable`: Tuples of `n` items. For a NumPy array, a view of shape (windows, n, ...).
+
+    Examples:
+        >>> list(sliding_window(range(6), 3, step=2))
+        [(0, 1, 2), (2, 3, 4)]
+        >>> sliding_window(np.arange(6), 3, step=2)
+        array([[0, 1, 2],
+               [2, 3, 4]])
+
+    """
+    _positive(n)
+    _positive(step)
+
+    if isinstance(iterable, np.ndarray):
+        return _windows(iterable, n, step)
+
+    return _sliding(iter(iterable), n, step)
+
+
+def interleave(*iterables: t.Iterable, longest: bool = False) -> t.Iterable:
+    """Takes one item from each iterable in turn: a0, b0, a1, b1 and so on.
+
+    Args:
+        *iterables (:obj:`t.Iterable`): What to interleave.
+        longest (bool, optional): Carry on with the rest once one runs out, instead of stopping
+            there. Defaults to False.
+
+    Returns:
+        :obj:`t.Iterable`: The items. For NumPy arrays, one array, cut to the shortest. Separate
+            arrays can't be viewed as one, so this is the one function that copies them.
+
+    Examples:
+        >>> list(interleave('AB', 'xyz', longest=True))
+        ['A', 'x', 'B', 'y', 'z']
+
+    """
+    if iterables and not longest and all(isinstance(i, np.ndarray) for i in iterables):
+        shortest = min(len(array) for array in iterables)
+
+        stacked = np.stack([array[:shortest] for array in iterables], axis=1)
+
+        return stacked.reshape(-1, *iterables[0].shape[1:])
+
+    if not longest:
+        return itertools.chain.from_iterable(zip(*iterables))
+
+    return _round_robin(iterables)
+
+
+def _positive(n: int) -> None:
+    if n < 1:
+        raise ValueError(f'Expected a size of at least 1, got {n}.')
+
+
+def _windows(array: np.ndarray, n: int, step: int) -> np.ndarray:
+    """A read-only view of shape (windows, n, ...), with the window starts `step` rows apart."""
+    count = max((len(array) - n) // step + 1, 0)
+    rows = array.strides[0]
+
+    return as_strided(
+        array, (count, n, *array.shape[1:]), (rows * step, rows, *array.strides[1:]), writeable=False
+    )
+
+
+def _strict(iterators: t.List[t.Iterator], n: int) -> t.Iterator[tuple]:
+    for group in itertools.zip_longest(*iterators, fillvalue=_MISSING):
+        if group[-1] is _MISSING:
+            raise ValueError(f'The last group has fewer than {n} items.')
+
+        yield group
+
+
+def _sliding(iterator: t.Iterator, n: int, step: int) -> t.Iterator[tuple]:
+    window = collections.deque(itertools.islice(iterator, n), maxlen=n)
+
+    if len(window) < n:
+        return
+
+    yield tuple(window)
+
+    # Windows further apart than they are long skip the items in between.
+    skip = max(step - n, 0)
+    advance = min(step, n)
+
+    while True:
+        if skip:
+            collections.deque(itertools.islice(iterator, skip), maxlen=0)
+
+        new = tuple(itertools.islice(iterator, advance))
+
+        if len(new) < advance:
+            return
+
+        window.extend(new)
+        yield tuple(window)
+
+
+def _round_robin(iterables: t.Tuple[t.Iterable, ...]) -> t.Iterator:
+    iterators = collections.deque(iter(i) for i in iterables)
+
+    while iterators:
+        iterator = iterators.popleft()
+
+        for item in iterator:
+            yield item
+            iterators.append(iterator)
+            break
+
+
+_MISSING = object()
+
+
+if __name__ == "__main__":
+    import timeit
+
+    # An unbounded stream of events, processed a window at a time in constant memory.
+    events = itertools.count()
+    print(list(itertools.islice(sliding_window(events, 3), 3)))
+    print(list(chunked(range(10), 4)), list(grouper(range(10), 4, incomplete='ignore')))
+    print(list(pairwise('abcd')), ''.join(interleave('ace', 'bdf')))
+
+    values = np.arange(10_000_000, dtype=np.float64)
+    windows = sliding_window(values, 5)
+    print(f'\n{windows.shape} windows over {values.nbytes / 1024 ** 2:.0f}MiB share its memory: '
+          f'{np.shares_memory(windows, values)}')
+
+    def bench(label: str, func: t.Callable) -> None:
+        print(f'  {label:<40} {min(timeit.repeat(func, number=1, repeat=3)):>8.3f}s')
+
+    bench('moving average, strided view', lambda: windows.mean(axis=1))
+    bench('moving average, tuples (1/10 the size)', lambda: [
+        sum(window) / 5 for window in sliding_window(values[:1_000_000].tolist(), 5)
+    ])
@@ -0,0 +1,37 @@
+import itertools
+
+import numpy as np
+
+from itereration_tools import chunked, grouper, interleave, pairwise, sliding_window
+
+
+def test_grouper_pads_integer_arrays_like_iterables() -> None:
+    groups = grouper(np.arange(7), 3)
+
+    assert groups.dtype == object
+    assert [tuple(group) for group in groups.tolist()] == list(grouper(range(7), 3))
+
+
+def test_grouper_promotes_to_hold_the_fill_value() -> None:
+    assert grouper(np.arange(7), 3, fillvalue=-1).dtype == np.arange(1).dtype
+    assert np.isnan(grouper(np.arange(7), 3, fillvalue=np.nan)[-1, -1])
+
+
+def test_array_paths_match_iterables() -> None:
+    data = list(range(11))
+    array = np.arange(11)
+
+    for n, step in itertools.product(range(1, 5), range(1, 6)):
+        windows = [tuple(window) for window in sliding_window(array, n, step).tolist()]
+
+        assert windows == list(sliding_window(data, n, step))
+
+    assert [tuple(c.tolist()) for c in chunked(array, 4)] == list(chunked(data, 4))
+    assert [tuple(p) for p in pairwise(array).tolist()] == list(pairwise(data))
+    assert interleave(array, array + 100).tolist() == list(interleave(data, [i + 100 for i in data]))
+
+
+def test_sliding_window_on_an_unbounded_stream() -> None:
+    windows = sliding_window(itertools.count(), 3, step=5)
+
+    assert list(itertools.islice(windows, 3)) == [(0, 1, 2), (5, 6, 7), (10, 11, 12)]
@@ -1,8 +1,122 @@
-from random import randint
+import itertools
+import typing as t
 
+import numpy as np
 
-n = [[randint(0, 10), randint(0, 10)] for _ in range(randint(0, 20))]
-print(n)
 
-n = sum(n, [])
-print(n)
+# Iterables that are treated as single items. Strings would never stop, since every character is a string.
+ATOMS = (str, bytes, bytearray, memoryview)
+
+
+def flatten(items: t.Iterable, stop: t.Tuple[type, ...] = ATOMS, depth: t.Optional[int] = None) -> t.Iterator:
+    """Lazily yields the items of arbitrarily nested iterables, from left to right.
+
+    Keeps a stack of iterators instead of recursing, so deep nesting can't reach the recursion limit,
+    and nothing is copied. Whether a type is iterable is looked up once per type, not once per item.
+
+    Args:
+        items (:obj:`t.Iterable`): The outermost iterable.
+        stop (:obj:`t.Tuple[type, ...]`, optional): Iterable types to yield as they are instead of
+            flattening, such as `(str, dict)`. Defaults to strings and bytes.
+        depth (:obj:`t.Optional[int]`, optional): Levels of nesting to flatten, with 1 being what
+            `sum(n, [])` does. Defaults to all of them.
+
+    Returns:
+        :obj:`t.Iterator`: The items that aren't flattened any further.
+
+    Examples:
+        >>> list(flatten([1, [2, (3, [4])], 'five']))
+        [1, 2, 3, 4, 'five']
+        >>> list(flatten([1, [2, (3, [4])]], depth=1))
+        [1, 2, (3, [4])]
+
+    """
+    nested = {}
+    stack = [iter(items)]
+
+    while stack:
+        for item in stack[-1]:
+            cls = type(item)
+            expand = nested.get(cls)
+
+            if expand is None:
+                expand = nested[cls] = hasattr(cls, '__iter__') and not issubclass(cls, stop)
+
+            if expand and (depth is None or len(stack) <= depth):
+                # Resuming the outer iterator once this one is exhausted.
+                stack.append(iter(item))
+                break
+
+            yield item
+
+        else:
+            stack.pop()
+
+
+def flatten_lists(lists: t.Iterable[t.Iterable]) -> list:
+    """Flattens one level, like `sum(lists, [])`, in linear instead of quadratic time.
+
+    `sum` copies everything gathered so far on every step, while this extends one list in C.
+
+    Args:
+        lists (:obj:`t.Iterable[t.Iterable]`): Iterables of items, such as a list of lists.
+
+    Returns:
+        list: The items of every iterable, in order.
+
+    """
+    return list(itertools.chain.from_iterable(lists))
+
+
+def flatten_array(rows: t.Any, dtype: t.Any = None) -> np.ndarray:
+    """Flattens rectangular numeric data, such as a list of equally long lists of numbers, into an array.
+
+    An array that is already contiguous is flattened as a view, without copying.
+
+    Args:
+        rows (:obj:`t.Any`): Anything NumPy can turn into an array of numbers.
+        dtype (:obj:`t.Any`, optional): The type of the items. Defaults to what NumPy infers.
+
+    Returns:
+        :obj:`np.ndarray`: One dimension holding every item.
+
+    Raises:
+        ValueError: When `rows` is ragged, so isn't rectangular.
+
+    """
+    return np.asarray(rows, dtype=dtype).ravel()
+
+
+if __name__ == "__main__":
+    import timeit
+    from random import randint
+
+    n = [[randint(0, 10), randint(0, 10)] for _ in range(randint(0, 20))]
+    print(n)
+    print(flatten_lists(n))
+    print(list(flatten([1, [2, [3, [4, 'five']]], (6, {7})])))
+
+    def bench(label: str, func: t.Callable) -> None:
+        seconds = min(timeit.repeat(func, number=1, repeat=3))
+        print(f'  {label:<40} {seconds * 1000:>10.2f}ms')
+
+    for size in (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6):
+        pairs = [[randint(0, 10), randint(0, 10)] for _ in range(size)]
+        array = np.array(pairs)
+        print(f'\n{size:,} lists of 2 items')
+
+        # `sum` is quadratic: ten times the lists take a hundred times as long, about 30s at 100,000.
+        if size <= 10 ** 4:
+            bench('sum(n, [])', lambda: sum(pairs, []))
+
+        bench('flatten_lists (chain)', lambda: flatten_lists(pairs))
+        bench('list(flatten(...))', lambda: list(flatten(pairs)))
+        bench('flatten_array, from lists', lambda: flatten_array(pairs))
+        bench('flatten_array, from an array (a view)', lambda: flatten_array(array))
+
+    deep = []
+    for _ in range(100_000):
+        deep = [deep, 0]
+
+    print('\n100,000 levels of nesting')
+    bench('list(flatten(...))', lambda: list(flatten(deep)))
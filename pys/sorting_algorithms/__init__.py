@@ -0,0 +1,22 @@
+"""Sorting algorithms with the same interface as `sorted`: an iterable, then `key` and `reverse`.
+
+They return lists, except for `external_sort`, which returns an iterator since the sorted items may
+not fit in memory, and `sort_file`, which writes the sorted lines to another file.
+
+Usage of the benchmark:
+    python -m sorting_algorithms.benchmark [--sizes 1000 10000 100000]
+    python -m sorting_algorithms.benchmark --file-mb 1024 [--memory-mb 128] [--workers 4]
+
+"""
+
+from .bubble import bubble_sort
+from .external import external_sort, sort_file
+from .heap import heap_sort, top_k
+from .merge import merge_sort
+from .natural import natural_sort
+from .radix import radix_sort
+
+__all__ = (
+    'bubble_sort', 'external_sort', 'heap_sort', 'merge_sort', 'natural_sort', 'radix_sort', 'sort_file',
+    'top_k'
+)
@@ -0,0 +1,180 @@
+"""Times every algorithm of the package against `sorted` and `numpy.sort`.
+
+Usage, from `pys/`:
+    python -m sorting_algorithms.benchmark [--sizes 1000 10000 100000] [--repeat 3]
+
+With `--file-mb`, sorts a generated file of records with `sort_file` instead, reporting throughput
+and peak RSS against reading the whole file into memory and sorting it there:
+    python -m sorting_algorithms.benchmark --file-mb 1024 [--memory-mb 128] [--workers 4]
+
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import resource
+import tempfile
+import time
+import typing as t
+
+import numpy as np
+
+from . import bubble_sort, external_sort, heap_sort, merge_sort, natural_sort, radix_sort, sort_file, top_k
+
+
+def random_ints(n: int) -> t.List[int]:
+    return [random.randint(-2 ** 31, 2 ** 31) for _ in range(n)]
+
+
+def nearly_sorted(n: int) -> t.List[int]:
+    """Sorted, except for 1% of the items swapped with random others."""
+    items = sorted(random_ints(n))
+
+    for _ in range(max(n // 100, 1)):
+        a, b = random.randrange(n), random.randrange(n)
+        items[a], items[b] = items[b], items[a]
+
+    return items
+
+
+def duplicates(n: int) -> t.List[int]:
+    return [random.randint(0, 9) for _ in range(n)]
+
+
+DISTRIBUTIONS = {'random': random_ints, 'nearly sorted': nearly_sorted, 'duplicates': duplicates}
+
+ALGORITHMS = {
+    'sorted': sorted,
+    'numpy.sort': lambda items: np.sort(np.asarray(items, dtype=np.int64), kind='stable'),
+    'merge_sort': merge_sort,
+    'natural_sort': natural_sort,
+    'heap_sort': heap_sort,
+    'radix_sort': radix_sort,
+    'external_sort': lambda items: list(external_sort(items, chunk_size=max(len(items) // 4, 1))),
+    'top_k (k=10)': lambda items: top_k(items, 10),
+    'bubble_sort': bubble_sort
+}
+
+# Sizes past which an algorithm takes too long to be worth timing.
+LIMITS = {'bubble_sort': 2_000}
+
+
+def timed(func: t.Callable, items: t.List[int], repeat: int) -> float:
+    """The best time out of `repeat` runs, each on a fresh copy so in-place work doesn't carry over."""
+    best = float('inf')
+
+    for _ in range(repeat):
+        copy = items[:]
+        start = time.perf_counter()
+        func(copy)
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def record_key(line: bytes) -> bytes:
+    """The first field of a generated record. At the top level, so worker processes can import it."""
+    return line[:16]
+
+
+def write_records(filepath: str, size: int) -> None:
+    """Writes records of a random 16 character hex key and a payload, about 100 bytes each."""
+    with open(filepath, 'wb') as f:
+        while f.tell() < size:
+            f.writelines(
+                b'%016x,%s\n' % (random.getrandbits(64), b'x' * random.randint(60, 100))
+                for _ in range(10_000)
+            )
+
+
+def sort_in_memory(source: str, destination: str) -> None:
+    with open(source, 'rb') as f:
+        lines = f.readlines()
+
+    lines.sort(key=record_key)
+
+    with open(destination, 'wb') as f:
+        f.writelines(lines)
+
+
+def measured(func: t.Callable, args: tuple, kwargs: dict, results: multiprocessing.Queue) -> None:
+    """Runs a sort in a fresh process, so the peak RSS reported is the sort's alone."""
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+
+    # `ru_maxrss` is in KiB on Linux. For children it is the largest of them, not their sum.
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    workers = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+
+    results.put((elapsed, own, workers))
+
+
+def files(size_mb: int, memory_mb: int, workers: t.Optional[int]) -> None:
+    context = multiprocessing.get_context('spawn')
+
+    with tempfile.TemporaryDirectory() as folder:
+        source = os.path.join(folder, 'records')
+        destination = os.path.join(folder, 'sorted')
+
+        write_records(source, size_mb * 1024 ** 2)
+
+        cases = {
+            'sort_file': (
+                sort_file, {'key': record_key, 'memory': memory_mb * 1024 ** 2, 'workers': workers}
+            ),
+            'in memory': (sort_in_memory, {})
+        }
+
+        print(f'\n{size_mb:,}MiB of records, sort_file with a {memory_mb:,}MiB budget')
+        print(
+            f'  {"method":<12}{"seconds":>10}{"MiB/s":>10}{"peak RSS (MiB)":>17}{"largest worker (MiB)":>23}'
+        )
+
+        for label, (func, kwargs) in cases.items():
+            results = context.Queue()
+            process = context.Process(target=measured, args=(func, (source, destination), kwargs, results))
+            process.start()
+            elapsed, own, largest = results.get()
+            process.join()
+
+            print(f'  {label:<12}{elapsed:>10.2f}{size_mb / elapsed:>10.1f}{own:>17.1f}{largest:>23.1f}')
+
+            with open(destination, 'rb') as f:
+                keys = [record_key(line) for line in f]
+
+            assert keys == sorted(keys), f'{label} wrote unsorted records.'
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--file-mb', type=int, default=None, help='Benchmark sort_file on a file this large.')
+    parser.add_argument('--memory-mb', type=int, default=128, help='Memory budget of sort_file.')
+    parser.add_argument('--workers', type=int, default=None, help='Processes of sort_file.')
+    args = parser.parse_args()
+
+    random.seed(0)
+
+    if args.file_mb is not None:
+        files(args.file_mb, args.memory_mb, args.workers)
+        return
+
+    for n in args.sizes:
+        data = {name: make(n) for name, make in DISTRIBUTIONS.items()}
+
+        print(f'\n{n:,} items (ms)')
+        print(f'  {"algorithm":<14}' + ''.join(f'{name:>15}' for name in DISTRIBUTIONS))
+
+        for label, func in ALGORITHMS.items():
+            if n > LIMITS.get(label, n):
+                continue
+
+            row = (timed(func, items, args.repeat) * 1000 for items in data.values())
+            print(f'  {label:<14}' + ''.join(f'{ms:>15.2f}' for ms in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,42 @@
-from random import randint
+import typing as t
 
 
-n = [randint(0, 10) for _ in range(randint(0, 20))]
-print(n)
+def bubble_sort(items: t.Iterable, key: t.Optional[t.Callable] = None, reverse: bool = False) -> list:
+    """Sorts by swapping neighbours until none are out of order. O(n^2), so only for teaching.
 
-check = True
-while check:
-    check = False
-    for i in range(len(n) - 1):
-        if n[i] > n[i + 1]:
-            n[i], n[i + 1] = n[i + 1], n[i]
-            check = True
+    Args:
+        items (:obj:`t.Iterable`): What to sort.
+        key (:obj:`t.Optional[t.Callable]`, optional): Gets the value to compare from an item.
+        reverse (bool, optional): Sort from largest to smallest. Defaults to False.
 
-print(n)
+    Returns:
+        list: A new, sorted list. Equal items keep their order.
+
+    """
+    n = list(items)
+    keys = [key(item) for item in n] if key else n[:]
+
+    # Every pass moves the largest remaining item to the end, so each one can stop a step earlier.
+    end = len(n) - 1
+    check = True
+
+    while check:
+        check = False
+
+        for i in range(end):
+            if (keys[i + 1] > keys[i]) if reverse else (keys[i] > keys[i + 1]):
+                keys[i], keys[i + 1] = keys[i + 1], keys[i]
+                n[i], n[i + 1] = n[i + 1], n[i]
+                check = True
+
+        end -= 1
+
+    return n
+
+
+if __name__ == "__main__":
+    from random import randint
+
+    n = [randint(0, 10) for _ in range(randint(0, 20))]
+    print(n)
+    print(bubble_sort(n))
@@ -0,0 +1,240 @@
+import concurrent.futures
+import contextlib
+import heapq
+import itertools
+import multiprocessing
+import os
+import pickle
+import shutil
+import tempfile
+import typing as t
+
+
+def external_sort(
+    items: t.Iterable,
+    key: t.Optional[t.Callable] = None,
+    reverse: bool = False,
+    chunk_size: int = 100_000,
+    directory: t.Optional[t.Union[str, os.PathLike]] = None
+) -> t.Iterator:
+    """Sorts more items than fit in memory, by spilling sorted chunks to disk and merging them.
+
+    At most `chunk_size` items are held at once while reading, then one item per chunk while merging.
+    The items have to be picklable.
+
+    Args:
+        items (:obj:`t.Iterable`): What to sort, such as a generator reading a file.
+        key (:obj:`t.Optional[t.Callable]`, optional): Gets the value to compare from an item.
+        reverse (bool, optional): Sort from largest to smallest. Defaults to False.
+        chunk_size (int, optional): Items per sorted run on disk. Defaults to 100,000.
+        directory (:obj:`t.Optional[t.Union[str, os.PathLike]]`, optional): Where to spill the runs.
+            Defaults to the system's temporary directory.
+
+    Returns:
+        :obj:`t.Iterator`: The sorted items. Equal items keep their order. The runs are removed once
+            it is exhausted or closed.
+
+    """
+    items = iter(items)
+    runs = []
+
+    try:
+        while True:
+            chunk = sorted(itertools.islice(items, chunk_size), key=key, reverse=reverse)
+
+            if not chunk:
+                break
+
+            runs.append(_spill(chunk, directory))
+
+        # Runs are merged in the order they were read, so ties keep their order across runs as well.
+        yield from heapq.merge(*(_read(run) for run in runs), key=key, reverse=reverse)
+
+    finally:
+        for run in runs:
+            run.close()
+
+
+def _spill(chunk: list, directory: t.Optional[t.Union[str, os.PathLike]]) -> t.BinaryIO:
+    """Writes a sorted run to an anonymous temporary file, in batches so reading it back is cheap."""
+    run = tempfile.TemporaryFile(dir=directory)
+
+    for start in range(0, len(chunk), _BATCH):
+        pickle.dump(chunk[start:start + _BATCH], run, pickle.HIGHEST_PROTOCOL)
+
+    run.seek(0)
+
+    return run
+
+
+def _read(run: t.BinaryIO) -> t.Iterator:
+    while True:
+        try:
+            yield from pickle.load(run)
+
+        except EOFError:
+            return
+
+
+def sort_file(
+    source: t.Union[str, os.PathLike],
+    destination: t.Union[str, os.PathLike],
+    key: t.Optional[t.Callable[[bytes], t.Any]] = None,
+    reverse: bool = False,
+    memory: int = 256 * 1024 ** 2,
+    workers: t.Optional[int] = None,
+    directory: t.Optional[t.Union[str, os.PathLike]] = None
+) -> int:
+    """Sorts the lines of a file that is larger than memory, into another file.
+
+    The file is read in chunks that are sorted into runs by a pool of processes, while the next
+    chunks are read. The runs are then merged with a heap, in several passes if there are more
+    runs than the memory budget has read buffers for.
+
+    Every process holds a chunk as bytes, a list of its lines and a list of their keys at once, so
+    chunks are a fraction of `memory` and the budget is approximate rather than a hard limit.
+
+    Args:
+        source (:obj:`t.Union[str, os.PathLike]`): The file to sort, one record per line.
+        destination (:obj:`t.Union[str, os.PathLike]`): Where to write the sorted lines.
+        key (:obj:`t.Optional[t.Callable[[bytes], t.Any]]`, optional): Gets the value to compare from a
+            line, including its line ending. It is sent to other processes, so it has to be defined at
+            the top level of a module. Defaults to comparing the lines as bytes.
+        reverse (bool, optional): Sort from largest to smallest. Defaults to False.
+        memory (int, optional): Bytes the sort may use across every process. Defaults to 256MiB.
+        workers (:obj:`t.Optional[int]`, optional): Processes sorting runs. Defaults to the amount of CPUs.
+        directory (:obj:`t.Optional[t.Union[str, os.PathLike]]`, optional): Where to spill the runs.
+            Defaults to the system's temporary directory.
+
+    Returns:
+        int: The amount of lines sorted. Equal lines keep their order, and the output only ends with a
+            newline if the source does.
+
+    """
+    workers = workers or os.cpu_count() or 1
+    ends_line = _ends_line(source)
+
+    # Every chunk in flight takes about four times its size, and one more is being read meanwhile.
+    chunk_size = max(memory // (4 * (workers + 1)), 64 * 1024)
+    buffer_size = max(min(memory // 64, 1024 ** 2), 64 * 1024)
+    fan_in = max(memory // (2 * buffer_size), 2)
+
+    with tempfile.TemporaryDirectory(dir=directory) as folder:
+        runs = []
+        lines = 0
+
+        # Spawning, since forking a process that runs threads isn't safe.
+        context = multiprocessing.get_context('spawn')
+
+        with concurrent.futures.ProcessPoolExecutor(workers, mp_context=context) as pool:
+            pending = set()
+
+            for i, chunk in enumerate(_chunks(source, chunk_size)):
+                # Waiting for a worker before reading on, so no more than `workers` chunks are in memory.
+                if len(pending) >= workers:
+                    done, pending = concurrent.futures.wait(
+                        pending, return_when=concurrent.futures.FIRST_COMPLETED
+                    )
+
+                    for future in done:
+                        lines += future.result()
+
+                run = os.path.join(folder, f'run-{i}')
+                runs.append(run)
+                pending.add(pool.submit(_sort_run, chunk, run, key, reverse))
+
+                del chunk
+
+            for future in concurrent.futures.as_completed(pending):
+                lines += future.result()
+
+        # Merging groups of runs into longer ones until a single merge is left, which writes the output.
+        passes = itertools.count()
+
+        while len(runs) > fan_in:
+            merged = []
+
+            for group in range(0, len(runs), fan_in):
+                run = os.path.join(folder, f'merge-{next(passes)}')
+                _merge_runs(runs[group:group + fan_in], run, key, reverse, buffer_size)
+                merged.append(run)
+
+            runs = merged
+
+        if len(runs) == 1:
+            shutil.copyfile(runs[0], destination)
+        else:
+            _merge_runs(runs, destination, key, reverse, buffer_size)
+
+    # `_chunks` ended the last line of the source with a newline, so the output has one newline too many.
+    if lines and not ends_line:
+        with open(destination, 'rb+') as f:
+            f.truncate(f.seek(-1, os.SEEK_END))
+
+    return lines
+
+
+def _ends_line(source: t.Union[str, os.PathLike]) -> bool:
+    """If a file is empty or ends with a newline."""
+    with open(source, 'rb') as f:
+        if not f.seek(0, os.SEEK_END):
+            return True
+
+        f.seek(-1, os.SEEK_END)
+
+        return f.read(1) == b'\n'
+
+
+def _chunks(source: t.Union[str, os.PathLike], size: int) -> t.Iterator[bytes]:
+    """Reads a file in blocks of about `size` bytes, ending every block at the end of a line.
+
+    The last line gets a newline if it has none, so it can't run into another line once sorted.
+    """
+    with open(source, 'rb') as f:
+        while True:
+            chunk = f.read(size)
+
+            if not chunk:
+                return
+
+            chunk += f.readline()
+
+            if not chunk.endswith(b'\n'):
+                chunk += b'\n'
+
+            yield chunk
+
+
+def _sort_run(chunk: bytes, run: str, key: t.Optional[t.Callable], reverse: bool) -> int:
+    """Sorts the lines of a chunk into a run file. This runs in a worker process."""
+    lines = chunk.splitlines(keepends=True)
+    del chunk
+
+    lines.sort(key=key, reverse=reverse)
+
+    with open(run, 'wb') as f:
+        f.writelines(lines)
+
+    return len(lines)
+
+
+def _merge_runs(
+    runs: t.List[str],
+    destination: t.Union[str, os.PathLike],
+    key: t.Optional[t.Callable],
+    reverse: bool,
+    buffer_size: int
+) -> None:
+    """Merges sorted run files into one with a heap, removing the runs afterwards."""
+    with contextlib.ExitStack() as stack:
+        files = [stack.enter_context(open(run, 'rb', buffering=buffer_size)) for run in runs]
+        output = stack.enter_context(open(destination, 'wb', buffering=buffer_size))
+
+        output.writelines(heapq.merge(*files, key=key, reverse=reverse))
+
+    for run in runs:
+        os.remove(run)
+
+
+# Items per pickle in a run. Larger batches mean fewer calls, but more memory per run while merging.
+_BATCH = 1024
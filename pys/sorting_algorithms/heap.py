@@ -0,0 +1,85 @@
+import heapq
+import itertools
+import typing as t
+
+
+def heap_sort(items: t.Iterable, key: t.Optional[t.Callable] = None, reverse: bool = False) -> list:
+    """Sorts by popping the smallest item off a heap until it is empty. O(n log n) in every case.
+
+    Args:
+        items (:obj:`t.Iterable`): What to sort.
+        key (:obj:`t.Optional[t.Callable]`, optional): Gets the value to compare from an item.
+        reverse (bool, optional): Sort from largest to smallest. Defaults to False.
+
+    Returns:
+        list: A new, sorted list. Equal items keep their order.
+
+    """
+    heap = list(_decorate(items, key, reverse))
+    heapq.heapify(heap)
+
+    return [heapq.heappop(heap)[2] for _ in range(len(heap))]
+
+
+def top_k(items: t.Iterable, k: int, key: t.Optional[t.Callable] = None, reverse: bool = False) -> list:
+    """Finds the `k` first items in sorted order, without sorting the rest. O(n log k).
+
+    Only `k` items are kept in memory at once, so `items` can be a stream.
+
+    Args:
+        items (:obj:`t.Iterable`): What to pick from.
+        k (int): How many items to keep.
+        key (:obj:`t.Optional[t.Callable]`, optional): Gets the value to compare from an item.
+        reverse (bool, optional): Keep the largest items instead. Defaults to False.
+
+    Returns:
+        list: The same as `sorted(items, key=key, reverse=reverse)[:k]`.
+
+    """
+    if k <= 0:
+        return []
+
+    # The heap holds the k best so far with the worst of them on top, ready to be replaced. Of equal
+    # keys the later item is worse, hence the negated positions.
+    heap = []
+    wrap = (lambda value: value) if reverse else _Descending
+
+    for i, item in zip(itertools.count(), items):
+        value = key(item) if key else item
+
+        if len(heap) < k:
+            heapq.heappush(heap, (wrap(value), -i, item))
+            continue
+
+        # Most items of a long stream are no better than the worst kept, and are skipped before wrapping.
+        worst = heap[0][0] if reverse else heap[0][0].key
+
+        if (worst < value) if reverse else (value < worst):
+            heapq.heapreplace(heap, (wrap(value), -i, item))
+
+    heap.sort(reverse=True)
+
+    return [item for _, _, item in heap]
+
+
+class _Descending:
+    """Wraps a key so comparisons are flipped, since not every key can be negated."""
+
+    __slots__ = ('key',)
+
+    def __init__(self, key: t.Any) -> None:
+        self.key = key
+
+    def __lt__(self, other: '_Descending') -> bool:
+        return other.key < self.key
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Descending) and self.key == other.key
+
+
+def _decorate(items: t.Iterable, key: t.Optional[t.Callable], descending: bool) -> t.Iterator[tuple]:
+    """Pairs every item with its key and position, so items themselves are never compared."""
+    for i, item in zip(itertools.count(), items):
+        k = key(item) if key else item
+
+        yield (_Descending(k), i, item) if descending else (k, i, item)
@@ -0,0 +1,62 @@
+import typing as t
+
+
+def merge_sort(items: t.Iterable, key: t.Optional[t.Callable] = None, reverse: bool = False) -> list:
+    """Sorts by merging ever larger sorted runs, bottom up. O(n log n) in every case.
+
+    Keys are computed once per item, and the merges move indices instead of the items themselves.
+
+    Args:
+        items (:obj:`t.Iterable`): What to sort.
+        key (:obj:`t.Optional[t.Callable]`, optional): Gets the value to compare from an item.
+        reverse (bool, optional): Sort from largest to smallest. Defaults to False.
+
+    Returns:
+        list: A new, sorted list. Equal items keep their order.
+
+    """
+    items = list(items)
+    keys = [key(item) for item in items] if key else items
+
+    runs = [[i] for i in range(len(items))]
+
+    while len(runs) > 1:
+        runs = [
+            merge(keys, runs[i], runs[i + 1], reverse) if i + 1 < len(runs) else runs[i]
+            for i in range(0, len(runs), 2)
+        ]
+
+    return [items[i] for i in runs[0]] if runs else []
+
+
+def merge(keys: t.Sequence, left: t.List[int], right: t.List[int], reverse: bool = False) -> t.List[int]:
+    """Merges two sorted runs of indices into `keys`, taking from `left` first on ties.
+
+    Args:
+        keys (:obj:`t.Sequence`): The values the indices point to.
+        left (:obj:`t.List[int]`): The run that came first.
+        right (:obj:`t.List[int]`): The run that came after it.
+        reverse (bool, optional): The runs are sorted from largest to smallest. Defaults to False.
+
+    Returns:
+        :obj:`t.List[int]`: One sorted run.
+
+    """
+    merged = []
+    i = j = 0
+
+    while i < len(left) and j < len(right):
+        a, b = keys[left[i]], keys[right[j]]
+
+        # `right` only goes first when it is strictly before `left`, which keeps the merge stable.
+        if (a < b) if reverse else (b < a):
+            merged.append(right[j])
+            j += 1
+        else:
+            merged.append(left[i])
+            i += 1
+
+    merged.extend(left[i:])
+    merged.extend(right[j:])
+
+    return merged
@@ -0,0 +1,70 @@
+import typing as t
+
+from .merge import merge
+
+
+def natural_sort(items: t.Iterable, key: t.Optional[t.Callable] = None, reverse: bool = False) -> list:
+    """Sorts by merging the runs already in the data, so sorted or nearly sorted input is O(n).
+
+    Runs in the wrong direction are reversed first, as long as they are strictly ordered, since
+    reversing equal items would break stability. Runs shorter than `min_run` are extended with an
+    insertion sort, so random data doesn't become a merge of one-item runs.
+
+    Args:
+        items (:obj:`t.Iterable`): What to sort.
+        key (:obj:`t.Optional[t.Callable]`, optional): Gets the value to compare from an item.
+        reverse (bool, optional): Sort from largest to smallest. Defaults to False.
+
+    Returns:
+        list: A new, sorted list. Equal items keep their order.
+
+    """
+    items = list(items)
+    keys = [key(item) for item in items] if key else items
+
+    def before(a: int, b: int) -> bool:
+        return keys[b] < keys[a] if reverse else keys[a] < keys[b]
+
+    runs = []
+    n = len(items)
+    i = 0
+
+    while i < n:
+        j = i + 1
+
+        if j < n and before(j, i):
+            while j < n and before(j, j - 1):
+                j += 1
+
+            run = list(range(j - 1, i - 1, -1))
+        else:
+            while j < n and not before(j, j - 1):
+                j += 1
+
+            run = list(range(i, j))
+
+        # Extending short runs with an insertion sort, like Timsort does.
+        while len(run) < MIN_RUN and j < n:
+            k = len(run)
+            run.append(j)
+
+            while k and before(run[k], run[k - 1]):
+                run[k], run[k - 1] = run[k - 1], run[k]
+                k -= 1
+
+            j += 1
+
+        runs.append(run)
+        i = j
+
+    while len(runs) > 1:
+        runs = [
+            merge(keys, runs[k], runs[k + 1], reverse) if k + 1 < len(runs) else runs[k]
+            for k in range(0, len(runs), 2)
+        ]
+
+    return [items[k] for k in runs[0]] if runs else []
+
+
+# Shortest run worth merging. Below this, inserting is cheaper than another level of merging.
+MIN_RUN = 32
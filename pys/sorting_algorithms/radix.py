@@ -0,0 +1,47 @@
+import typing as t
+
+
+def radix_sort(
+    items: t.Iterable, key: t.Optional[t.Callable[[t.Any], int]] = None, reverse: bool = False
+) -> list:
+    """Sorts integers a byte at a time, least significant first. O(n * bytes) without comparing items.
+
+    Keys are shifted to start at 0, so negative numbers work, and only as many bytes are sorted on
+    as the range of the keys needs.
+
+    Args:
+        items (:obj:`t.Iterable`): What to sort.
+        key (:obj:`t.Optional[t.Callable[[t.Any], int]]`, optional): Gets the integer to sort by.
+        reverse (bool, optional): Sort from largest to smallest. Defaults to False.
+
+    Returns:
+        list: A new, sorted list. Equal items keep their order.
+
+    Raises:
+        TypeError: When a key isn't an integer.
+
+    """
+    items = list(items)
+    keys = [key(item) for item in items] if key else items
+
+    if not keys:
+        return []
+
+    if not all(isinstance(k, int) for k in keys):
+        raise TypeError('radix_sort can only sort by integer keys.')
+
+    low, high = min(keys), max(keys)
+
+    # Sorting by the distance from the largest key instead, which reverses the order and stays stable.
+    keys = [high - k for k in keys] if reverse else [k - low for k in keys]
+    order = list(range(len(items)))
+
+    for shift in range(0, (high - low).bit_length(), 8):
+        buckets = [[] for _ in range(256)]
+
+        for i in order:
+            buckets[(keys[i] >> shift) & 0xFF].append(i)
+
+        order = [i for bucket in buckets for i in bucket]
+
+    return [items[i] for i in order]
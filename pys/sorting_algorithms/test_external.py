@@ -0,0 +1,20 @@
+import operator
+
+from sorting_algorithms import external_sort, sort_file
+
+
+def test_external_sort_is_stable_across_runs() -> None:
+    items = [(i % 7, i) for i in range(100)]
+    key = operator.itemgetter(0)
+
+    assert list(external_sort(items, key=key, chunk_size=9)) == sorted(items, key=key)
+
+
+def test_sort_file_keeps_the_ending_of_the_source(tmp_path) -> None:
+    source, destination = tmp_path / 'source', tmp_path / 'destination'
+
+    for text, expected in ((b'c\na\nb', b'a\nb\nc'), (b'c\na\nb\n', b'a\nb\nc\n'), (b'', b'')):
+        source.write_bytes(text)
+
+        assert sort_file(source, destination, memory=1024, workers=1) == len(expected.splitlines())
+        assert destination.read_bytes() == expected